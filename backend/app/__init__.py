@@ -1 +1 @@
-# backend package initializer
+# backend package initializer
@@ -0,0 +1,288 @@
+# backend/app/bulk_import.py
+"""
+Bulk import of historical actions from CSV or NDJSON.
+
+    python -m backend.app.bulk_import actions.csv
+    python -m backend.app.bulk_import actions.ndjson --chunk-size 100000 --rejects rejects.ndjson
+    python -m backend.app.bulk_import actions.csv --dry-run      # validate only
+
+Each record names a user (username or user_id), an action_name from the
+action catalog, and a quantity; points may be given instead of a quantity
+(quantity is then points / points_per_unit), and timestamp (ISO 8601, UTC)
+defaults to now.  The columns written by /actions/export are accepted, so an
+export can be re-imported.
+
+The input is streamed and validated row by row; valid rows are inserted into
+action_types in chunks with Core executemany.  User points, challenge
+progress (including completion bonuses, awarded as /actions/log would) and
+the daily rollup are accumulated in memory and applied once at the end, all
+in one transaction, so a failed import leaves nothing behind.  The import
+holds the write lock throughout: run it while the API is stopped, or expect
+API writes to time out.  Running API workers pick up the new points on their
+next leaderboard refresh (LEADERBOARD_REFRESH seconds).
+"""
+import argparse
+import csv
+import json
+import math
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Iterator, Optional, Tuple
+
+from sqlalchemy import bindparam, update
+from sqlalchemy.dialects.sqlite import insert
+
+from backend.app import db, models
+from backend.app.services import action_catalog, challenge_catalog, daily_stats, leaderboard_index
+
+
+# action_types.points is a SQLite INTEGER (signed 64-bit)
+MAX_POINTS = 2 ** 63 - 1
+
+
+class RowError(ValueError):
+    """A record that cannot be imported."""
+
+
+def read_records(path: str, fmt: Optional[str] = None) -> Iterator[Tuple[int, object]]:
+    """(line number, raw record) pairs streamed from a CSV or NDJSON file ("-" for stdin).
+
+    CSV rows come back as dicts and NDJSON lines as text; decode() turns either
+    into a record, so a bad line is rejected rather than ending the stream."""
+    if fmt is None:
+        fmt = "ndjson" if path.endswith((".ndjson", ".jsonl", ".json")) else "csv"
+    handle = sys.stdin if path == "-" else open(path, newline="", encoding="utf-8-sig")
+    try:
+        if fmt == "csv":
+            reader = csv.DictReader(handle)
+            for record in reader:
+                yield reader.line_num, record
+        else:
+            for line_no, line in enumerate(handle, 1):
+                if line.strip():
+                    yield line_no, line.strip()
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
+
+
+def decode(raw) -> dict:
+    """The record for one raw input row from read_records()."""
+    if isinstance(raw, str):
+        try:
+            raw = json.loads(raw)
+        except ValueError as exc:
+            raise RowError(f"bad JSON: {exc}")
+    if not isinstance(raw, dict):
+        raise RowError(f"expected a JSON object, got {type(raw).__name__}")
+    return raw
+
+
+class Importer:
+    """Validates records and accumulates their effects; see the module docstring."""
+
+    def __init__(self, database, now: Optional[datetime] = None):
+        self.database = database
+        self.now = now or datetime.utcnow()
+        self.catalog = action_catalog.get()
+        self.user_ids = dict(database.query(models.User.username, models.User.id))
+        self.known_ids = set(self.user_ids.values())
+        # Current progress, so completion bonuses are awarded as the log path would
+        self.progress = {
+            (user_id, challenge_id): progress or 0
+            for user_id, challenge_id, progress in database.query(
+                models.ChallengeProgress.user_id,
+                models.ChallengeProgress.challenge_id,
+                models.ChallengeProgress.progress,
+            )
+        }
+        self.challenges = {
+            a.name: challenge_catalog.find(database, a.challenge_title) for a in self.catalog.actions
+        }
+        self.progress_delta = defaultdict(float)
+        self.points_delta = defaultdict(int)
+        self.rollup = daily_stats.new_totals()
+
+    def _user_id(self, record: dict) -> int:
+        raw = record.get("user_id")
+        if raw not in (None, ""):
+            try:
+                user_id = int(raw)
+            except (TypeError, ValueError):
+                raise RowError(f"bad user_id {raw!r}")
+            if user_id not in self.known_ids:
+                raise RowError(f"unknown user_id {user_id}")
+            return user_id
+        username = record.get("username")
+        if not username:
+            raise RowError("missing username or user_id")
+        user_id = self.user_ids.get(username)
+        if user_id is None:
+            raise RowError(f"unknown user {username!r}")
+        return user_id
+
+    def row(self, record: dict) -> dict:
+        """Validate one record; returns the action_types row and accumulates its effects."""
+        user_id = self._user_id(record)
+        definition = self.catalog.by_name.get(record.get("action_name"))
+        if definition is None:
+            raise RowError(f"unknown action {record.get('action_name')!r}")
+
+        raw_quantity, raw_points = record.get("quantity"), record.get("points")
+        try:
+            if raw_quantity not in (None, ""):
+                quantity = float(raw_quantity)
+                if not math.isfinite(definition.points_per_unit * quantity):
+                    raise RowError(f"quantity must be finite, got {raw_quantity!r}")
+                points = int(definition.points_per_unit * quantity)
+            elif raw_points not in (None, ""):
+                if isinstance(raw_points, float) and not math.isfinite(raw_points):
+                    raise RowError(f"points must be finite, got {raw_points!r}")
+                points = int(raw_points)
+                quantity = points / definition.points_per_unit if definition.points_per_unit else 0.0
+            else:
+                raise RowError("missing quantity or points")
+        except RowError:
+            raise
+        except (TypeError, ValueError, OverflowError):
+            raise RowError(f"bad quantity {raw_quantity!r} or points {raw_points!r}")
+        if quantity <= 0:
+            raise RowError("quantity must be positive")
+        if abs(points) > MAX_POINTS:
+            raise RowError(f"points out of range: {points}")
+
+        raw_time = record.get("timestamp")
+        if raw_time in (None, ""):
+            timestamp = self.now
+        else:
+            try:
+                timestamp = datetime.fromisoformat(str(raw_time).replace("Z", "+00:00"))
+            except ValueError:
+                raise RowError(f"bad timestamp {raw_time!r}")
+            if timestamp.tzinfo is not None:
+                timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+
+        self.points_delta[user_id] += points
+        total = self.rollup[(user_id, timestamp.date(), definition.name)]
+        total[0] += points
+        total[1] += quantity
+        total[2] += 1
+
+        challenge = self.challenges.get(definition.name)
+        if challenge is not None:
+            key = (user_id, challenge.id)
+            progress = self.progress.get(key, 0) + quantity
+            self.progress[key] = progress
+            self.progress_delta[key] += quantity
+            if progress >= challenge.goal:
+                self.points_delta[user_id] += challenge.reward_points
+
+        return {"user_id": user_id, "action_name": definition.name, "points": points, "timestamp": timestamp}
+
+    def apply(self) -> None:
+        """Write the accumulated points, progress and rollup changes."""
+        database = self.database
+        if self.points_delta:
+            users = models.User.__table__
+            database.execute(
+                update(users)
+                .where(users.c.id == bindparam("uid"))
+                .values(points=users.c.points + bindparam("delta")),
+                [{"uid": user_id, "delta": delta} for user_id, delta in self.points_delta.items()],
+            )
+        if self.progress_delta:
+            table = models.ChallengeProgress.__table__
+            stmt = insert(table)
+            database.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[table.c.user_id, table.c.challenge_id],
+                    set_={"progress": table.c.progress + stmt.excluded.progress},
+                ),
+                [{"user_id": user_id, "challenge_id": challenge_id, "progress": delta}
+                 for (user_id, challenge_id), delta in self.progress_delta.items()],
+            )
+        daily_stats.apply_totals(database, self.rollup)
+
+
+def run(path: str, fmt: Optional[str] = None, chunk_size: int = 50000, dry_run: bool = False,
+        rejects_path: Optional[str] = None, out=sys.stderr) -> dict:
+    """Import a file; returns counters (read, inserted, rejected, seconds)."""
+    db.init_db()
+    database = db.SessionLocal()
+    rejects = open(rejects_path, "w", encoding="utf-8") if rejects_path else None
+    counts = {"read": 0, "inserted": 0, "rejected": 0}
+    started = time.perf_counter()
+
+    def report(final=False):
+        elapsed = time.perf_counter() - started
+        rate = counts["read"] / elapsed if elapsed else 0.0
+        end = "\n" if final else "\r"
+        print(f"{counts['read']:>12,} read {counts['inserted']:>12,} inserted {counts['rejected']:>9,} rejected"
+              f" {rate:>10,.0f} rows/s", end=end, file=out, flush=True)
+
+    try:
+        action_catalog.reload(database)
+        importer = Importer(database)
+        table = models.ActionType.__table__
+        chunk = []
+        for line_no, raw in read_records(path, fmt):
+            counts["read"] += 1
+            record = raw
+            try:
+                record = decode(raw)
+                chunk.append(importer.row(record))
+            except RowError as exc:
+                counts["rejected"] += 1
+                if rejects:
+                    rejects.write(json.dumps({"line": line_no,
+                                              "error": str(exc), "data": record}, default=str) + "\n")
+                continue
+            if len(chunk) >= chunk_size:
+                if not dry_run:
+                    database.execute(table.insert(), chunk)
+                counts["inserted"] += len(chunk)
+                chunk = []
+                report()
+        if chunk and not dry_run:
+            database.execute(table.insert(), chunk)
+        counts["inserted"] += len(chunk)
+
+        if dry_run:
+            database.rollback()
+        else:
+            importer.apply()
+            database.commit()
+        report(final=True)
+    except BaseException:
+        database.rollback()
+        raise
+    finally:
+        database.close()
+        if rejects:
+            rejects.close()
+    counts["seconds"] = round(time.perf_counter() - started, 2)
+    return counts
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk import historical actions from CSV or NDJSON")
+    parser.add_argument("path", help="input file, or - for stdin")
+    parser.add_argument("--format", choices=["csv", "ndjson"], default=None, help="default: from the file extension")
+    parser.add_argument("--chunk-size", type=int, default=50000, help="rows per executemany")
+    parser.add_argument("--rejects", default=None, help="write rejected records here as NDJSON")
+    parser.add_argument("--dry-run", action="store_true", help="validate and count without writing")
+    args = parser.parse_args(argv)
+
+    counts = run(args.path, args.format, args.chunk_size, args.dry_run, args.rejects)
+    verb = "validated" if args.dry_run else "imported"
+    print(f"{verb} {counts['inserted']:,} of {counts['read']:,} records in {counts['seconds']}s "
+          f"({counts['rejected']:,} rejected)")
+    if not args.dry_run and counts["inserted"]:
+        print(f"API leaderboards show the new points within {leaderboard_index.REFRESH_SECONDS:g}s")
+    return 1 if counts["rejected"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,20 +1,166 @@
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-
-SQLALCHEMY_DATABASE_URL = "sqlite:///./eco_action_tracker.db"
-
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base = declarative_base()
-
-
-# Dependency
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+import os
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+
+from backend.app import metrics
+
+SQLALCHEMY_DATABASE_URL = os.getenv("ECO_DATABASE_URL", "sqlite:///./eco_action_tracker.db")
+
+# SQLite tuning per deployment.  "dev" keeps SQLite's defaults and a single
+# engine; the others enable WAL and split reads from the single writer.
+# Each value can be overridden with ECO_DB_<NAME>, e.g. ECO_DB_CACHE_SIZE.
+ENGINE_PROFILES = {
+    "dev": {},
+    "small": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 64 * 1024 * 1024,
+        "cache_size": -16000,          # KiB when negative, i.e. ~16 MB
+        "busy_timeout": 5000,          # ms
+        "read_pool_size": 4,
+    },
+    "production": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -64000,
+        "busy_timeout": 5000,
+        "read_pool_size": 16,
+    },
+}
+
+DB_PROFILE = os.getenv("ECO_DB_PROFILE", "production")
+
+
+def _engine_settings(profile: str) -> dict:
+    if profile not in ENGINE_PROFILES:
+        raise ValueError(f"Unknown ECO_DB_PROFILE {profile!r}; expected one of {sorted(ENGINE_PROFILES)}")
+    settings = dict(ENGINE_PROFILES[profile])
+    for name, value in settings.items():
+        override = os.getenv(f"ECO_DB_{name.upper()}")
+        if override is not None:
+            settings[name] = type(value)(override)
+    return settings
+
+
+ENGINE_SETTINGS = _engine_settings(DB_PROFILE)
+
+
+def _apply_pragmas(dbapi_connection, read_only: bool):
+    cursor = dbapi_connection.cursor()
+    if not read_only and "journal_mode" in ENGINE_SETTINGS:
+        cursor.execute(f"PRAGMA journal_mode={ENGINE_SETTINGS['journal_mode']}")
+    for name in ("synchronous", "mmap_size", "cache_size", "busy_timeout"):
+        if name in ENGINE_SETTINGS:
+            cursor.execute(f"PRAGMA {name}={ENGINE_SETTINGS[name]}")
+    if read_only:
+        cursor.execute("PRAGMA query_only=1")
+    cursor.close()
+
+
+def _read_only_url(url: str) -> str:
+    """The same SQLite file opened through a read-only URI."""
+    path = url[len("sqlite:///"):]
+    return f"sqlite:///file:{path}?mode=ro&uri=true"
+
+
+_is_sqlite_file = SQLALCHEMY_DATABASE_URL.startswith("sqlite:///") and ":memory:" not in SQLALCHEMY_DATABASE_URL
+
+if ENGINE_SETTINGS and _is_sqlite_file:
+    # One serialized writer connection; SQLite only allows one writer anyway
+    engine = create_engine(
+        SQLALCHEMY_DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        poolclass=QueuePool, pool_size=1, max_overflow=0,
+    )
+    read_engine = create_engine(
+        _read_only_url(SQLALCHEMY_DATABASE_URL),
+        connect_args={"check_same_thread": False},
+        poolclass=QueuePool, pool_size=ENGINE_SETTINGS["read_pool_size"], max_overflow=0,
+    )
+    event.listen(engine, "connect", lambda conn, record: _apply_pragmas(conn, read_only=False))
+    event.listen(read_engine, "connect", lambda conn, record: _apply_pragmas(conn, read_only=True))
+else:
+    engine = create_engine(
+        SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+    )
+    read_engine = engine
+
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+Base = declarative_base()
+
+
+def _async_url(url: str) -> str:
+    """The same database through the aiosqlite driver."""
+    if url.startswith("sqlite:"):
+        return "sqlite+aiosqlite:" + url[len("sqlite:"):]
+    return url
+
+
+# Async writer for the write endpoints only: a request queued behind the
+# single writer connection (or SQLite's write lock) awaits instead of holding
+# one of Starlette's threadpool threads.  Reads stay on the sync read_engine;
+# they never wait on the writer and aiosqlite costs more CPU per statement.
+if ENGINE_SETTINGS and _is_sqlite_file:
+    async_engine = create_async_engine(_async_url(SQLALCHEMY_DATABASE_URL), pool_size=1, max_overflow=0)
+    event.listen(async_engine.sync_engine, "connect", lambda conn, record: _apply_pragmas(conn, read_only=False))
+else:
+    async_engine = create_async_engine(_async_url(SQLALCHEMY_DATABASE_URL))
+
+# expire_on_commit=False: attributes read after commit must not trigger a lazy (sync) refresh
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# Statement counts and pool gauges for /metrics; engines shared by the dev profile count once
+_instrumented = [("write", engine), ("async_write", async_engine.sync_engine)]
+if read_engine is not engine:
+    _instrumented.append(("read", read_engine))
+for _label, _engine in _instrumented:
+    metrics.instrument_engine(_engine, _label)
+    metrics.register_pool(_engine, _label)
+
+
+def init_db():
+    """Create missing tables and apply pending migrations.
+    Run from the app lifespan or `python -m backend.app.db`."""
+    from backend.app import models  # noqa: F401  (registers the tables on Base)
+    from backend.app import migrations
+
+    Base.metadata.create_all(bind=engine)
+    migrations.migrate(engine)
+
+
+# Dependency
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+# Dependency for read-only endpoints; never blocks behind the writer
+def get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+# Async dependency, for the `async def` write endpoints
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def dispose_async_engines():
+    """Close pooled aiosqlite connections (and their threads) on shutdown."""
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    init_db()
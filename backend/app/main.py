@@ -1,31 +1,68 @@
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-from backend.app.db import Base, engine
-from backend.app.routers import auth, actions, leaderboard, challenges, carbon, stats
-
-# Create database tables
-Base.metadata.create_all(bind=engine)
-
-app = FastAPI(title="Eco Action Tracker API")
-
-# Allow frontend to communicate with backend
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # You can restrict this later for security
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Routers
-app.include_router(auth.router)
-app.include_router(actions.router)
-app.include_router(leaderboard.router)
-app.include_router(challenges.router)
-app.include_router(carbon.router)
-app.include_router(stats.router)
-
-
-@app.get("/")
-def root():
-    return {"message": "Eco Action Tracker API is running!"}
\ No newline at end of file
+import os
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
+from fastapi.middleware.cors import CORSMiddleware
+from backend.app import metrics
+from backend.app.db import SessionLocal, dispose_async_engines, init_db
+from backend.app.routers import auth, actions, leaderboard, challenges, carbon, stats, plots, analytics, plan
+from backend.app.services import leaderboard_index, carbon_service, action_catalog, passwords, tokens
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Fail now rather than hand out tokens other workers cannot verify
+    tokens.check_secret_key()
+
+    # Create database tables unless the schema is managed out of band
+    if os.getenv("ECO_SKIP_SCHEMA_INIT") != "1":
+        init_db()
+
+    # Build the in-memory leaderboard and action catalog once per worker
+    database = SessionLocal()
+    try:
+        leaderboard_index.load_from_db(database)
+        action_catalog.seed_defaults(database)
+        action_catalog.reload(database)
+    finally:
+        database.close()
+    yield
+    await carbon_service.aclose()
+    await dispose_async_engines()
+    passwords.shutdown()
+
+
+app = FastAPI(title="Eco Action Tracker API", lifespan=lifespan)
+
+# Allow frontend to communicate with backend
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],  # You can restrict this later for security
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+# Outermost, so timings include the other middleware
+if metrics.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+
+# Routers
+app.include_router(auth.router)
+app.include_router(actions.router)
+app.include_router(leaderboard.router)
+app.include_router(challenges.router)
+app.include_router(carbon.router)
+app.include_router(stats.router)
+app.include_router(plots.router)
+app.include_router(analytics.router)
+app.include_router(plan.router)
+
+
+@app.get("/")
+def root():
+    return {"message": "Eco Action Tracker API is running!"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Request, SQL, pool, cache and circuit metrics in Prometheus text format."""
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
@@ -0,0 +1,300 @@
+# backend/app/metrics.py
+"""
+Request and database metrics in Prometheus text format, served at /metrics.
+
+MetricsMiddleware records, per method and route template (e.g.
+"/leaderboard/rank/{username}"), the response status, latency, response
+size, and the number and total time of SQL statements the request ran.  SQL
+is attributed through a context variable set for the request and updated by
+cursor-execute hooks on every engine passed to instrument_engine(); both the
+async write engine and the threadpool routes see it.
+
+Everything is recorded into preallocated per-route bucket arrays with plain
+integer increments and no locks: the middleware and the async engine's hooks
+run on the event loop thread, and the rare update racing in from a
+threadpool thread can at worst drop one increment.  Histograms are
+cumulative only when rendered.
+
+Other modules publish their own state with register_gauge() or
+register_counter() (a callback read at scrape time) or the helpers for the
+common shapes: register_cache() for objects with the usual stats() dict,
+register_circuit() and register_pool().
+
+ECO_METRICS=0 leaves out the middleware and the engine hooks; /metrics
+then only shows the registered gauges.
+"""
+import contextvars
+import math
+import os
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+
+METRICS_ENABLED = os.getenv("ECO_METRICS", "1") != "0"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Histogram bucket upper bounds (a +Inf bucket is implied)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000, 100_000_000)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+SQL_TIME_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+# Requests the router did not match share one label, so scanners cannot grow the series
+UNMATCHED_ROUTE = "unmatched"
+
+# [statements, seconds] of the current request's SQL; None outside requests
+_request_sql: contextvars.ContextVar = contextvars.ContextVar("eco_request_sql", default=None)
+
+
+class Histogram:
+    """Bucket counts for one label set; observe() is a bisect and two adds."""
+
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+class RouteStats:
+    """Everything recorded for one (method, route) pair."""
+
+    __slots__ = ("statuses", "latency", "size", "statements", "sql_seconds")
+
+    def __init__(self):
+        self.statuses: Dict[int, int] = {}
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.size = Histogram(SIZE_BUCKETS)
+        self.statements = Histogram(STATEMENT_BUCKETS)
+        self.sql_seconds = Histogram(SQL_TIME_BUCKETS)
+
+
+_routes: Dict[Tuple[str, str], RouteStats] = {}
+_in_progress = [0]
+# engine label -> [statements, seconds], including SQL run outside requests
+_engines: Dict[str, List[float]] = {}
+# name -> (type, help, [(labels, read)])
+_families: Dict[str, Tuple[str, str, list]] = {}
+
+
+def _route_stats(method: str, route: str) -> RouteStats:
+    stats = _routes.get((method, route))
+    if stats is None:
+        stats = _routes.setdefault((method, route), RouteStats())
+    return stats
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware; streaming responses are timed until their last chunk."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        sql = [0, 0.0]
+        token = _request_sql.set(sql)
+        status = [500]
+        size = [0]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            elif message["type"] == "http.response.body":
+                size[0] += len(message.get("body", b""))
+            await send(message)
+
+        _in_progress[0] += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            _in_progress[0] -= 1
+            _request_sql.reset(token)
+            # The router stores the matched route in the scope
+            route = scope.get("route")
+            stats = _route_stats(scope["method"], getattr(route, "path", None) or UNMATCHED_ROUTE)
+            stats.statuses[status[0]] = stats.statuses.get(status[0], 0) + 1
+            stats.latency.observe(elapsed)
+            stats.size.observe(size[0])
+            stats.statements.observe(sql[0])
+            stats.sql_seconds.observe(sql[1])
+
+
+def instrument_engine(engine, label: str) -> None:
+    """Count statements and SQL time of a (sync) Engine; pass async_engine.sync_engine for async ones."""
+    if not METRICS_ENABLED:
+        return
+    totals = _engines.setdefault(label, [0, 0.0])
+    clock = time.perf_counter
+
+    # The start time rides on the execution context: cheaper than conn.info
+    def before(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_started = clock()
+
+    def after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = clock() - context._metrics_started
+        totals[0] += 1
+        totals[1] += elapsed
+        sql = _request_sql.get()
+        if sql is not None:
+            sql[0] += 1
+            sql[1] += elapsed
+
+    event.listen(engine, "before_cursor_execute", before)
+    event.listen(engine, "after_cursor_execute", after)
+
+
+def _register(kind: str, name: str, description: str, read: Callable, labels: Optional[Dict[str, str]]) -> None:
+    family = _families.setdefault(name, (kind, description, []))
+    if family[0] != kind:
+        raise ValueError(f"metric {name} is already registered as a {family[0]}")
+    family[2].append((dict(labels or {}), read))
+
+
+def register_gauge(name: str, description: str, read: Callable, labels: Optional[Dict[str, str]] = None) -> None:
+    """
+    Publish read() as a gauge.  read() returns a number, or a dict of
+    {extra labels: number} (e.g. {(("state", "open"),): 1}) for several samples.
+    Registering the same name again with other labels adds to the family.
+    """
+    _register("gauge", name, description, read, labels)
+
+
+def register_counter(name: str, description: str, read: Callable, labels: Optional[Dict[str, str]] = None) -> None:
+    """Publish read() as a counter; as register_gauge, but the value must only grow."""
+    _register("counter", name, description, read, labels)
+
+
+def register_cache(name: str, cache, entries: str = "entries", max_entries: str = "max_entries") -> None:
+    """Size and hit/miss counters of a cache whose stats() has entries, max_entries, hits and misses."""
+    labels = {"cache": name}
+    register_gauge("eco_cache_entries", "Entries held by an in-process cache.",
+                   lambda: cache.stats()[entries], labels)
+    register_gauge("eco_cache_max_entries", "Capacity of an in-process cache.",
+                   lambda: cache.stats()[max_entries], labels)
+    register_counter("eco_cache_hits_total", "Cache lookups answered from the cache.",
+                     lambda: cache.stats()["hits"], labels)
+    register_counter("eco_cache_misses_total", "Cache lookups that had to compute the value.",
+                     lambda: cache.stats()["misses"], labels)
+
+
+def register_circuit(breaker) -> None:
+    """State (one sample per state, 1 for the current one) and counters of a CircuitBreaker."""
+    from backend.app.services.circuit_breaker import CLOSED, HALF_OPEN, OPEN
+
+    labels = {"circuit": breaker.name}
+    register_gauge("eco_circuit_state", "Circuit breaker state; 1 for the current state.",
+                   lambda: {(("state", s),): int(breaker.state == s) for s in (CLOSED, OPEN, HALF_OPEN)}, labels)
+    register_counter("eco_circuit_failures_total", "Failed calls recorded by a circuit breaker.",
+                     lambda: breaker.total_failures, labels)
+    register_counter("eco_circuit_rejected_total", "Calls refused while a circuit was open.",
+                     lambda: breaker.total_rejected, labels)
+    register_counter("eco_circuit_opened_total", "Times a circuit breaker opened.",
+                     lambda: breaker.times_opened, labels)
+
+
+def register_pool(engine, label: str) -> None:
+    """Connection counts of an engine's QueuePool (sync engines; use .sync_engine for async ones)."""
+    pool = engine.pool
+    if not hasattr(pool, "checkedout"):
+        return
+    labels = {"engine": label}
+    register_gauge("eco_db_pool_size", "Connections the pool keeps open.", pool.size, labels)
+    register_gauge("eco_db_pool_checked_out", "Connections currently lent out by the pool.", pool.checkedout, labels)
+    register_gauge("eco_db_pool_overflow", "Connections above the pool size (negative: not yet opened).",
+                   pool.overflow, labels)
+
+
+# Rendering ------------------------------------------------------------------
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(pairs) -> str:
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}" if pairs else ""
+
+
+def _number(value) -> str:
+    if isinstance(value, float):
+        if math.isinf(value):
+            return "+Inf" if value > 0 else "-Inf"
+        return repr(value)
+    return str(int(value))
+
+
+def _histogram(lines: List[str], name: str, pairs, histogram: Histogram) -> None:
+    running = 0
+    for bound, count in zip(histogram.bounds, histogram.counts):
+        running += count
+        lines.append(f"{name}_bucket{_labels(pairs + [('le', _number(float(bound)))])} {running}")
+    running += histogram.counts[-1]
+    lines.append(f"{name}_bucket{_labels(pairs + [('le', '+Inf')])} {running}")
+    lines.append(f"{name}_sum{_labels(pairs)} {_number(histogram.sum)}")
+    lines.append(f"{name}_count{_labels(pairs)} {running}")
+
+
+HISTOGRAMS = (
+    ("eco_http_request_duration_seconds", "latency", "Time from request to the last response byte."),
+    ("eco_http_response_size_bytes", "size", "Response body size."),
+    ("eco_http_request_sql_statements", "statements", "SQL statements run per request."),
+    ("eco_http_request_sql_seconds", "sql_seconds", "Time spent in SQL statements per request."),
+)
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format (0.0.4)."""
+    lines: List[str] = []
+    routes = sorted(_routes.items())
+
+    lines += ["# HELP eco_http_requests_total HTTP responses by route and status.",
+              "# TYPE eco_http_requests_total counter"]
+    for (method, route), stats in routes:
+        for status, count in sorted(stats.statuses.items()):
+            pairs = [("method", method), ("route", route), ("status", status)]
+            lines.append(f"eco_http_requests_total{_labels(pairs)} {count}")
+
+    for name, attribute, description in HISTOGRAMS:
+        lines += [f"# HELP {name} {description}", f"# TYPE {name} histogram"]
+        for (method, route), stats in routes:
+            _histogram(lines, name, [("method", method), ("route", route)], getattr(stats, attribute))
+
+    lines += ["# HELP eco_http_requests_in_progress Requests being served.",
+              "# TYPE eco_http_requests_in_progress gauge",
+              f"eco_http_requests_in_progress {_in_progress[0]}"]
+
+    lines += ["# HELP eco_db_statements_total SQL statements executed, in or outside requests.",
+              "# TYPE eco_db_statements_total counter"]
+    lines += [f"eco_db_statements_total{_labels([('engine', label)])} {int(totals[0])}"
+              for label, totals in sorted(_engines.items())]
+    lines += ["# HELP eco_db_statement_seconds_total Time spent executing SQL statements.",
+              "# TYPE eco_db_statement_seconds_total counter"]
+    lines += [f"eco_db_statement_seconds_total{_labels([('engine', label)])} {_number(float(totals[1]))}"
+              for label, totals in sorted(_engines.items())]
+
+    for name, (kind, description, entries) in sorted(_families.items()):
+        lines += [f"# HELP {name} {description}", f"# TYPE {name} {kind}"]
+        for labels, read in entries:
+            pairs = list(labels.items())
+            try:
+                value = read()
+            except Exception:
+                continue  # one failing callback must not break the scrape
+            if isinstance(value, dict):
+                for extra, sample in value.items():
+                    lines.append(f"{name}{_labels(pairs + list(extra))} {_number(sample)}")
+            else:
+                lines.append(f"{name}{_labels(pairs)} {_number(value)}")
+    return "\n".join(lines) + "\n"
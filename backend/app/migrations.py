@@ -0,0 +1,194 @@
+# backend/app/migrations.py
+"""
+Lightweight versioned schema migrations for existing SQLite databases.
+
+create_all only creates missing tables, so indexes and constraints added to
+models.py never reach databases created earlier.  Each migration here has a
+version number; the database's PRAGMA user_version records the last one
+applied, and pending migrations run in order, each in its own transaction.
+Statements are idempotent so they are safe on databases create_all has just
+built with the same indexes.  A statement may also be a callable taking the
+connection, for steps that need Python (e.g. the action catalog).
+
+    python -m backend.app.migrations            # apply pending migrations
+    python -m backend.app.migrations --status   # show current and latest version
+    python -m backend.app.migrations --explain  # verify hot queries use indexes
+"""
+import argparse
+import sys
+from typing import List, Tuple
+
+from sqlalchemy import text
+
+
+def _backfill_daily_stats(conn) -> None:
+    from backend.app.services import daily_stats
+
+    daily_stats.backfill(conn)
+
+
+def _add_action_effort(conn) -> None:
+    from backend.app.services import action_catalog
+
+    columns = {row[1] for row in conn.exec_driver_sql("PRAGMA table_info(action_catalog)")}
+    if not columns or "effort_minutes" in columns:
+        # No catalog table yet (create_all builds it with the column) or already added
+        return
+    conn.exec_driver_sql("ALTER TABLE action_catalog ADD COLUMN effort_minutes INTEGER NOT NULL DEFAULT 1")
+    for action in action_catalog.DEFAULT_ACTIONS:
+        conn.execute(
+            text("UPDATE action_catalog SET effort_minutes = :effort WHERE code = :code"),
+            {"effort": action.effort_minutes, "code": action.code},
+        )
+
+
+MIGRATIONS: List[Tuple[int, str, list]] = [
+    (1, "index action history and leaderboard ordering", [
+        "CREATE INDEX IF NOT EXISTS ix_action_types_user_id_timestamp ON action_types (user_id, timestamp)",
+        "CREATE INDEX IF NOT EXISTS ix_users_points ON users (points)",
+    ]),
+    (2, "one challenge_progress row per user and challenge", [
+        # Fold duplicate rows (from concurrent first logs) into the oldest one
+        """
+        UPDATE challenge_progress
+        SET progress = (
+            SELECT SUM(p.progress) FROM challenge_progress p
+            WHERE p.user_id = challenge_progress.user_id AND p.challenge_id = challenge_progress.challenge_id
+        )
+        WHERE id IN (
+            SELECT MIN(id) FROM challenge_progress GROUP BY user_id, challenge_id HAVING COUNT(*) > 1
+        )
+        """,
+        """
+        DELETE FROM challenge_progress
+        WHERE id NOT IN (SELECT MIN(id) FROM challenge_progress GROUP BY user_id, challenge_id)
+        """,
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_challenge_progress_user_challenge "
+        "ON challenge_progress (user_id, challenge_id)",
+    ]),
+    (3, "daily rollup of action_types for stats", [
+        """
+        CREATE TABLE IF NOT EXISTS user_daily_stats (
+            id INTEGER NOT NULL PRIMARY KEY,
+            user_id INTEGER NOT NULL REFERENCES users (id),
+            day DATE NOT NULL,
+            action_name VARCHAR NOT NULL,
+            points INTEGER NOT NULL,
+            quantity FLOAT NOT NULL,
+            count INTEGER NOT NULL
+        )
+        """,
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_user_daily_stats_user_day_action "
+        "ON user_daily_stats (user_id, day, action_name)",
+        _backfill_daily_stats,
+    ]),
+    (4, "per-unit effort of catalog actions, for the planner", [
+        _add_action_effort,
+    ]),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+# Hot queries and the parameters to plan them with
+HOT_QUERIES = {
+    "stats chart daily points": (
+        "SELECT day, SUM(points) FROM user_daily_stats WHERE user_id = :user_id GROUP BY day ORDER BY day",
+        {"user_id": 1},
+    ),
+    "action history page": (
+        "SELECT id, action_name, points, timestamp FROM action_types WHERE user_id = :user_id "
+        "AND (timestamp, id) < (:timestamp, :id) ORDER BY timestamp DESC, id DESC LIMIT 51",
+        {"user_id": 1, "timestamp": "2100-01-01 00:00:00.000000", "id": 0},
+    ),
+    "latest action for chart cache": (
+        "SELECT MAX(id) FROM action_types WHERE user_id = :user_id",
+        {"user_id": 1},
+    ),
+    "challenge progress for user": (
+        "SELECT challenge_id, progress FROM challenge_progress WHERE user_id = :user_id",
+        {"user_id": 1},
+    ),
+    "progress row for log_action": (
+        "SELECT id, progress FROM challenge_progress WHERE user_id = :user_id AND challenge_id = :challenge_id",
+        {"user_id": 1, "challenge_id": 1},
+    ),
+    "leaderboard top 10": (
+        "SELECT id, username, points FROM users ORDER BY points DESC LIMIT 10",
+        {},
+    ),
+}
+
+
+def current_version(conn) -> int:
+    return conn.exec_driver_sql("PRAGMA user_version").scalar() or 0
+
+
+def migrate(engine=None) -> List[int]:
+    """Apply pending migrations; returns the versions applied."""
+    if engine is None:
+        from backend.app.db import engine
+
+    applied = []
+    with engine.connect() as conn:
+        version = current_version(conn)
+        conn.rollback()
+        for number, _description, statements in MIGRATIONS:
+            if number <= version:
+                continue
+            with conn.begin():
+                for statement in statements:
+                    if callable(statement):
+                        statement(conn)
+                    else:
+                        conn.execute(text(statement))
+                conn.exec_driver_sql(f"PRAGMA user_version = {number}")
+            applied.append(number)
+    return applied
+
+
+def explain(engine=None) -> List[Tuple[str, List[str], bool]]:
+    """(query name, plan lines, uses an index without a temp sort) for each hot query."""
+    if engine is None:
+        from backend.app.db import engine
+
+    results = []
+    with engine.connect() as conn:
+        for name, (sql, params) in HOT_QUERIES.items():
+            rows = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params).fetchall()
+            plan = [row[-1] for row in rows]
+            uses_index = any("USING" in line and "INDEX" in line for line in plan)
+            temp_sort = any("TEMP B-TREE" in line for line in plan)
+            results.append((name, plan, uses_index and not temp_sort))
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Apply or inspect schema migrations")
+    parser.add_argument("--status", action="store_true", help="show the schema version and exit")
+    parser.add_argument("--explain", action="store_true", help="check hot queries use indexes")
+    args = parser.parse_args(argv)
+
+    from backend.app.db import engine, init_db
+
+    if args.status:
+        with engine.connect() as conn:
+            print(f"schema version {current_version(conn)} (latest {LATEST_VERSION})")
+        return 0
+
+    if args.explain:
+        failures = 0
+        for name, plan, ok in explain(engine):
+            print(f"[{'ok' if ok else 'FAIL'}] {name}")
+            for line in plan:
+                print(f"       {line}")
+            failures += not ok
+        return 1 if failures else 0
+
+    init_db()
+    with engine.connect() as conn:
+        print(f"schema at version {current_version(conn)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,52 +1,93 @@
-﻿from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
-from sqlalchemy.orm import relationship
-from datetime import datetime
-from backend.app.db import Base
-
-class User(Base):
-    __tablename__ = "users"
-
-    id = Column(Integer, primary_key=True, index=True)
-    username = Column(String, unique=True, index=True)
-    hashed_password = Column(String)
-    points = Column(Integer, default=0)
-
-    # Link to ActionType
-    actions = relationship("ActionType", back_populates="user")
-    challenges = relationship("ChallengeProgress", back_populates="user")
-
-
-
-class ActionType(Base):
-    __tablename__ = "action_types"
-
-    id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
-    action_name = Column(String)
-    points = Column(Integer)
-    timestamp = Column(DateTime, default=datetime.utcnow)
-
-    user = relationship("User", back_populates="actions")
-
-
-class Challenge(Base):
-    __tablename__ = "challenges"
-
-    id = Column(Integer, primary_key=True, index=True)
-    title = Column(String, unique=True, nullable=False)
-    goal = Column(Integer, nullable=False)
-    reward_points = Column(Integer, nullable=False)
-
-    progress_records = relationship("ChallengeProgress", back_populates="challenge")
-
-
-class ChallengeProgress(Base):
-    __tablename__ = "challenge_progress"
-
-    id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
-    challenge_id = Column(Integer, ForeignKey("challenges.id"))
-    progress = Column(Integer, default=0)
-
-    user = relationship("User", back_populates="challenges")
-    challenge = relationship("Challenge", back_populates="progress_records")
+﻿from sqlalchemy import Column, Integer, String, ForeignKey, Date, DateTime, Float, Index
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from backend.app.db import Base
+
+class User(Base):
+    __tablename__ = "users"
+
+    id = Column(Integer, primary_key=True, index=True)
+    username = Column(String, unique=True, index=True)
+    hashed_password = Column(String)
+    points = Column(Integer, default=0, index=True)
+
+    # Link to ActionType
+    actions = relationship("ActionType", back_populates="user")
+    challenges = relationship("ChallengeProgress", back_populates="user")
+
+
+
+class ActionType(Base):
+    __tablename__ = "action_types"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"))
+    action_name = Column(String)
+    points = Column(Integer)
+    timestamp = Column(DateTime, default=datetime.utcnow)
+
+    user = relationship("User", back_populates="actions")
+
+    __table_args__ = (
+        Index("ix_action_types_user_id_timestamp", "user_id", "timestamp"),
+    )
+
+
+class Challenge(Base):
+    __tablename__ = "challenges"
+
+    id = Column(Integer, primary_key=True, index=True)
+    title = Column(String, unique=True, nullable=False)
+    goal = Column(Integer, nullable=False)
+    reward_points = Column(Integer, nullable=False)
+
+    progress_records = relationship("ChallengeProgress", back_populates="challenge")
+
+
+class ChallengeProgress(Base):
+    __tablename__ = "challenge_progress"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"))
+    challenge_id = Column(Integer, ForeignKey("challenges.id"))
+    progress = Column(Integer, default=0)
+
+    user = relationship("User", back_populates="challenges")
+    challenge = relationship("Challenge", back_populates="progress_records")
+
+    __table_args__ = (
+        Index("uq_challenge_progress_user_challenge", "user_id", "challenge_id", unique=True),
+    )
+
+
+class ActionDefinition(Base):
+    __tablename__ = "action_catalog"
+
+    id = Column(Integer, primary_key=True, index=True)
+    code = Column(String, unique=True, nullable=False)
+    name = Column(String, unique=True, nullable=False)
+    points_per_unit = Column(Integer, nullable=False)
+    unit = Column(String, nullable=False)
+    co2_factor = Column(Float, nullable=False, default=0.0)
+    challenge_title = Column(String, nullable=True)
+    provider_type = Column(String, nullable=False, default="misc")
+    label = Column(String, nullable=True)
+    prompt = Column(String, nullable=True)
+    effort_minutes = Column(Integer, nullable=False, default=1)
+
+
+class UserDailyStat(Base):
+    """Per-user, per-day, per-action totals of action_types, kept in step by the log paths."""
+    __tablename__ = "user_daily_stats"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    day = Column(Date, nullable=False)
+    action_name = Column(String, nullable=False)
+    points = Column(Integer, nullable=False, default=0)
+    quantity = Column(Float, nullable=False, default=0.0)
+    count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index("uq_user_daily_stats_user_day_action", "user_id", "day", "action_name", unique=True),
+    )
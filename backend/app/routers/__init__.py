@@ -1,2 +1,2 @@
-# backend/app/routers/__init__.py
-
+# backend/app/routers/__init__.py
+
@@ -1,86 +1,396 @@
-﻿from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from backend.app import models, schemas, db
-
-router = APIRouter(prefix="/actions", tags=["Actions"])
-
-
-@router.post("/log")
-def log_action(action: schemas.ActionLogRequest, database: Session = Depends(db.get_db)):
-    user = database.query(models.User).filter(models.User.username == action.username).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    # Calculate base points
-    if action.action_name == "Rode a Bike":
-        points = int(10 * action.quantity)
-    elif action.action_name == "Planted a Tree":
-        points = int(20 * action.quantity)
-    elif action.action_name == "Used a Reusable Bag":
-        points = int(5 * action.quantity)
-    elif action.action_name == "Recycled Plastic":
-        points = int(15 * action.quantity)
-    else:
-        raise HTTPException(status_code=400, detail="Invalid action")
-
-    # Log the base action
-    new_action = models.ActionType(
-        user_id=user.id,
-        action_name=action.action_name,
-        points=points
-    )
-    user.points += points
-    database.add(new_action)
-    database.commit()
-    database.refresh(user)
-
-    # --- Challenge tracking ---
-    challenge_map = {
-        "Rode a Bike": "Ride 10 km by bike",
-        "Planted a Tree": "Plant 5 trees",
-        "Used a Reusable Bag": "Use 10 reusable bags",
-        "Recycled Plastic": "Recycle 20 plastics",
-    }
-
-    challenge_title = challenge_map.get(action.action_name)
-    challenge = database.query(models.Challenge).filter(models.Challenge.title == challenge_title).first()
-
-    if challenge:
-        progress = (
-            database.query(models.ChallengeProgress)
-            .filter(
-                models.ChallengeProgress.user_id == user.id,
-                models.ChallengeProgress.challenge_id == challenge.id
-            )
-            .first()
-        )
-
-        if not progress:
-            progress = models.ChallengeProgress(
-                user_id=user.id,
-                challenge_id=challenge.id,
-                progress=0
-            )
-            database.add(progress)
-            database.commit()
-
-        progress.progress += action.quantity
-
-        # Check completion
-        if progress.progress >= challenge.goal:
-            user.points += challenge.reward_points
-            database.commit()
-            return {
-                "message": f"✅ Challenge '{challenge.title}' completed! +{challenge.reward_points} bonus points",
-                "points": user.points,
-                "progress": f"{challenge.goal}/{challenge.goal}",
-            }
-
-        database.commit()
-        return {
-            "message": f"Progress updated: {progress.progress}/{challenge.goal}",
-            "points": user.points,
-            "progress": f"{progress.progress}/{challenge.goal}",
-        }
-
-    return {"message": "✅ Action logged successfully", "points": user.points}
+﻿import base64
+import csv
+import io
+import json
+import re
+from datetime import datetime
+from typing import Literal, Optional
+from urllib.parse import quote
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from backend.app import models, schemas, db
+from backend.app.security import get_admin_user, get_current_user, get_optional_user, is_admin
+from backend.app.services.leaderboard_index import leaderboard_index
+from backend.app.services.chart_cache import chart_cache
+from backend.app.services import action_catalog, challenge_catalog, daily_stats, planner, tokens
+from backend.app.services.tokens import TokenClaims
+
+router = APIRouter(prefix="/actions", tags=["Actions"])
+
+
+@router.post("/log")
+async def log_action(
+    action: schemas.ActionLogRequest,
+    current: TokenClaims = Depends(get_current_user),
+    database: AsyncSession = Depends(db.get_async_db),
+):
+    """
+    Log an action for the signed-in user.
+
+    The user comes from the bearer token, so no lookup by username is needed;
+    the point total is updated and read back in one statement.
+    """
+    if action.username is not None and action.username != current.username:
+        raise HTTPException(status_code=403, detail="Cannot log actions for another user")
+
+    # Calculate base points
+    definition = action_catalog.lookup(action.action_name)
+    if definition is None:
+        raise HTTPException(status_code=400, detail="Invalid action")
+    points = int(definition.points_per_unit * action.quantity)
+
+    # Log the base action, and its daily rollup in the same transaction
+    now = datetime.utcnow()
+    database.add(models.ActionType(
+        user_id=current.user_id,
+        action_name=action.action_name,
+        points=points,
+        timestamp=now
+    ))
+    await database.run_sync(daily_stats.record, current.user_id, now, action.action_name, points, action.quantity)
+    result = {"message": "✅ Action logged successfully"}
+
+    # --- Challenge tracking ---
+    challenge = await database.run_sync(challenge_catalog.find, definition.challenge_title)
+    if challenge:
+        progress = await database.scalar(
+            select(models.ChallengeProgress)
+            .where(
+                models.ChallengeProgress.user_id == current.user_id,
+                models.ChallengeProgress.challenge_id == challenge.id
+            )
+        )
+
+        if not progress:
+            progress = models.ChallengeProgress(
+                user_id=current.user_id,
+                challenge_id=challenge.id,
+                progress=0
+            )
+            database.add(progress)
+
+        progress.progress += action.quantity
+
+        # Check completion
+        if progress.progress >= challenge.goal:
+            points += challenge.reward_points
+            result = {
+                "message": f"✅ Challenge '{challenge.title}' completed! +{challenge.reward_points} bonus points",
+                "progress": f"{challenge.goal}/{challenge.goal}",
+            }
+        else:
+            result = {
+                "message": f"Progress updated: {progress.progress}/{challenge.goal}",
+                "progress": f"{progress.progress}/{challenge.goal}",
+            }
+
+    total = (await database.execute(
+        update(models.User)
+        .where(models.User.id == current.user_id)
+        .values(points=models.User.points + points)
+        .returning(models.User.points)
+    )).scalar_one_or_none()
+    if total is None:
+        await database.rollback()
+        raise HTTPException(status_code=404, detail="User not found")
+    await database.commit()
+
+    leaderboard_index.update(current.user_id, current.username, total)
+    chart_cache.invalidate_user(current.user_id)
+    planner.plan_cache.invalidate_user(current.user_id)
+    result["points"] = total
+    return result
+
+
+@router.post("/log/batch")
+async def log_actions_batch(
+    batch: schemas.ActionLogBatchRequest,
+    current: Optional[TokenClaims] = Depends(get_optional_user),
+    database: AsyncSession = Depends(db.get_async_db),
+):
+    """
+    Log many actions, for one or many users, in a single transaction.
+
+    Each item is attributed to the user in its own `token`, or else to the
+    bearer token of the request.  Users and progress rows are loaded with one
+    query each, challenges come from the in-memory catalog, all point and
+    progress changes are applied in memory, and everything is committed once.
+    Items that fail validation are reported individually and do not abort
+    the rest of the batch.
+    """
+    items = batch.items
+
+    identities = []
+    for item in items:
+        if item.token is None:
+            identities.append((current, "Not authenticated"))
+            continue
+        try:
+            identities.append((tokens.verify(item.token), None))
+        except tokens.InvalidToken as exc:
+            identities.append((None, f"Invalid token: {exc}"))
+
+    user_ids = {claims.user_id for claims, _ in identities if claims is not None}
+    users = {}
+    if user_ids:
+        users = {u.id: u for u in await database.scalars(select(models.User).where(models.User.id.in_(user_ids)))}
+
+    catalog = action_catalog.get()
+    definitions = [catalog.by_name.get(item.action_name) for item in items]
+    titles = {d.challenge_title for d in definitions if d is not None and d.challenge_title}
+    challenges = await database.run_sync(
+        lambda session: {title: challenge_catalog.find(session, title) for title in titles}
+    )
+
+    progress_rows = {}
+    challenge_ids = [c.id for c in challenges.values() if c is not None]
+    if users and challenge_ids:
+        rows = await database.scalars(
+            select(models.ChallengeProgress)
+            .where(
+                models.ChallengeProgress.user_id.in_(list(users)),
+                models.ChallengeProgress.challenge_id.in_(challenge_ids)
+            )
+        )
+        progress_rows = {(p.user_id, p.challenge_id): p for p in rows}
+
+    results = []
+    new_actions = []
+    rollup = []
+    touched_users = {}
+    now = datetime.utcnow()
+    for index, (item, definition, (claims, auth_error)) in enumerate(zip(items, definitions, identities)):
+        if claims is None:
+            results.append({"index": index, "status": "error", "detail": auth_error})
+            continue
+        if item.username is not None and item.username != claims.username:
+            results.append({"index": index, "status": "error", "detail": "Cannot log actions for another user"})
+            continue
+
+        user = users.get(claims.user_id)
+        if not user:
+            results.append({"index": index, "status": "error", "detail": "User not found"})
+            continue
+
+        if definition is None:
+            results.append({"index": index, "status": "error", "detail": "Invalid action"})
+            continue
+        points = int(definition.points_per_unit * item.quantity)
+
+        new_actions.append(models.ActionType(user_id=user.id, action_name=item.action_name, points=points, timestamp=now))
+        rollup.append((user.id, now, item.action_name, points, item.quantity))
+        user.points = (user.points or 0) + points
+        touched_users[user.id] = user
+        result = {"index": index, "status": "ok", "message": "✅ Action logged successfully"}
+
+        challenge = challenges.get(definition.challenge_title)
+        if challenge:
+            progress = progress_rows.get((user.id, challenge.id))
+            if not progress:
+                progress = models.ChallengeProgress(user_id=user.id, challenge_id=challenge.id, progress=0)
+                database.add(progress)
+                progress_rows[(user.id, challenge.id)] = progress
+
+            progress.progress += item.quantity
+
+            if progress.progress >= challenge.goal:
+                user.points += challenge.reward_points
+                result["message"] = f"✅ Challenge '{challenge.title}' completed! +{challenge.reward_points} bonus points"
+                result["progress"] = f"{challenge.goal}/{challenge.goal}"
+            else:
+                result["message"] = f"Progress updated: {progress.progress}/{challenge.goal}"
+                result["progress"] = f"{progress.progress}/{challenge.goal}"
+
+        result["points"] = user.points
+        results.append(result)
+
+    database.add_all(new_actions)
+    await database.run_sync(daily_stats.record_many, rollup)
+    await database.commit()
+
+    for user in touched_users.values():
+        leaderboard_index.update(user.id, user.username, user.points)
+        chart_cache.invalidate_user(user.id)
+        planner.plan_cache.invalidate_user(user.id)
+
+    logged = len(new_actions)
+    return {"logged": logged, "failed": len(items) - logged, "results": results}
+
+
+@router.get("/catalog")
+def get_catalog():
+    """The actions users can log, as compiled in memory."""
+    catalog = action_catalog.get()
+    return {"version": catalog.version, "actions": [a._asdict() for a in catalog.actions]}
+
+
+@router.post("/catalog/reload")
+def reload_catalog(
+    admin: TokenClaims = Depends(get_admin_user),
+    database: Session = Depends(db.get_read_db),
+):
+    """
+    Recompile the action catalog from the action_catalog table without a
+    restart (admins only).  This worker switches at once; the others pick the
+    change up on their next catalog refresh (ACTION_CATALOG_REFRESH seconds).
+    """
+    catalog = action_catalog.reload(database)
+    return {"version": catalog.version, "actions": len(catalog.actions)}
+
+
+def _encode_cursor(timestamp: datetime, action_id: int) -> str:
+    raw = json.dumps([timestamp.isoformat(), action_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def _visible_user_id(database: Session, current: TokenClaims, username: Optional[str]) -> int:
+    """The caller's id, or that of `username` if the caller is an admin."""
+    if username in (None, current.username):
+        return current.user_id
+    if not is_admin(current):
+        raise HTTPException(status_code=403, detail="Cannot read another user's actions")
+    user_id = database.query(models.User.id).filter(models.User.username == username).scalar()
+    if user_id is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user_id
+
+
+def _decode_cursor(cursor: str):
+    try:
+        timestamp, action_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return datetime.fromisoformat(timestamp), int(action_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+@router.get("/history")
+def action_history(
+    username: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    current: TokenClaims = Depends(get_current_user),
+    database: Session = Depends(db.get_read_db),
+):
+    """
+    The signed-in user's actions, newest first, one page at a time.
+
+    Admins may name another user with `username`.  Pages are
+    keyset-paginated on (timestamp, id): pass `next_cursor` back as `cursor`
+    for the next page, so every page costs the same index range scan however
+    deep it is.
+    """
+    user_id = _visible_user_id(database, current, username)
+
+    action = models.ActionType
+    query = database.query(action.id, action.action_name, action.points, action.timestamp).filter(action.user_id == user_id)
+    if cursor:
+        query = query.filter(tuple_(action.timestamp, action.id) < tuple_(*_decode_cursor(cursor)))
+    rows = query.order_by(action.timestamp.desc(), action.id.desc()).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1].timestamp, rows[-1].id)
+    return {
+        "items": [
+            {"id": r.id, "action_name": r.action_name, "points": r.points, "timestamp": r.timestamp}
+            for r in rows
+        ],
+        "next_cursor": next_cursor,
+    }
+
+
+EXPORT_COLUMNS = ("id", "user_id", "username", "action_name", "points", "timestamp")
+# Rows fetched from the server-side cursor, and written to the response, per chunk
+EXPORT_CHUNK_ROWS = 5000
+
+
+def _export_rows(user_id: Optional[int], start: Optional[datetime], end: Optional[datetime]):
+    """Stream action rows in id order through a server-side cursor, one chunk at a time."""
+    action, user = models.ActionType, models.User
+    stmt = (
+        select(action.id, action.user_id, user.username, action.action_name, action.points, action.timestamp)
+        .join(user, user.id == action.user_id)
+        .order_by(action.id)
+    )
+    if user_id is not None:
+        stmt = stmt.where(action.user_id == user_id)
+    if start is not None:
+        stmt = stmt.where(action.timestamp >= start)
+    if end is not None:
+        stmt = stmt.where(action.timestamp <= end)
+
+    # The request's session is closed once the endpoint returns, so the stream
+    # opens its own connection; Core rows skip the ORM's per-row overhead
+    with db.read_engine.connect() as conn:
+        result = conn.execution_options(yield_per=EXPORT_CHUNK_ROWS).execute(stmt)
+        for chunk in result.partitions():
+            yield chunk
+
+
+def _ndjson(chunks):
+    encode = json.JSONEncoder(ensure_ascii=False).encode
+    for chunk in chunks:
+        yield "".join(
+            encode({
+                "id": r[0], "user_id": r[1], "username": r[2], "action_name": r[3], "points": r[4],
+                "timestamp": r[5].isoformat() if r[5] is not None else None,
+            }) + "\n"
+            for r in chunk
+        )
+
+
+def _csv(chunks):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(EXPORT_COLUMNS)
+    for chunk in chunks:
+        writer.writerows(chunk)
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue()
+
+
+def _attachment(filename: str) -> str:
+    """Content-Disposition for a download: an ASCII fallback plus the UTF-8 name (RFC 6266)."""
+    # Header values must be latin-1, and a quote would end the filename early
+    fallback = re.sub(r"[^A-Za-z0-9._-]", "_", filename)
+    return f"attachment; filename=\"{fallback}\"; filename*=UTF-8''{quote(filename, safe='')}"
+
+
+@router.get("/export")
+def export_actions(
+    username: Optional[str] = None,
+    all_users: bool = False,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    current: TokenClaims = Depends(get_current_user),
+    database: Session = Depends(db.get_read_db),
+):
+    """
+    Stream the signed-in user's actions as NDJSON or CSV, optionally within
+    inclusive `from`/`to` bounds.  Admins may export another user's actions
+    with `username`, or everyone's with `all_users=true`.
+
+    Rows come from a server-side cursor in chunks of EXPORT_CHUNK_ROWS and
+    are written out as they arrive, so memory stays flat for any size of dump.
+    """
+    if all_users:
+        if not is_admin(current):
+            raise HTTPException(status_code=403, detail="Admin access required")
+        user_id, name = None, "all"
+    else:
+        user_id = _visible_user_id(database, current, username)
+        name = username or current.username
+
+    chunks = _export_rows(user_id, start, end)
+    headers = {"Content-Disposition": _attachment(f"actions-{name}.{format}")}
+    if format == "csv":
+        return StreamingResponse(_csv(chunks), media_type="text/csv; charset=utf-8", headers=headers)
+    return StreamingResponse(_ndjson(chunks), media_type="application/x-ndjson", headers=headers)
@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from backend.app import db
+from backend.app.services import analytics
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+
+def time_window(
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    days: Optional[int] = Query(None, ge=1, le=3660, description="the last N days, from midnight UTC; overrides from/to"),
+):
+    """Inclusive (from, to) bounds; `days` gives a window that stays cacheable all day."""
+    if days is not None:
+        today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        return today - timedelta(days=days - 1), None
+    if start is not None and end is not None and start > end:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+    return start, end
+
+
+@router.get("/summary")
+def community_summary(window=Depends(time_window), db_session: Session = Depends(db.get_read_db)):
+    """
+    Totals across all users for the window: per action type, CO2 saved,
+    per-user percentiles of points and CO2 saved, and active users.
+    """
+    start, end = window
+    frame = analytics.window_frame(db_session, start, end)
+    return {"from": start, "to": end, **analytics.summary(frame)}
+
+
+@router.get("/users")
+def community_users(
+    window=Depends(time_window),
+    limit: int = Query(50, ge=1, le=1000),
+    sort: Literal["co2_saved_kg", "points", "actions"] = "co2_saved_kg",
+    db_session: Session = Depends(db.get_read_db),
+):
+    """Per-user points, actions and CO2 saved in the window, best first."""
+    start, end = window
+    frame = analytics.window_frame(db_session, start, end)
+    return {"from": start, "to": end, "users": analytics.top_users(frame, limit, sort)}
+
+
+@router.get("/cache")
+def analytics_cache_stats():
+    """Hit/miss counters for the per-window analytics cache."""
+    return analytics.window_cache.stats()
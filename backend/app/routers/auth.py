@@ -1,39 +1,77 @@
-﻿from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from backend.app import models, schemas, db
-from passlib.context import CryptContext
-
-router = APIRouter(prefix="/auth", tags=["auth"])
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-
-@router.post("/register")
-def register(user: schemas.UserCreate, database: Session = Depends(db.get_db)):
-    # ✅ Check password length before hashing
-    if len(user.password.encode("utf-8")) > 72:
-        raise HTTPException(
-            status_code=400,
-            detail="Password error: password cannot be longer than 72 bytes. Please use a shorter password."
-        )
-
-    # ✅ Hash password safely
-    hashed_pw = pwd_context.hash(user.password)
-
-    # ✅ Create new user
-    new_user = models.User(username=user.username, hashed_password=hashed_pw)
-    database.add(new_user)
-    database.commit()
-    database.refresh(new_user)
-
-    return {"message": "User registered successfully", "username": new_user.username}
-
-
-@router.post("/login")
-def login(user: schemas.UserLogin, database: Session = Depends(db.get_db)):
-    # ✅ Retrieve user
-    db_user = database.query(models.User).filter(models.User.username == user.username).first()
-    if not db_user or not pwd_context.verify(user.password, db_user.hashed_password):
-        raise HTTPException(status_code=401, detail="Invalid username or password")
-
-    return {"message": "Login successful", "username": db_user.username}
+﻿from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from backend.app import models, schemas, db
+from backend.app.services.leaderboard_index import leaderboard_index
+from backend.app.services import passwords, tokens
+
+router = APIRouter(prefix="/auth", tags=["auth"])
+
+
+def _password_pool_busy():
+    return HTTPException(
+        status_code=503,
+        detail="Too many sign-ins in progress, please retry shortly.",
+        headers={"Retry-After": "1"},
+    )
+
+
+@router.post("/register")
+async def register(user: schemas.UserCreate, database: AsyncSession = Depends(db.get_async_db)):
+    # ✅ Check password length before hashing
+    if len(user.password.encode("utf-8")) > 72:
+        raise HTTPException(
+            status_code=400,
+            detail="Password error: password cannot be longer than 72 bytes. Please use a shorter password."
+        )
+
+    # ✅ Hash password safely (in the password process pool, awaited off the event loop)
+    try:
+        hashed_pw = await passwords.hash_password_async(user.password)
+    except passwords.PasswordPoolSaturated:
+        raise _password_pool_busy()
+
+    # ✅ Create new user
+    new_user = models.User(username=user.username, hashed_password=hashed_pw)
+    database.add(new_user)
+    await database.commit()
+    await database.refresh(new_user)
+    leaderboard_index.update(new_user.id, new_user.username, new_user.points)
+
+    return {"message": "User registered successfully", "username": new_user.username}
+
+
+@router.post("/login")
+def login(user: schemas.UserLogin, database: Session = Depends(db.get_read_db)):
+    # ✅ Retrieve user
+    db_user = database.query(models.User).filter(models.User.username == user.username).first()
+    if not db_user:
+        raise HTTPException(status_code=401, detail="Invalid username or password")
+    user_id, username, hashed_pw = db_user.id, db_user.username, db_user.hashed_password
+    # Release the read connection while bcrypt runs
+    database.rollback()
+
+    try:
+        valid, new_hash = passwords.verify_password(user.password, hashed_pw)
+    except passwords.PasswordPoolSaturated:
+        raise _password_pool_busy()
+    if not valid:
+        raise HTTPException(status_code=401, detail="Invalid username or password")
+
+    # ✅ Upgrade hashes made with an old bcrypt cost
+    if new_hash:
+        writer = db.SessionLocal()
+        try:
+            writer.query(models.User).filter(models.User.id == user_id).update({"hashed_password": new_hash})
+            writer.commit()
+        finally:
+            writer.close()
+
+    # ✅ Signed token; later requests authenticate without a users lookup
+    return {
+        "message": "Login successful",
+        "username": username,
+        "access_token": tokens.issue(user_id, username),
+        "token_type": "bearer",
+        "expires_in": tokens.TOKEN_TTL_SECONDS,
+    }
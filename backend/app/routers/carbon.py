@@ -1,25 +1,74 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel, Field
-from backend.app.services.carbon_service import estimate_emissions
-
-router = APIRouter(prefix="/carbon", tags=["carbon"])
-
-
-class CarbonEstimateRequest(BaseModel):
-    action_name: str = Field(..., example="Rode a Bike")
-    quantity: float = Field(..., example=1.0)
-
-
-class CarbonEstimateResponse(BaseModel):
-    co2_kg: float
-    source: str
-    detail: dict
-
-
-@router.post("/estimate", response_model=CarbonEstimateResponse)
-def estimate(req: CarbonEstimateRequest):
-    if req.quantity < 0:
-        raise HTTPException(status_code=400, detail="Quantity must be non-negative")
-
-    result = estimate_emissions(req.action_name, req.quantity)
-    return result
+from typing import List
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+from backend.app.services.carbon_service import (
+    estimate_emissions_async,
+    estimate_emissions_batch_async,
+    provider_breaker,
+)
+from backend.app.services.carbon_cache import factor_cache
+
+router = APIRouter(prefix="/carbon", tags=["carbon"])
+
+
+class CarbonEstimateRequest(BaseModel):
+    action_name: str = Field(..., example="Rode a Bike")
+    quantity: float = Field(..., example=1.0)
+
+
+class CarbonEstimateResponse(BaseModel):
+    co2_kg: float
+    source: str
+    detail: dict
+
+
+class CarbonBatchRequest(BaseModel):
+    items: List[CarbonEstimateRequest] = Field(..., min_length=1, max_length=50000)
+
+
+class CarbonBatchResponse(BaseModel):
+    count: int
+    total_co2_kg: float
+    co2_kg: List[float]
+    source: List[str]
+
+
+@router.post("/estimate", response_model=CarbonEstimateResponse)
+async def estimate(req: CarbonEstimateRequest):
+    if req.quantity < 0:
+        raise HTTPException(status_code=400, detail="Quantity must be non-negative")
+
+    result = await estimate_emissions_async(req.action_name, req.quantity)
+    return result
+
+
+@router.post("/estimate/batch", response_model=CarbonBatchResponse)
+async def estimate_batch(req: CarbonBatchRequest):
+    """
+    Estimate many (action_name, quantity) pairs in one call.
+    Results are returned as parallel arrays in request order.
+    """
+    action_names = [item.action_name for item in req.items]
+    quantities = [item.quantity for item in req.items]
+    if min(quantities) < 0:
+        raise HTTPException(status_code=400, detail="Quantity must be non-negative")
+
+    co2, sources = await estimate_emissions_batch_async(action_names, quantities)
+    return {
+        "count": len(co2),
+        "total_co2_kg": round(sum(co2), 4),
+        "co2_kg": co2,
+        "source": sources,
+    }
+
+
+@router.get("/cache")
+def cache_stats():
+    """Hit rate and size of the learned carbon-factor cache."""
+    return factor_cache.stats()
+
+
+@router.get("/circuit")
+def circuit_state():
+    """State of the circuit breaker around the external carbon provider."""
+    return provider_breaker.snapshot()
@@ -1,10 +1,41 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from backend.app import models, db
-
-router = APIRouter(prefix="/leaderboard", tags=["Leaderboard"])
-
-@router.get("/")
-def get_leaderboard(database: Session = Depends(db.get_db)):
-    users = database.query(models.User).order_by(models.User.points.desc()).limit(10).all()
-    return [{"username": u.username, "points": u.points} for u in users]
+from fastapi import APIRouter, Depends, HTTPException, Query
+from starlette.concurrency import run_in_threadpool
+from backend.app.services.leaderboard_index import leaderboard_index, refresh_if_stale
+
+router = APIRouter(prefix="/leaderboard", tags=["Leaderboard"])
+
+# The index lookups are O(log n) in memory, so these run on the event loop
+
+
+async def fresh_index():
+    """The ranked index, reloaded from the DB first (in the threadpool) once it is stale."""
+    if leaderboard_index.stale():
+        await run_in_threadpool(refresh_if_stale)
+    return leaderboard_index
+
+
+@router.get("/")
+async def get_leaderboard(limit: int = Query(10, ge=1, le=100), index=Depends(fresh_index)):
+    """
+    Top users by points, served from the in-memory ranked index.
+    """
+    return [{"username": e["username"], "points": e["points"]} for e in index.top(limit)]
+
+
+@router.get("/rank/{username}")
+async def get_rank(username: str, index=Depends(fresh_index)):
+    entry = index.rank_of(username)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return entry
+
+
+@router.get("/around/{username}")
+async def get_around(username: str, n: int = Query(5, ge=0, le=50), index=Depends(fresh_index)):
+    """
+    The user's own entry plus up to `n` users ranked directly above and below.
+    """
+    entries = index.around(username, n)
+    if entries is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return entries
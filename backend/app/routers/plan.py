@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from backend.app import models, db
+from backend.app.services import planner
+
+router = APIRouter(prefix="/plan", tags=["plan"])
+
+# One week of effort; keeps the knapsack row small enough to solve per request
+MAX_BUDGET_MINUTES = 7 * 24 * 60
+
+
+@router.get("/cache")
+def plan_cache_stats():
+    """Hit/miss counters for the per-user plan cache."""
+    return planner.plan_cache.stats()
+
+
+@router.get("/user/{username}")
+def plan_for_user(
+    username: str,
+    budget: int = Query(60, ge=1, le=MAX_BUDGET_MINUTES, description="effort budget in minutes"),
+    db_session: Session = Depends(db.get_read_db),
+):
+    """
+    Actions and quantities to log within `budget` minutes of effort that earn
+    the most points, counting the bonus of every challenge they would complete.
+    """
+    user_id = db_session.query(models.User.id).filter(models.User.username == username).scalar()
+    if user_id is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return {"username": username, **planner.plan_for_user(db_session, user_id, budget)}
@@ -1,47 +1,70 @@
-# backend/app/routers/plots.py
-from fastapi import APIRouter, Depends, Response, HTTPException
-from sqlalchemy.orm import Session
-from backend.app.db import get_db
-from backend.app import crud
-import matplotlib.pyplot as plt
-import io
-import pandas as pd
-import sqlite3
-import os
-
-router = APIRouter(prefix="/plots", tags=["plots"])
-
-@router.get("/user/{user_id}/points.png")
-def user_points_plot(user_id: int, db: Session = Depends(get_db)):
-    # Query action_records for user via raw SQL to produce a timeseries DataFrame
-    db_url = db.bind.url if hasattr(db, "bind") else None
-    # Use the same SQLite file used by SQLAlchemy engine
-    engine = db.bind
-    if engine is None:
-        raise HTTPException(status_code=500, detail="DB engine not available")
-    with engine.connect() as conn:
-        df = pd.read_sql(
-            "SELECT created_at, points_awarded FROM action_records WHERE user_id = ? ORDER BY created_at",
-            conn,
-            params=[user_id],
-            parse_dates=["created_at"]
-        )
-    if df.empty:
-        # return a simple empty plot indicating no data
-        fig, ax = plt.subplots(figsize=(6,3))
-        ax.text(0.5, 0.5, "No actions logged yet", ha='center', va='center')
-        ax.axis('off')
-    else:
-        df['cumulative'] = df['points_awarded'].cumsum()
-        fig, ax = plt.subplots(figsize=(8,4))
-        ax.plot(df['created_at'], df['cumulative'])
-        ax.set_title("Cumulative Eco Points")
-        ax.set_xlabel("Date")
-        ax.set_ylabel("Points")
-        fig.tight_layout()
-    buf = io.BytesIO()
-    fig.savefig(buf, format="png")
-    plt.close(fig)
-    buf.seek(0)
-    return Response(content=buf.read(), media_type="image/png")
-
+from fastapi import APIRouter, Depends, Response, HTTPException
+from sqlalchemy.orm import Session
+from backend.app.db import get_read_db
+from backend.app import models
+from backend.app.routers.analytics import time_window
+from backend.app.services import analytics, daily_stats
+import io
+
+router = APIRouter(prefix="/plots", tags=["plots"])
+
+
+def _figure(figsize):
+    # A bare Figure, not pyplot: pyplot's global state is not safe across the threadpool.
+    # matplotlib is imported on first use; it costs seconds of import time.
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=figsize)
+    return fig, fig.subplots()
+
+
+def _png(fig) -> Response:
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png")
+    return Response(content=buf.getvalue(), media_type="image/png")
+
+
+@router.get("/user/{user_id}/points.png")
+def user_points_plot(user_id: int, db: Session = Depends(get_read_db)):
+    # Heavy analytics deps are only imported when this route is used
+    import pandas as pd
+
+    if db.get(models.User, user_id) is None:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    # Daily points from the rollup of action_types
+    df = pd.DataFrame(daily_stats.daily_points(db, user_id), columns=["day", "points"])
+    if df.empty:
+        # return a simple empty plot indicating no data
+        fig, ax = _figure((6,3))
+        ax.text(0.5, 0.5, "No actions logged yet", ha='center', va='center')
+        ax.axis('off')
+    else:
+        df['day'] = pd.to_datetime(df['day'])
+        df['cumulative'] = df['points'].cumsum()
+        fig, ax = _figure((8,4))
+        ax.plot(df['day'], df['cumulative'])
+        ax.set_title("Cumulative Eco Points")
+        ax.set_xlabel("Date")
+        ax.set_ylabel("Points")
+        fig.tight_layout()
+    return _png(fig)
+
+
+@router.get("/community/co2.png")
+def community_co2_plot(window=Depends(time_window), db: Session = Depends(get_read_db)):
+    """Bar chart of CO2 saved per action type across all users in the window."""
+    start, end = window
+    by_action = analytics.summary(analytics.window_frame(db, start, end))["by_action"]
+    if not by_action:
+        fig, ax = _figure((6,3))
+        ax.text(0.5, 0.5, "No actions logged yet", ha='center', va='center')
+        ax.axis('off')
+    else:
+        fig, ax = _figure((8,4))
+        ax.barh([row["action_name"] for row in by_action], [row["co2_saved_kg"] for row in by_action])
+        ax.invert_yaxis()
+        ax.set_title("CO2 Saved by Action")
+        ax.set_xlabel("kg CO2")
+        fig.tight_layout()
+    return _png(fig)
@@ -1,54 +1,194 @@
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
-from backend.app import db, models
-import matplotlib
-matplotlib.use("Agg")
-import matplotlib.pyplot as plt
-from io import BytesIO
-from fastapi.responses import Response
-
-router = APIRouter(prefix="/stats", tags=["stats"])
-
-
-@router.get("/user/{username}/chart")
-def user_points_chart(username: str, db_session: Session = Depends(db.get_db)):
-    """
-    Returns a PNG line chart of cumulative points over time for the given user.
-    """
-    user = db_session.query(models.User).filter(models.User.username == username).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    actions = (
-        db_session.query(models.ActionType)
-        .filter(models.ActionType.user_id == user.id)
-        .order_by(models.ActionType.timestamp)
-        .all()
-    )
-
-    fig, ax = plt.subplots(figsize=(8, 4))
-
-    if not actions:
-        ax.text(0.5, 0.5, "No data", ha="center", va="center", fontsize=14)
-        ax.axis("off")
-    else:
-        times = [a.timestamp for a in actions]
-        cumul = []
-        total = 0
-        for a in actions:
-            total += (a.points or 0)
-            cumul.append(total)
-
-        ax.plot(times, cumul, marker="o", linestyle="-")
-        ax.set_title(f"Cumulative Points  {user.username}")
-        ax.set_xlabel("Time")
-        ax.set_ylabel("Points")
-        fig.autofmt_xdate()
-        ax.grid(True)
-
-    buf = BytesIO()
-    fig.tight_layout()
-    fig.savefig(buf, format="png", dpi=100)
-    plt.close(fig)
-    buf.seek(0)
-    return Response(content=buf.getvalue(), media_type="image/png")
+import hashlib
+from datetime import datetime
+from typing import Literal, Optional
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from backend.app import db, models
+from backend.app.security import get_current_user
+from backend.app.services.tokens import TokenClaims
+from backend.app.services import daily_stats
+from backend.app.services.chart_cache import chart_cache
+from io import BytesIO
+from fastapi.responses import JSONResponse, Response
+
+router = APIRouter(prefix="/stats", tags=["stats"])
+
+# Render parameters; part of the chart cache key
+CHART_FIGSIZE = (8, 4)
+CHART_DPI = 100
+# Series longer than this are downsampled (LTTB) before plotting; one point per pixel column
+CHART_MAX_POINTS = CHART_FIGSIZE[0] * CHART_DPI
+
+
+def _cumulative_series(daily):
+    """(datetime64 array, cumulative points array) from (day, points) rows, oldest first."""
+    import numpy as np
+
+    times = np.array([day for day, _ in daily], dtype="datetime64[s]")
+    cumul = np.cumsum(np.fromiter((points or 0 for _, points in daily), dtype=np.int64, count=len(daily)))
+    return times, cumul
+
+
+def _render_points_chart(username: str, times, cumul, max_points: int = CHART_MAX_POINTS) -> bytes:
+    """Plot a cumulative series, downsampled to at most max_points with LTTB."""
+    # A bare Figure, not pyplot: pyplot's global state is not safe across threadpool workers.
+    # matplotlib is imported on first use; it costs seconds of import time.
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=CHART_FIGSIZE)
+    ax = fig.subplots()
+
+    if not len(times):
+        ax.text(0.5, 0.5, "No data", ha="center", va="center", fontsize=14)
+        ax.axis("off")
+    else:
+        from backend.app.services.downsample import lttb_indices
+
+        keep = lttb_indices(times, cumul, max_points)
+
+        ax.plot(times[keep].astype(object), cumul[keep], marker="o", linestyle="-")
+        ax.set_title(f"Cumulative Points  {username}")
+        ax.set_xlabel("Time")
+        ax.set_ylabel("Points")
+        fig.autofmt_xdate()
+        ax.grid(True)
+
+    buf = BytesIO()
+    fig.tight_layout()
+    fig.savefig(buf, format="png", dpi=CHART_DPI)
+    return buf.getvalue()
+
+
+def _latest_action_id(db_session: Session, user_id: int) -> Optional[int]:
+    return (
+        db_session.query(func.max(models.ActionType.id))
+        .filter(models.ActionType.user_id == user_id)
+        .scalar()
+    )
+
+
+def _points_chart_response(db_session: Session, user_id: int, username: str, max_points: int) -> Response:
+    latest_action_id = _latest_action_id(db_session, user_id)
+    cache_key = (user_id, latest_action_id, ("daily", username, CHART_FIGSIZE, CHART_DPI, max_points))
+    png = chart_cache.get(cache_key)
+    if png is None:
+        daily = daily_stats.daily_points(db_session, user_id)
+        # Give the read connection back before the (slow) render
+        db_session.rollback()
+        times, cumul = _cumulative_series(daily)
+        png = _render_points_chart(username, times, cumul, max_points)
+        chart_cache.put(cache_key, png)
+
+    return Response(content=png, media_type="image/png")
+
+
+@router.get("/user/{username}/chart")
+def user_points_chart(
+    username: str,
+    max_points: int = Query(CHART_MAX_POINTS, ge=3, le=10000),
+    db_session: Session = Depends(db.get_read_db),
+):
+    """
+    Returns a PNG line chart of cumulative points over time for the given user.
+    Points come from the daily rollup, one point per active day, reduced to at
+    most `max_points` with LTTB; rendered charts are cached until the user
+    logs another action.
+    """
+    user = db_session.query(models.User).filter(models.User.username == username).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return _points_chart_response(db_session, user.id, user.username, max_points)
+
+
+@router.get("/me/chart")
+def my_points_chart(
+    max_points: int = Query(CHART_MAX_POINTS, ge=3, le=10000),
+    current: TokenClaims = Depends(get_current_user),
+    db_session: Session = Depends(db.get_read_db),
+):
+    """The signed-in user's points chart; the user comes from the token, not a lookup."""
+    return _points_chart_response(db_session, current.user_id, current.username, max_points)
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+def _points_series_response(request: Request, db_session: Session, user_id: int, username: str,
+                            bucket: str, start: Optional[datetime], end: Optional[datetime],
+                            max_points: Optional[int]) -> Response:
+    if start is not None and end is not None and start > end:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+
+    # Actions are append-only, so the newest id versions the user's series
+    latest_action_id = _latest_action_id(db_session, user_id)
+    fingerprint = f"series:1:{user_id}:{latest_action_id}:{bucket}:{start}:{end}:{max_points}"
+    etag = '"' + hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()[:32] + '"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    t, points, counts = daily_stats.bucketed(db_session, user_id, bucket, start, end)
+    if max_points is not None and len(t) > max_points:
+        import numpy as np
+        from backend.app.services.downsample import lttb_indices
+
+        keep = lttb_indices(np.array(t, dtype="datetime64[s]"), np.array(points), max_points)
+        t = [t[i] for i in keep]
+        points = [points[i] for i in keep]
+        counts = [counts[i] for i in keep]
+
+    return JSONResponse(
+        {"username": username, "bucket": bucket, "t": t, "points": points, "count": counts},
+        headers=headers,
+    )
+
+
+@router.get("/user/{username}/series")
+def user_points_series(
+    request: Request,
+    username: str,
+    bucket: Literal["hour", "day", "week", "month"] = "day",
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    max_points: Optional[int] = Query(None, ge=3, le=10000),
+    db_session: Session = Depends(db.get_read_db),
+):
+    """
+    Points and action counts per time bucket, as parallel arrays:
+    {"t": [bucket start, ...], "points": [...], "count": [...]}.
+
+    Aggregated in SQL (from the daily rollup, or action_types for hours);
+    `from`/`to` are inclusive and `max_points` optionally downsamples with
+    LTTB.  Responses carry a strong ETag and If-None-Match returns 304
+    without running the aggregation.
+    """
+    user = db_session.query(models.User.id, models.User.username).filter(models.User.username == username).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return _points_series_response(request, db_session, user.id, user.username, bucket, start, end, max_points)
+
+
+@router.get("/me/series")
+def my_points_series(
+    request: Request,
+    bucket: Literal["hour", "day", "week", "month"] = "day",
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    max_points: Optional[int] = Query(None, ge=3, le=10000),
+    current: TokenClaims = Depends(get_current_user),
+    db_session: Session = Depends(db.get_read_db),
+):
+    """The signed-in user's points series (see /stats/user/{username}/series)."""
+    return _points_series_response(request, db_session, current.user_id, current.username,
+                                   bucket, start, end, max_points)
+
+
+@router.get("/chart-cache")
+def chart_cache_stats():
+    """Hit/miss counters for the rendered chart cache."""
+    return chart_cache.stats()
@@ -0,0 +1,47 @@
+# backend/app/security.py
+import os
+from typing import Optional
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from backend.app.services import tokens
+
+_bearer = HTTPBearer(auto_error=False)
+
+# Usernames allowed to call operator endpoints (catalog reloads, all-user exports).
+# List accounts that already exist, or anyone could register the name.
+ADMIN_USERS = frozenset(name.strip() for name in os.getenv("ECO_ADMIN_USERS", "").split(",") if name.strip())
+
+
+def _claims(credentials: Optional[HTTPAuthorizationCredentials]) -> Optional[tokens.TokenClaims]:
+    if credentials is None:
+        return None
+    try:
+        return tokens.verify(credentials.credentials)
+    except tokens.InvalidToken as exc:
+        raise HTTPException(status_code=401, detail=f"Invalid token: {exc}", headers={"WWW-Authenticate": "Bearer"})
+
+
+# Dependencies are async so verifying a token (no I/O) never takes a threadpool thread
+
+# Dependency: the signed-in user, from the bearer token alone (no DB access)
+async def get_current_user(credentials: Optional[HTTPAuthorizationCredentials] = Depends(_bearer)) -> tokens.TokenClaims:
+    claims = _claims(credentials)
+    if claims is None:
+        raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+    return claims
+
+
+# Dependency: the signed-in user if a bearer token was sent, else None
+async def get_optional_user(credentials: Optional[HTTPAuthorizationCredentials] = Depends(_bearer)) -> Optional[tokens.TokenClaims]:
+    return _claims(credentials)
+
+
+def is_admin(claims: tokens.TokenClaims) -> bool:
+    return claims.username in ADMIN_USERS
+
+
+# Dependency: the signed-in user, who must be listed in ECO_ADMIN_USERS
+async def get_admin_user(current: tokens.TokenClaims = Depends(get_current_user)) -> tokens.TokenClaims:
+    if not is_admin(current):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return current
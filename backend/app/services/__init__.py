@@ -1,2 +1,2 @@
-# backend/app/services/__init__.py
-
+# backend/app/services/__init__.py
+
@@ -0,0 +1,148 @@
+# backend/app/services/action_catalog.py
+"""
+Single source of truth for the eco actions users can log.
+
+Definitions live in the action_catalog table and are compiled into an
+immutable lookup (ActionCatalog) held in memory.  Hot paths call get() and do
+one dict lookup; reload() swaps in a freshly compiled catalog without a
+restart.  The built-in DEFAULT_ACTIONS seed an empty table and serve as the
+catalog until the DB has been read.
+
+Each worker process holds its own copy.  Once loaded from the DB it is
+re-read at most every ACTION_CATALOG_REFRESH seconds (30 by default), so an
+edit or a reload made through one worker reaches the others within that
+window; the version only bumps when the definitions actually changed.
+"""
+import os
+import threading
+import time
+from types import MappingProxyType
+from typing import NamedTuple, Optional, Tuple
+
+# Seconds a DB-loaded catalog is served before the table is read again
+REFRESH_SECONDS = float(os.getenv("ACTION_CATALOG_REFRESH", "30"))
+
+
+class CatalogAction(NamedTuple):
+    """One compiled entry; models.ActionDefinition is the table row it comes from."""
+    code: str
+    name: str                       # display name, also the action_name clients send
+    points_per_unit: int
+    unit: str
+    co2_factor: float               # kg CO2 per unit; negative = saving
+    challenge_title: Optional[str]  # challenge this action progresses, if any
+    provider_type: str              # payload type for the external carbon provider
+    label: str                      # button label in the desktop app
+    prompt: str                     # quantity prompt in the desktop app
+    effort_minutes: int = 1         # rough time one unit takes; the planner's cost
+
+
+DEFAULT_ACTIONS = (
+    CatalogAction("bike", "Rode a Bike", 10, "km", -0.05, "Ride 10 km by bike", "distance",
+                  "🚲 Ride a Bike", "How many kilometers?", 4),
+    CatalogAction("tree", "Planted a Tree", 20, "tree", -21.77, "Plant 5 trees", "misc",
+                  "🌳 Plant a Tree", "How many trees?", 30),
+    CatalogAction("bag", "Used a Reusable Bag", 5, "bag", -0.01, "Use 10 reusable bags", "misc",
+                  "🛍 Use Reusable Bags", "How many bags?", 1),
+    CatalogAction("plastic", "Recycled Plastic", 15, "item", -0.2, "Recycle 20 plastics", "waste",
+                  "♻ Recycle Plastic", "How many plastics?", 1),
+)
+
+
+class ActionCatalog:
+    """Immutable compiled catalog; build a new one instead of mutating."""
+
+    def __init__(self, actions, version: int, loaded_at: Optional[float] = None):
+        self.version = version
+        # time.monotonic() of the DB read; None for the built-in defaults, which are never refreshed
+        self.loaded_at = loaded_at
+        self.actions: Tuple[CatalogAction, ...] = tuple(actions)
+        self.by_name = MappingProxyType({a.name: a for a in self.actions})
+        self.by_code = MappingProxyType({a.code: a for a in self.actions})
+        self._factor_table = None
+
+    def factor_table(self):
+        """(name -> index, co2 factor array) for vectorized estimates.
+
+        Unknown actions map to the last slot, whose factor is 0.0 (neutral)."""
+        if self._factor_table is None:
+            import numpy as np
+
+            index = {a.name: i for i, a in enumerate(self.actions)}
+            factors = np.array([a.co2_factor for a in self.actions] + [0.0], dtype=np.float64)
+            factors.setflags(write=False)
+            self._factor_table = (MappingProxyType(index), factors)
+        return self._factor_table
+
+
+_lock = threading.Lock()
+_refresh_lock = threading.Lock()
+_catalog = ActionCatalog(DEFAULT_ACTIONS, version=0)
+
+
+def get() -> ActionCatalog:
+    catalog = _catalog
+    if catalog.loaded_at is not None and time.monotonic() - catalog.loaded_at >= REFRESH_SECONDS:
+        catalog = _refresh()
+    return catalog
+
+
+def lookup(action_name: str) -> Optional[CatalogAction]:
+    return get().by_name.get(action_name)
+
+
+def _refresh() -> ActionCatalog:
+    # One reader re-reads the (small) table; concurrent readers keep the current copy meanwhile
+    if not _refresh_lock.acquire(blocking=False):
+        return _catalog
+    try:
+        if time.monotonic() - _catalog.loaded_at < REFRESH_SECONDS:
+            return _catalog
+        from backend.app.db import ReadSessionLocal
+
+        database = ReadSessionLocal()
+        try:
+            return reload(database)
+        finally:
+            database.close()
+    finally:
+        _refresh_lock.release()
+
+
+def _row_to_definition(row) -> CatalogAction:
+    return CatalogAction(
+        code=row.code,
+        name=row.name,
+        points_per_unit=row.points_per_unit,
+        unit=row.unit,
+        co2_factor=row.co2_factor,
+        challenge_title=row.challenge_title,
+        provider_type=row.provider_type or "misc",
+        label=row.label or row.name,
+        prompt=row.prompt or f"How many ({row.unit})?",
+        effort_minutes=row.effort_minutes or 1,
+    )
+
+
+def seed_defaults(database) -> None:
+    """Insert the built-in actions into an empty action_catalog table."""
+    from backend.app import models
+
+    if database.query(models.ActionDefinition.id).first() is not None:
+        return
+    database.add_all(models.ActionDefinition(**a._asdict()) for a in DEFAULT_ACTIONS)
+    database.commit()
+
+
+def reload(database) -> ActionCatalog:
+    """Recompile the catalog from the DB and make it current."""
+    from backend.app import models
+
+    global _catalog
+    rows = database.query(models.ActionDefinition).order_by(models.ActionDefinition.id).all()
+    actions = tuple(_row_to_definition(row) for row in rows) or DEFAULT_ACTIONS
+    loaded_at = time.monotonic()
+    with _lock:
+        version = _catalog.version if actions == _catalog.actions else _catalog.version + 1
+        _catalog = ActionCatalog(actions, version=version, loaded_at=loaded_at)
+        return _catalog
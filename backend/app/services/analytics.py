@@ -0,0 +1,187 @@
+# backend/app/services/analytics.py
+"""
+Community-wide analytics over action_types.
+
+One SQL query per time window fetches per-(user, action) point and action
+totals; everything else (quantities and CO2 through the action catalog,
+per-user totals, percentiles, active users) is computed with pandas/NumPy on
+that frame.  Frames are cached per window and keyed on the newest action id,
+so a new action makes later requests recompute while old windows age out.
+
+action_types does not store quantities; they are derived as
+points / points_per_unit, and CO2 as quantity * co2_factor (negative factors
+are savings, reported here as positive co2_saved_kg).
+
+    python -m backend.app.services.analytics --from 2025-01-06 --to 2025-01-12T23:59:59
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional
+
+from backend.app import metrics
+
+PERCENTILES = (50, 75, 90, 95, 99)
+
+_COLUMNS = ["user_id", "username", "action_name", "points", "actions"]
+
+
+class _WindowCache:
+    """Small LRU of per-window frames."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            frame = self._entries.get(key)
+            if frame is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return frame
+
+    def put(self, key, frame) -> None:
+        with self._lock:
+            self._entries[key] = frame
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "max_entries": self.max_entries,
+                    "hits": self.hits, "misses": self.misses}
+
+
+window_cache = _WindowCache(int(os.getenv("ANALYTICS_CACHE_SIZE", "32")))
+metrics.register_cache("analytics_window", window_cache)
+
+
+def _fetch(database, start: Optional[datetime], end: Optional[datetime]):
+    import pandas as pd
+    from sqlalchemy import func, select
+    from backend.app import models
+
+    action, user = models.ActionType, models.User
+    stmt = (
+        select(action.user_id, user.username, action.action_name, func.sum(action.points), func.count(action.id))
+        .join(user, user.id == action.user_id)
+        .group_by(action.user_id, user.username, action.action_name)
+    )
+    if start is not None:
+        stmt = stmt.where(action.timestamp >= start)
+    if end is not None:
+        stmt = stmt.where(action.timestamp <= end)
+    return pd.DataFrame.from_records(database.execute(stmt).all(), columns=_COLUMNS)
+
+
+def window_frame(database, start: Optional[datetime] = None, end: Optional[datetime] = None):
+    """
+    Per-(user, action) totals for the window, both bounds inclusive, with
+    columns user_id, username, action_name, points, actions, quantity,
+    co2_saved_kg.  Cached per (window, newest action id, catalog version).
+    """
+    import numpy as np
+    from sqlalchemy import func
+    from backend.app import models
+    from backend.app.services import action_catalog
+
+    catalog = action_catalog.get()
+    latest_action_id = database.query(func.max(models.ActionType.id)).scalar()
+    key = (start, end, latest_action_id, catalog.version)
+    frame = window_cache.get(key)
+    if frame is not None:
+        return frame
+
+    frame = _fetch(database, start, end)
+    index, factors = catalog.factor_table()
+    unknown = len(factors) - 1
+    codes = frame["action_name"].map(index).fillna(unknown).to_numpy(dtype=np.intp)
+    per_unit = np.array([a.points_per_unit for a in catalog.actions] + [0], dtype=np.float64)[codes]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        quantity = np.where(per_unit > 0, frame["points"].to_numpy(dtype=np.float64) / per_unit, 0.0)
+    frame["quantity"] = quantity
+    frame["co2_saved_kg"] = -factors[codes] * quantity
+
+    window_cache.put(key, frame)
+    return frame
+
+
+def _percentiles(values) -> dict:
+    import numpy as np
+
+    if not len(values):
+        return {f"p{p}": None for p in PERCENTILES}
+    return {f"p{p}": round(float(v), 4) for p, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))}
+
+
+def user_totals(frame):
+    """One row per user: points, actions and CO2 saved in the window."""
+    return (
+        frame.groupby(["user_id", "username"], as_index=False)[["points", "actions", "co2_saved_kg"]]
+        .sum()
+    )
+
+
+def summary(frame) -> dict:
+    """Global totals, per-action totals, per-user percentiles and active users."""
+    by_action = (
+        frame.groupby("action_name", as_index=False)[["points", "actions", "quantity", "co2_saved_kg"]]
+        .sum()
+        .sort_values("co2_saved_kg", ascending=False)
+    )
+    users = user_totals(frame)
+    return {
+        "active_users": int(len(users)),
+        "total_actions": int(frame["actions"].sum()),
+        "total_points": int(frame["points"].sum()),
+        "co2_saved_kg": round(float(frame["co2_saved_kg"].sum()), 4),
+        "by_action": by_action.round({"quantity": 4, "co2_saved_kg": 4}).to_dict("records"),
+        "per_user_points": _percentiles(users["points"].to_numpy()),
+        "per_user_co2_saved_kg": _percentiles(users["co2_saved_kg"].to_numpy()),
+    }
+
+
+def top_users(frame, limit: int = 50, sort: str = "co2_saved_kg") -> list:
+    """Users ranked by `sort` (co2_saved_kg, points or actions) within the window."""
+    users = user_totals(frame).sort_values([sort, "user_id"], ascending=[False, True]).head(limit)
+    return users.round({"co2_saved_kg": 4}).to_dict("records")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Print community analytics for a time window as JSON")
+    parser.add_argument("--from", dest="start", type=datetime.fromisoformat, default=None)
+    parser.add_argument("--to", dest="end", type=datetime.fromisoformat, default=None)
+    parser.add_argument("--top", type=int, default=10, help="number of users to list by CO2 saved")
+    args = parser.parse_args(argv)
+
+    from backend.app.db import ReadSessionLocal
+    from backend.app.services import action_catalog
+
+    database = ReadSessionLocal()
+    try:
+        action_catalog.reload(database)
+        frame = window_frame(database, args.start, args.end)
+        report = {
+            "from": args.start, "to": args.end,
+            **summary(frame),
+            "top_users": top_users(frame, args.top),
+        }
+    finally:
+        database.close()
+    print(json.dumps(report, indent=2, default=str))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+# backend/app/services/carbon_cache.py
+"""
+Memoized per-unit carbon factors learned from the external provider.
+
+Provider estimates are linear in quantity for a given action, so one response
+is enough to answer later estimates for any quantity locally.  Factors expire
+after a TTL, the cache is LRU-bounded, and when CARBON_CACHE_DB is set the
+factors are persisted to a small SQLite file so they survive restarts.
+"""
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from backend.app import metrics
+
+
+class CarbonFactorCache:
+    def __init__(self, ttl_seconds: float = 86400.0, max_entries: int = 1024, db_path: Optional[str] = None):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.db_path = db_path
+        # action_name -> (kg CO2 per unit, learned_at)
+        self._factors: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        self.hits = 0
+        self.misses = 0
+        if db_path:
+            self._open(db_path)
+
+    def _open(self, db_path: str) -> None:
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS carbon_factors ("
+            "action_name TEXT PRIMARY KEY, factor REAL NOT NULL, learned_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+        cutoff = time.time() - self.ttl_seconds
+        rows = self._conn.execute(
+            "SELECT action_name, factor, learned_at FROM carbon_factors WHERE learned_at >= ? "
+            "ORDER BY learned_at DESC LIMIT ?",
+            (cutoff, self.max_entries),
+        ).fetchall()
+        for action_name, factor, learned_at in reversed(rows):
+            self._factors[action_name] = (factor, learned_at)
+
+    def get(self, action_name: str) -> Optional[float]:
+        """The cached factor for an action, or None (counted as a miss)."""
+        with self._lock:
+            entry = self._factors.get(action_name)
+            if entry is not None and time.time() - entry[1] <= self.ttl_seconds:
+                self._factors.move_to_end(action_name)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                del self._factors[action_name]
+            self.misses += 1
+            return None
+
+    def learn(self, action_name: str, quantity: float, co2_kg: float) -> None:
+        """Store the per-unit factor implied by a provider estimate."""
+        if not quantity or quantity <= 0:
+            return
+        factor = float(co2_kg) / float(quantity)
+        learned_at = time.time()
+        with self._lock:
+            self._factors[action_name] = (factor, learned_at)
+            self._factors.move_to_end(action_name)
+            while len(self._factors) > self.max_entries:
+                self._factors.popitem(last=False)
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO carbon_factors (action_name, factor, learned_at) VALUES (?, ?, ?)",
+                    (action_name, factor, learned_at),
+                )
+                self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._factors.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM carbon_factors")
+                self._conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._factors),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "persistent": self._conn is not None,
+            }
+
+
+factor_cache = CarbonFactorCache(
+    ttl_seconds=float(os.getenv("CARBON_CACHE_TTL", "86400")),
+    max_entries=int(os.getenv("CARBON_CACHE_SIZE", "1024")),
+    db_path=os.getenv("CARBON_CACHE_DB") or None,
+)
+metrics.register_cache("carbon_factor", factor_cache)
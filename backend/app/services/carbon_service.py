@@ -1,105 +1,295 @@
-
-import os
-import requests
-from typing import Dict, Any
-
-# Small, human-readable fallback emission factors (kg CO2 per unit)
-_FALLBACK_FACTORS = {
-    "Rode a Bike": {"per_km": -0.05},            # negative = approximate saving vs driving (kg CO2 per km)
-    "Planted a Tree": {"per_tree": -21.77},      # approximate sequestration per year (kg CO2)  illustrative
-    "Used a Reusable Bag": {"per_bag": -0.01},   # tiny per-use saving (kg CO2)  illustrative
-    "Recycled Plastic": {"per_item": -0.2},      # approximate saving per plastic item (kg CO2)
-}
-
-CARBON_INTERFACE_KEY = os.getenv("CARBON_INTERFACE_API_KEY")  # optional real API key
-
-
-def _approximate_estimate(action_name: str, quantity: float) -> Dict[str, Any]:
-    """Return a best-effort local approximation (kg CO2) and metadata."""
-    action = _FALLBACK_FACTORS.get(action_name, {})
-    co2 = 0.0
-    detail = {}
-
-    if action_name == "Rode a Bike":
-        per = action.get("per_km", -0.05)
-        co2 = per * quantity
-        detail = {"unit": "km", "factor_kg_co2_per_unit": per}
-    elif action_name == "Planted a Tree":
-        per = action.get("per_tree", -21.77)
-        co2 = per * quantity
-        detail = {"unit": "tree", "factor_kg_co2_per_unit": per}
-    elif action_name == "Used a Reusable Bag":
-        per = action.get("per_bag", -0.01)
-        co2 = per * quantity
-        detail = {"unit": "bag", "factor_kg_co2_per_unit": per}
-    elif action_name == "Recycled Plastic":
-        per = action.get("per_item", -0.2)
-        co2 = per * quantity
-        detail = {"unit": "item", "factor_kg_co2_per_unit": per}
-    else:
-        # Generic conservative estimate (assume neutral)
-        co2 = 0.0
-        detail = {"note": "no fallback factor for this action"}
-
-    return {
-        "co2_kg": round(co2, 4),
-        "source": "approximate-local",
-        "detail": detail,
-    }
-
-
-def estimate_emissions(action_name: str, quantity: float) -> Dict[str, Any]:
-    """
-    Try to call an external carbon API when configured; otherwise return an approximate local estimate.
-    - Set CARBON_INTERFACE_API_KEY in the environment to enable an external provider.
-    - This function returns a dict with keys: co2_kg, source, detail.
-    """
-    # If a real API key is configured, attempt to call a provider (placeholder).
-    # Here we only include the wiring; you can adapt to Climatiq/Carbon Interface per their docs.
-    if CARBON_INTERFACE_KEY:
-        try:
-            # Example placeholder for Carbon Interface (adapt body to provider docs)
-            url = "https://www.carboninterface.com/api/v1/estimates"
-            headers = {
-                "Authorization": f"Bearer {CARBON_INTERFACE_KEY}",
-                "Content-Type": "application/json",
-            }
-
-            # Build a minimal estimate payload depending on action
-            if action_name == "Rode a Bike":
-                payload = {"type": "distance", "distance": {"value": float(quantity), "unit": "km"}}
-            elif action_name == "Recycled Plastic":
-                payload = {"type": "waste", "weight": {"value": float(quantity), "unit": "kg"}}
-            else:
-                payload = {"type": "misc", "quantity": float(quantity)}
-
-            resp = requests.post(url, json=payload, headers=headers, timeout=8.0)
-            resp.raise_for_status()
-            data = resp.json()
-
-            # Map provider response to our shape  provider shapes differ; adapt as needed.
-            # Try common places for carbon mass values
-            co2 = None
-            if isinstance(data, dict):
-                # Carbon Interface returns 'data' -> 'attributes' -> 'carbon_mt' sometimes
-                if "data" in data and isinstance(data["data"], dict):
-                    attrs = data["data"].get("attributes", {})
-                    co2 = attrs.get("carbon_kg") or attrs.get("carbon_g")
-                    if co2 and attrs.get("carbon_g"):
-                        co2 = attrs.get("carbon_g") / 1000.0
-
-            if co2 is None:
-                # Fallback to local estimate if provider response unexpected
-                return _approximate_estimate(action_name, quantity)
-
-            return {
-                "co2_kg": round(float(co2), 4),
-                "source": "carbon-interface",
-                "detail": {"raw": data},
-            }
-        except Exception:
-            # On any error, fall back to approximate local calculation
-            return _approximate_estimate(action_name, quantity)
-
-    # No external key: return approximate estimate
-    return _approximate_estimate(action_name, quantity)
\ No newline at end of file
+
+import asyncio
+import math
+import os
+import requests
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+from backend.app import metrics
+from backend.app.services import action_catalog
+from backend.app.services.carbon_cache import factor_cache
+from backend.app.services.circuit_breaker import CircuitBreaker
+
+CARBON_INTERFACE_KEY = os.getenv("CARBON_INTERFACE_API_KEY")  # optional real API key
+CARBON_INTERFACE_URL = os.getenv("CARBON_INTERFACE_URL", "https://www.carboninterface.com/api/v1/estimates")
+# Latency budget for one provider call (seconds); slower calls count as failures
+PROVIDER_TIMEOUT = float(os.getenv("CARBON_LATENCY_BUDGET", "2.0"))
+PROVIDER_MAX_CONNECTIONS = int(os.getenv("CARBON_PROVIDER_MAX_CONNECTIONS", "20"))
+# Most distinct actions one batch may look up upstream; the rest wait for a later batch
+BATCH_MAX_PROVIDER_LOOKUPS = int(os.getenv("CARBON_BATCH_MAX_LOOKUPS", str(PROVIDER_MAX_CONNECTIONS)))
+
+# Once tripped, estimates are served locally without waiting on the provider
+provider_breaker = CircuitBreaker(
+    "carbon_provider",
+    failure_threshold=int(os.getenv("CARBON_CIRCUIT_FAILURES", "5")),
+    recovery_timeout=float(os.getenv("CARBON_CIRCUIT_RECOVERY", "30")),
+)
+metrics.register_circuit(provider_breaker)
+
+# Keep-alive connection pools, created on first use
+_session: Optional[requests.Session] = None
+_async_client = None
+
+# Provider calls currently in flight: action_name -> (quantity, future); one per action
+_inflight: Dict[str, Tuple[float, "asyncio.Future"]] = {}
+
+
+def _approximate_estimate(action_name: str, quantity: float) -> Dict[str, Any]:
+    """Return a best-effort local approximation (kg CO2) and metadata."""
+    action = action_catalog.lookup(action_name)
+    if action is not None:
+        co2 = action.co2_factor * quantity
+        detail = {"unit": action.unit, "factor_kg_co2_per_unit": action.co2_factor}
+    else:
+        # Generic conservative estimate (assume neutral)
+        co2 = 0.0
+        detail = {"note": "no fallback factor for this action"}
+
+    return {
+        "co2_kg": round(co2, 4),
+        "source": "approximate-local",
+        "detail": detail,
+    }
+
+
+def approximate_estimates(action_names: Sequence[str], quantities: Sequence[float]):
+    """Vectorized _approximate_estimate: kg CO2 for each (action, quantity) pair."""
+    import numpy as np
+
+    index, factors = action_catalog.get().factor_table()
+    unknown = len(factors) - 1
+    codes = np.fromiter((index.get(name, unknown) for name in action_names), dtype=np.intp, count=len(action_names))
+    return np.round(factors[codes] * np.asarray(quantities, dtype=np.float64), 4)
+
+
+def _provider_request(action_name: str, quantity: float) -> Tuple[Dict[str, str], Dict[str, Any]]:
+    """Headers and payload for the external provider."""
+    headers = {
+        "Authorization": f"Bearer {CARBON_INTERFACE_KEY}",
+        "Content-Type": "application/json",
+    }
+
+    # Build a minimal estimate payload depending on the action's provider type
+    action = action_catalog.lookup(action_name)
+    provider_type = action.provider_type if action is not None else "misc"
+    if provider_type == "distance":
+        payload = {"type": "distance", "distance": {"value": float(quantity), "unit": action.unit}}
+    elif provider_type == "waste":
+        payload = {"type": "waste", "weight": {"value": float(quantity), "unit": "kg"}}
+    else:
+        payload = {"type": "misc", "quantity": float(quantity)}
+    return headers, payload
+
+
+def _parse_provider_response(data: Any) -> Dict[str, Any]:
+    """
+    Map a provider response to our shape; provider shapes differ, adapt as needed.
+    Raises ValueError when the body carries no usable carbon mass.
+    """
+    # Carbon Interface returns 'data' -> 'attributes' -> 'carbon_g' / 'carbon_kg'
+    attrs = data.get("data") if isinstance(data, dict) else None
+    attrs = attrs.get("attributes") if isinstance(attrs, dict) else None
+    if not isinstance(attrs, dict):
+        raise ValueError("provider response has no estimate attributes")
+
+    co2 = None
+    for key, scale in (("carbon_g", 1000.0), ("carbon_kg", 1.0)):
+        value = attrs.get(key)
+        if value is None:
+            continue
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"provider {key} is not a number")
+        co2 = value / scale
+        break
+    # Negative masses are emissions avoided, as in the local factors
+    if co2 is None or not math.isfinite(co2):
+        raise ValueError("provider response has no valid carbon mass")
+
+    return {
+        "co2_kg": round(float(co2), 4),
+        "source": "carbon-interface",
+        # Unrounded, so factors learned from small quantities stay exact
+        "detail": {"raw": data, "carbon_kg": float(co2)},
+    }
+
+
+def _cached_estimate(action_name: str, quantity: float) -> Optional[Dict[str, Any]]:
+    """Answer from a learned per-unit factor, if one is cached."""
+    factor = factor_cache.get(action_name)
+    if factor is None:
+        return None
+    return {
+        "co2_kg": round(factor * float(quantity), 4),
+        "source": "carbon-interface-cached",
+        "detail": {"factor_kg_co2_per_unit": factor},
+    }
+
+
+def _learn(action_name: str, quantity: float, result: Dict[str, Any]) -> Dict[str, Any]:
+    if result["source"] == "carbon-interface":
+        factor_cache.learn(action_name, quantity, result["detail"]["carbon_kg"])
+    return result
+
+
+def _short_circuit(action_name: str, quantity: float) -> Dict[str, Any]:
+    """Local estimate served while the provider circuit is open."""
+    result = _approximate_estimate(action_name, quantity)
+    result["detail"] = dict(result["detail"], circuit=provider_breaker.state)
+    return result
+
+
+def _get_session() -> requests.Session:
+    global _session
+    if _session is None:
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=PROVIDER_MAX_CONNECTIONS)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        _session = session
+    return _session
+
+
+def _get_async_client():
+    global _async_client
+    if _async_client is None:
+        import httpx
+
+        _async_client = httpx.AsyncClient(
+            timeout=PROVIDER_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=PROVIDER_MAX_CONNECTIONS,
+                max_keepalive_connections=PROVIDER_MAX_CONNECTIONS,
+            ),
+        )
+    return _async_client
+
+
+async def aclose() -> None:
+    """Close the pooled async client (called on app shutdown)."""
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+
+
+def estimate_emissions(action_name: str, quantity: float) -> Dict[str, Any]:
+    """
+    Try to call an external carbon API when configured; otherwise return an approximate local estimate.
+    - Set CARBON_INTERFACE_API_KEY in the environment to enable an external provider.
+    - This function returns a dict with keys: co2_kg, source, detail.
+    """
+    if CARBON_INTERFACE_KEY:
+        cached = _cached_estimate(action_name, quantity)
+        if cached is not None:
+            return cached
+        if not provider_breaker.allow_request():
+            return _short_circuit(action_name, quantity)
+        try:
+            headers, payload = _provider_request(action_name, quantity)
+            resp = _get_session().post(CARBON_INTERFACE_URL, json=payload, headers=headers, timeout=PROVIDER_TIMEOUT)
+            resp.raise_for_status()
+            result = _parse_provider_response(resp.json())
+        except Exception:
+            # On any error, unusable bodies included, fall back to approximate local calculation
+            provider_breaker.record_failure()
+            return _approximate_estimate(action_name, quantity)
+        provider_breaker.record_success()
+        return _learn(action_name, quantity, result)
+
+    # No external key: return approximate estimate
+    return _approximate_estimate(action_name, quantity)
+
+
+async def _fetch_async(action_name: str, quantity: float) -> Dict[str, Any]:
+    if not provider_breaker.allow_request():
+        return _short_circuit(action_name, quantity)
+    try:
+        headers, payload = _provider_request(action_name, quantity)
+        resp = await asyncio.wait_for(
+            _get_async_client().post(CARBON_INTERFACE_URL, json=payload, headers=headers),
+            PROVIDER_TIMEOUT,
+        )
+        resp.raise_for_status()
+        result = _parse_provider_response(resp.json())
+    except Exception:
+        provider_breaker.record_failure()
+        return _approximate_estimate(action_name, quantity)
+    provider_breaker.record_success()
+    return _learn(action_name, quantity, result)
+
+
+async def estimate_emissions_async(action_name: str, quantity: float) -> Dict[str, Any]:
+    """
+    Async counterpart of estimate_emissions using a pooled keep-alive client.
+    Concurrent calls for the same (action_name, quantity) share one upstream request.
+    """
+    if not CARBON_INTERFACE_KEY:
+        return _approximate_estimate(action_name, quantity)
+
+    cached = _cached_estimate(action_name, quantity)
+    if cached is not None:
+        return cached
+
+    quantity = float(quantity)
+    pending = _inflight.get(action_name)
+    if pending is not None and pending[0] != quantity:
+        # A pending call for another quantity of this action will teach us its factor
+        await asyncio.shield(pending[1])
+        cached = _cached_estimate(action_name, quantity)
+        if cached is not None:
+            return cached
+        pending = _inflight.get(action_name)
+
+    if pending is not None and pending[0] == quantity:
+        future = pending[1]
+    else:
+        future = asyncio.ensure_future(_fetch_async(action_name, quantity))
+        _inflight[action_name] = (quantity, future)
+
+        def _done(_, future=future):
+            if _inflight.get(action_name, (None, None))[1] is future:
+                del _inflight[action_name]
+
+        future.add_done_callback(_done)
+
+    # Shield so one cancelled caller does not cancel the shared request
+    result = await asyncio.shield(future)
+    return dict(result)
+
+
+async def estimate_emissions_batch_async(action_names: Sequence[str], quantities: Sequence[float]) -> Tuple[List[float], List[str]]:
+    """
+    Estimate many (action, quantity) pairs at once; returns (co2_kg list, source list).
+
+    Locally everything is one vectorized multiply.  With a provider configured,
+    each distinct catalog action without a learned factor costs at most one
+    upstream call (run concurrently, at most BATCH_MAX_PROVIDER_LOOKUPS per
+    batch); its factor is then scaled across the whole batch.  Names outside
+    the catalog never reach the provider.
+    """
+    import numpy as np
+
+    co2 = approximate_estimates(action_names, quantities)
+    sources = np.full(len(co2), "approximate-local", dtype=object)
+    if not CARBON_INTERFACE_KEY or not len(co2):
+        return co2.tolist(), sources.tolist()
+
+    names = np.asarray(action_names, dtype=object)
+    qty = np.asarray(quantities, dtype=np.float64)
+    known = [name for name in dict.fromkeys(action_names) if action_catalog.lookup(name) is not None]
+
+    # Learn missing factors, one representative upstream call per action
+    missing = [name for name in known if factor_cache.get(name) is None][:BATCH_MAX_PROVIDER_LOOKUPS]
+    if missing:
+        first_quantity = {name: q for name, q in zip(reversed(action_names), reversed(quantities)) if q > 0}
+        await asyncio.gather(*(
+            estimate_emissions_async(name, first_quantity[name]) for name in missing if name in first_quantity
+        ))
+
+    for name in known:
+        factor = factor_cache.get(name)
+        if factor is None:
+            continue
+        mask = names == name
+        co2[mask] = np.round(factor * qty[mask], 4)
+        sources[mask] = "carbon-interface-cached"
+    return co2.tolist(), sources.tolist()
@@ -0,0 +1,80 @@
+# backend/app/services/challenge_catalog.py
+"""
+Versioned in-memory copy of the challenges table.
+
+The catalog is read on every challenges screen load but only changes when
+challenges are seeded or edited, so it is loaded once and then reloaded at
+most every CHALLENGE_CATALOG_REFRESH seconds (30 by default).  Seeding and
+edits usually happen in another process (seed_challenges, an admin script),
+so that refresh is how a running server sees them; the version only bumps
+when the rows actually changed.  Writers in this process can call
+invalidate() to see their change straight away.
+"""
+import os
+import threading
+import time
+from collections import namedtuple
+from typing import Optional, Tuple
+
+CatalogEntry = namedtuple("CatalogEntry", ["id", "title", "goal", "reward_points"])
+
+# Seconds a loaded catalog is served before the table is read again
+REFRESH_SECONDS = float(os.getenv("CHALLENGE_CATALOG_REFRESH", "30"))
+
+_lock = threading.Lock()
+# (version, entries, entries by title, loaded at), swapped atomically
+_state = None
+_version = 0
+
+
+def _current(database):
+    state = _state
+    # An empty catalog is not trusted: seeding usually runs in another process.
+    if state is None or not state[1] or time.monotonic() - state[3] >= REFRESH_SECONDS:
+        state = _rebuild(database)
+    return state
+
+
+def get(database) -> Tuple[int, Tuple[CatalogEntry, ...]]:
+    """Return (version, entries), loading the catalog if it is not cached or is stale."""
+    state = _current(database)
+    return state[0], state[1]
+
+
+def find(database, title: Optional[str]) -> Optional[CatalogEntry]:
+    """The challenge with this title, or None."""
+    if title is None:
+        return None
+    return _current(database)[2].get(title)
+
+
+def _rebuild(database):
+    from backend.app import models
+
+    global _state, _version
+    rows = (
+        database.query(
+            models.Challenge.id,
+            models.Challenge.title,
+            models.Challenge.goal,
+            models.Challenge.reward_points,
+        )
+        .order_by(models.Challenge.id)
+        .all()
+    )
+    entries = tuple(CatalogEntry(*row) for row in rows)
+    loaded_at = time.monotonic()
+    with _lock:
+        if _state is None or entries != _state[1]:
+            _version += 1
+            _state = (_version, entries, {e.title: e for e in entries}, loaded_at)
+        else:
+            _state = _state[:3] + (loaded_at,)
+        return _state
+
+
+def invalidate() -> None:
+    """Drop the cached catalog; the next get() reloads it."""
+    global _state
+    with _lock:
+        _state = None
@@ -0,0 +1,115 @@
+# backend/app/services/chart_cache.py
+"""
+Bounded LRU cache of rendered chart PNGs.
+
+Keys are (user_id, latest_action_id, render_params), so a new action never
+hits a stale chart; /actions/log still invalidates the user's entries to free
+memory straight away.  When CHART_CACHE_DIR is set, entries evicted from
+memory are spilled to that directory and read back on a later miss.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Hashable, Optional, Tuple
+
+from backend.app import metrics
+
+ChartKey = Tuple[int, Optional[int], Hashable]
+
+
+class ChartCache:
+    def __init__(self, max_entries: int = 256, spill_dir: Optional[str] = None):
+        self.max_entries = max_entries
+        self.spill_dir = spill_dir
+        self._entries: "OrderedDict[ChartKey, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    def _spill_path(self, key: ChartKey) -> str:
+        digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+        return os.path.join(self.spill_dir, f"u{key[0]}-{digest}.png")
+
+    def get(self, key: ChartKey) -> Optional[bytes]:
+        with self._lock:
+            png = self._entries.get(key)
+            if png is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return png
+
+        if self.spill_dir:
+            try:
+                with open(self._spill_path(key), "rb") as f:
+                    png = f.read()
+            except OSError:
+                png = None
+            if png is not None:
+                with self._lock:
+                    self.hits += 1
+                    self.disk_hits += 1
+                self.put(key, png)
+                return png
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: ChartKey, png: bytes) -> None:
+        evicted = []
+        with self._lock:
+            self._entries[key] = png
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                evicted.append(self._entries.popitem(last=False))
+
+        if self.spill_dir:
+            for old_key, old_png in evicted:
+                try:
+                    with open(self._spill_path(old_key), "wb") as f:
+                        f.write(old_png)
+                except OSError:
+                    pass
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Drop every cached chart for a user, in memory and on disk."""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == user_id]:
+                del self._entries[key]
+
+        if self.spill_dir:
+            prefix = f"u{user_id}-"
+            try:
+                names = os.listdir(self.spill_dir)
+            except OSError:
+                return
+            for name in names:
+                if name.startswith(prefix):
+                    try:
+                        os.remove(os.path.join(self.spill_dir, name))
+                    except OSError:
+                        pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_hits": self.disk_hits,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "spill_dir": self.spill_dir,
+            }
+
+
+chart_cache = ChartCache(
+    max_entries=int(os.getenv("CHART_CACHE_SIZE", "256")),
+    spill_dir=os.getenv("CHART_CACHE_DIR") or None,
+)
+metrics.register_cache("chart", chart_cache)
@@ -0,0 +1,100 @@
+# backend/app/services/circuit_breaker.py
+"""
+Circuit breaker for calls to external services.
+
+closed     calls go through; consecutive failures are counted
+open       calls are refused immediately until recovery_timeout has passed
+half_open  a limited number of probe calls go through; a success closes the
+           circuit, a failure opens it again
+
+Callers ask allow_request() before calling out and must then report the
+outcome with record_success() or record_failure().
+"""
+import threading
+import time
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout: float = 30.0,
+                 half_open_max_calls: int = 1):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self.total_failures = 0
+        self.total_rejected = 0
+        self.times_opened = 0
+
+    def _current_state(self) -> str:
+        # Called with the lock held
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            self._state = HALF_OPEN
+            self._half_open_calls = 0
+        return self._state
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and self._half_open_calls < self.half_open_max_calls:
+                self._half_open_calls += 1
+                return True
+            self.total_rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._half_open_calls = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.total_failures += 1
+            self._failures += 1
+            state = self._current_state()
+            if state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if state != OPEN:
+                    self.times_opened += 1
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+                self._half_open_calls = 0
+
+    def reset(self) -> None:
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._half_open_calls = 0
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            state = self._current_state()
+            retry_in = 0.0
+            if state == OPEN:
+                retry_in = max(self.recovery_timeout - (time.monotonic() - self._opened_at), 0.0)
+            return {
+                "name": self.name,
+                "state": state,
+                "consecutive_failures": self._failures,
+                "failure_threshold": self.failure_threshold,
+                "recovery_timeout": self.recovery_timeout,
+                "retry_in_seconds": round(retry_in, 3),
+                "total_failures": self.total_failures,
+                "total_rejected": self.total_rejected,
+                "times_opened": self.times_opened,
+            }
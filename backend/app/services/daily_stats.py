@@ -0,0 +1,245 @@
+# backend/app/services/daily_stats.py
+"""
+Per-user daily rollup of logged actions (the user_daily_stats table).
+
+Every write to action_types also bumps the matching (user, day, action) row
+here in the same transaction, so stats and charts read O(days) rows instead
+of a user's whole history.  action_types stays the source of truth: backfill()
+rebuilds the rollup from it and check() reports rows that disagree.
+
+action_types does not store quantities, so backfilled quantities are derived
+as points / points_per_unit from the action catalog.
+
+    python -m backend.app.services.daily_stats --backfill   # rebuild from action_types
+    python -m backend.app.services.daily_stats --check      # report inconsistencies
+"""
+import argparse
+import sys
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import text
+
+# action_types aggregated the way the rollup stores it
+_AGGREGATE_SQL = """
+    SELECT a.user_id AS user_id, date(a.timestamp) AS day, a.action_name AS action_name,
+           SUM(a.points) AS points, COUNT(*) AS count
+    FROM action_types a
+    WHERE a.user_id IS NOT NULL AND a.timestamp IS NOT NULL {where}
+    GROUP BY a.user_id, date(a.timestamp), a.action_name
+"""
+
+
+def _upsert_statement():
+    from sqlalchemy.dialects.sqlite import insert
+    from backend.app import models
+
+    table = models.UserDailyStat.__table__
+    stmt = insert(table)
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.day, table.c.action_name],
+        set_={
+            "points": table.c.points + stmt.excluded.points,
+            "quantity": table.c.quantity + stmt.excluded.quantity,
+            "count": table.c.count + stmt.excluded.count,
+        },
+    )
+
+
+def new_totals():
+    """Accumulator for apply_totals: (user_id, day, action_name) -> [points, quantity, count]."""
+    return defaultdict(lambda: [0, 0.0, 0])
+
+
+def apply_totals(database, totals) -> int:
+    """Upsert pre-aggregated totals (see new_totals); returns the rows touched."""
+    if not totals:
+        return 0
+    database.execute(_upsert_statement(), [
+        {"user_id": user_id, "day": day, "action_name": action_name,
+         "points": points, "quantity": quantity, "count": count}
+        for (user_id, day, action_name), (points, quantity, count) in totals.items()
+    ])
+    return len(totals)
+
+
+def record_many(database, entries: Iterable[Tuple[int, datetime, str, int, float]]) -> int:
+    """
+    Add (user_id, timestamp, action_name, points, quantity) entries to the
+    rollup.  Runs on the caller's session so it commits with the actions.
+    Entries for the same row are summed first; returns the rows touched.
+    """
+    totals = new_totals()
+    for user_id, when, action_name, points, quantity in entries:
+        total = totals[(user_id, when.date(), action_name)]
+        total[0] += points or 0
+        total[1] += quantity or 0.0
+        total[2] += 1
+    return apply_totals(database, totals)
+
+
+def record(database, user_id: int, when: datetime, action_name: str, points: int, quantity: float) -> None:
+    """Add one logged action to the rollup (see record_many)."""
+    record_many(database, [(user_id, when, action_name, points, quantity)])
+
+
+def daily_points(database, user_id: int) -> List[Tuple[date, int]]:
+    """(day, points) for each day the user logged something, oldest first."""
+    from sqlalchemy import func
+    from backend.app import models
+
+    stat = models.UserDailyStat
+    return (
+        database.query(stat.day, func.sum(stat.points))
+        .filter(stat.user_id == user_id)
+        .group_by(stat.day)
+        .order_by(stat.day)
+        .all()
+    )
+
+
+BUCKETS = ("hour", "day", "week", "month")
+
+
+def bucketed(database, user_id: int, bucket: str, start: Optional[datetime] = None,
+             end: Optional[datetime] = None) -> Tuple[List[str], List[int], List[int]]:
+    """
+    (bucket starts, points, action counts) for one user, oldest first, with
+    both bounds inclusive.  Day, week (Monday-based) and month buckets are
+    summed from the rollup; hour buckets need timestamps, so they aggregate
+    action_types directly.
+    """
+    from sqlalchemy import func
+    from backend.app import models
+
+    if bucket == "hour":
+        action = models.ActionType
+        label = func.strftime("%Y-%m-%dT%H:00:00", action.timestamp)
+        query = database.query(label, func.sum(action.points), func.count(action.id)).filter(action.user_id == user_id)
+        if start is not None:
+            query = query.filter(action.timestamp >= start)
+        if end is not None:
+            query = query.filter(action.timestamp <= end)
+    else:
+        stat = models.UserDailyStat
+        if bucket == "day":
+            label = func.date(stat.day)
+        elif bucket == "week":
+            label = func.date(stat.day, "weekday 0", "-6 days")
+        elif bucket == "month":
+            label = func.strftime("%Y-%m-01", stat.day)
+        else:
+            raise ValueError(f"Unknown bucket {bucket!r}; expected one of {BUCKETS}")
+        query = database.query(label, func.sum(stat.points), func.sum(stat.count)).filter(stat.user_id == user_id)
+        if start is not None:
+            query = query.filter(stat.day >= start.date())
+        if end is not None:
+            query = query.filter(stat.day <= end.date())
+
+    rows = query.group_by(label).order_by(label).all()
+    return [row[0] for row in rows], [row[1] or 0 for row in rows], [row[2] or 0 for row in rows]
+
+
+def _units_cte(params: dict) -> str:
+    """A VALUES table of points_per_unit from the in-memory action catalog."""
+    from backend.app.services import action_catalog
+
+    rows = []
+    for i, action in enumerate(action_catalog.get().actions):
+        params[f"unit_name_{i}"] = action.name
+        params[f"unit_ppu_{i}"] = action.points_per_unit
+        rows.append(f"(:unit_name_{i}, :unit_ppu_{i})")
+    return "units(name, points_per_unit) AS (VALUES " + ", ".join(rows) + ")"
+
+
+def backfill(conn, user_id: Optional[int] = None) -> int:
+    """
+    Rebuild the rollup from action_types, for one user or everyone.
+    Takes a Connection or Session; the caller commits.  Returns rows written.
+    """
+    params = {}
+    where = ""
+    if user_id is not None:
+        where = "AND a.user_id = :user_id"
+        params["user_id"] = user_id
+    conn.execute(text(f"DELETE FROM user_daily_stats {'WHERE user_id = :user_id' if where else ''}"), params)
+    result = conn.execute(text(f"""
+        INSERT INTO user_daily_stats (user_id, day, action_name, points, quantity, count)
+        WITH {_units_cte(params)}, totals AS ({_AGGREGATE_SQL.format(where=where)})
+        SELECT t.user_id, t.day, t.action_name, t.points,
+               COALESCE(CAST(t.points AS REAL) / NULLIF(u.points_per_unit, 0), 0.0), t.count
+        FROM totals t LEFT JOIN units u ON u.name = t.action_name
+    """), params)
+    return result.rowcount
+
+
+def check(conn, user_id: Optional[int] = None, limit: int = 100) -> List[dict]:
+    """
+    Rollup rows whose points or count disagree with action_types, including
+    rows missing on either side.  Quantities are not compared: they are
+    recorded exactly on the log path but only derived by backfill().
+    """
+    params = {"limit": limit}
+    where = ""
+    if user_id is not None:
+        where = "AND a.user_id = :user_id"
+        params["user_id"] = user_id
+    stats_where = "WHERE s.user_id = :user_id" if user_id is not None else ""
+    rows = conn.execute(text(f"""
+        WITH totals AS ({_AGGREGATE_SQL.format(where=where)}),
+        stats AS (SELECT user_id, day, action_name, points, count FROM user_daily_stats s {stats_where}),
+        joined AS (
+            SELECT t.user_id, t.day, t.action_name, t.points AS expected_points, t.count AS expected_count,
+                   s.points AS rollup_points, s.count AS rollup_count
+            FROM totals t LEFT JOIN stats s
+              ON s.user_id = t.user_id AND s.day = t.day AND s.action_name = t.action_name
+            UNION ALL
+            SELECT s.user_id, s.day, s.action_name, NULL, NULL, s.points, s.count
+            FROM stats s LEFT JOIN totals t
+              ON s.user_id = t.user_id AND s.day = t.day AND s.action_name = t.action_name
+            WHERE t.user_id IS NULL
+        )
+        SELECT * FROM joined
+        WHERE expected_points IS NOT rollup_points OR expected_count IS NOT rollup_count
+        ORDER BY user_id, day, action_name
+        LIMIT :limit
+    """), params)
+    return [dict(row._mapping) for row in rows]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Maintain the user_daily_stats rollup")
+    parser.add_argument("--backfill", action="store_true", help="rebuild the rollup from action_types")
+    parser.add_argument("--check", action="store_true", help="report rows that disagree with action_types")
+    parser.add_argument("--user-id", type=int, default=None, help="limit to one user")
+    args = parser.parse_args(argv)
+    if not (args.backfill or args.check):
+        parser.error("nothing to do; pass --backfill and/or --check")
+
+    from backend.app.db import SessionLocal, init_db
+    from backend.app.services import action_catalog
+
+    init_db()
+    database = SessionLocal()
+    try:
+        action_catalog.reload(database)
+        if args.backfill:
+            written = backfill(database, args.user_id)
+            database.commit()
+            print(f"backfilled {written} rollup rows")
+        if args.check:
+            problems = check(database, args.user_id)
+            for row in problems:
+                print(f"  user {row['user_id']} {row['day']} {row['action_name']!r}: "
+                      f"action_types {row['expected_points']} pts / {row['expected_count']} actions, "
+                      f"rollup {row['rollup_points']} pts / {row['rollup_count']} actions")
+            print(f"{len(problems)} inconsistent rollup rows" + (" (truncated)" if len(problems) >= 100 else ""))
+            return 1 if problems else 0
+    finally:
+        database.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+# backend/app/services/downsample.py
+"""
+Reduce long (x, y) series to a bounded number of points before plotting.
+
+lttb_indices() implements Largest-Triangle-Three-Buckets: the first and last
+points are kept and each bucket in between contributes the point forming the
+largest triangle with the previous pick and the next bucket's mean, which
+preserves peaks and the overall shape.
+
+It returns sorted indices into the input, so callers can pick from any
+parallel sequences (dates, labels) without converting them to numbers.
+"""
+import numpy as np
+
+
+def _as_float(values) -> np.ndarray:
+    array = np.asarray(values)
+    if np.issubdtype(array.dtype, np.datetime64):
+        return array.astype("datetime64[s]").astype(np.float64)
+    if array.dtype == object:
+        # datetime/date objects
+        return np.asarray(array.astype("datetime64[s]"), dtype=np.float64)
+    return array.astype(np.float64, copy=False)
+
+
+def lttb_indices(x, y, max_points: int) -> np.ndarray:
+    """Indices of at most `max_points` points chosen by LTTB (max_points >= 3)."""
+    n = len(y)
+    if max_points >= n or n <= 2:
+        return np.arange(n)
+    if max_points < 3:
+        raise ValueError("max_points must be at least 3")
+
+    xs = _as_float(x)
+    ys = _as_float(y)
+
+    # Bucket edges over the interior points 1 .. n-2
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.intp)
+    starts, ends = edges[:-1], edges[1:]
+
+    # Mean of every bucket, vectorized; the "next bucket" of the last one is the last point
+    sums_x = np.add.reduceat(xs[:-1], starts)
+    sums_y = np.add.reduceat(ys[:-1], starts)
+    counts = ends - starts
+    mean_x = np.append(sums_x / counts, xs[-1])
+    mean_y = np.append(sums_y / counts, ys[-1])
+
+    picked = np.empty(max_points, dtype=np.intp)
+    picked[0] = 0
+    picked[-1] = n - 1
+    prev = 0
+    for i, (start, end) in enumerate(zip(starts, ends)):
+        # Twice the triangle area (prev, candidate, next bucket mean); the constant factor is irrelevant
+        area = np.abs(
+            (xs[prev] - mean_x[i + 1]) * (ys[start:end] - ys[prev])
+            - (xs[prev] - xs[start:end]) * (mean_y[i + 1] - ys[prev])
+        )
+        prev = start + int(np.argmax(area))
+        picked[i + 1] = prev
+    return picked
+
@@ -0,0 +1,261 @@
+# backend/app/services/leaderboard_index.py
+"""
+In-process ranked leaderboard.
+
+Users are kept in an indexable skip list ordered by (points desc, id asc), so
+top-N, rank-of-user and "users around me" are O(log n) and never touch SQLite.
+The index is loaded at startup (see main.py) and kept current by the write
+paths in this process that change User.points.
+
+Each worker process holds its own copy, so changes made by other workers or
+by bulk_import only arrive when it is reloaded: readers call
+refresh_if_stale(), which rebuilds it from the DB at most every
+LEADERBOARD_REFRESH seconds (30 by default).
+"""
+import os
+import random
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+_MAX_LEVELS = 32
+
+# Seconds a loaded index is served before the users table is read again
+REFRESH_SECONDS = float(os.getenv("LEADERBOARD_REFRESH", "30"))
+
+
+class _Node:
+    __slots__ = ("key", "next", "width")
+
+    def __init__(self, key, levels: int):
+        self.key = key
+        self.next = [None] * levels
+        self.width = [1] * levels
+
+
+class IndexableSkipList:
+    """
+    Skip list with per-link widths, giving O(log n) insert, remove,
+    rank-of-key and item-at-position.  Keys must be unique and comparable.
+    """
+
+    def __init__(self):
+        self.head = _Node(None, _MAX_LEVELS)
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def _random_levels(self) -> int:
+        levels = 1
+        while levels < _MAX_LEVELS and random.random() < 0.5:
+            levels += 1
+        return levels
+
+    def insert(self, key):
+        chain = [None] * _MAX_LEVELS
+        steps_at_level = [0] * _MAX_LEVELS
+        node = self.head
+        for level in reversed(range(_MAX_LEVELS)):
+            while node.next[level] is not None and node.next[level].key < key:
+                steps_at_level[level] += node.width[level]
+                node = node.next[level]
+            chain[level] = node
+
+        levels = self._random_levels()
+        new_node = _Node(key, levels)
+        steps = 0
+        for level in range(levels):
+            prev = chain[level]
+            new_node.next[level] = prev.next[level]
+            prev.next[level] = new_node
+            new_node.width[level] = prev.width[level] - steps
+            prev.width[level] = steps + 1
+            steps += steps_at_level[level]
+        for level in range(levels, _MAX_LEVELS):
+            chain[level].width[level] += 1
+        self.size += 1
+
+    def remove(self, key):
+        chain = [None] * _MAX_LEVELS
+        node = self.head
+        for level in reversed(range(_MAX_LEVELS)):
+            while node.next[level] is not None and node.next[level].key < key:
+                node = node.next[level]
+            chain[level] = node
+
+        target = chain[0].next[0]
+        if target is None or target.key != key:
+            raise KeyError(key)
+
+        levels = len(target.next)
+        for level in range(levels):
+            prev = chain[level]
+            prev.width[level] += target.width[level] - 1
+            prev.next[level] = target.next[level]
+        for level in range(levels, _MAX_LEVELS):
+            chain[level].width[level] -= 1
+        self.size -= 1
+
+    def rank(self, key) -> int:
+        """0-based position of an existing key."""
+        position = 0
+        node = self.head
+        for level in reversed(range(_MAX_LEVELS)):
+            while node.next[level] is not None and node.next[level].key <= key:
+                position += node.width[level]
+                node = node.next[level]
+        if node is self.head or node.key != key:
+            raise KeyError(key)
+        return position - 1
+
+    def slice(self, start: int, count: int) -> list:
+        """Up to `count` keys starting at 0-based position `start`."""
+        if start < 0:
+            start = 0
+        if count <= 0 or start >= self.size:
+            return []
+        node = self.head
+        remaining = start + 1
+        for level in reversed(range(_MAX_LEVELS)):
+            while node.next[level] is not None and node.width[level] <= remaining:
+                remaining -= node.width[level]
+                node = node.next[level]
+        result = []
+        while node is not None and len(result) < count:
+            result.append(node.key)
+            node = node.next[0]
+        return result
+
+
+class LeaderboardIndex:
+    """Thread-safe ranked view of users keyed on (-points, user_id)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ranks = IndexableSkipList()
+        self._users: Dict[int, Tuple[str, int]] = {}
+        self._ids_by_username: Dict[str, int] = {}
+        # update() calls since the last load, with when they happened
+        self._recent: Dict[int, Tuple[str, int, float]] = {}
+        self.loaded = False
+        self.loaded_at = 0.0
+
+    def load(self, rows, as_of: Optional[float] = None) -> None:
+        """Rebuild from an iterable of (user_id, username, points).
+
+        `as_of` is the time.monotonic() at which the rows were read; updates
+        made after it are newer than the rows and are applied on top."""
+        with self._lock:
+            self._ranks = IndexableSkipList()
+            self._users = {}
+            self._ids_by_username = {}
+            for user_id, username, points in rows:
+                points = points or 0
+                self._users[user_id] = (username, points)
+                self._ids_by_username[username] = user_id
+                self._ranks.insert((-points, user_id))
+            recent, self._recent = self._recent, {}
+            if as_of is not None:
+                for user_id, (username, points, at) in recent.items():
+                    if at >= as_of:
+                        self._move(user_id, username, points)
+            self.loaded = True
+            self.loaded_at = time.monotonic() if as_of is None else as_of
+
+    def stale(self) -> bool:
+        return not self.loaded or time.monotonic() - self.loaded_at >= REFRESH_SECONDS
+
+    def update(self, user_id: int, username: str, points: int) -> None:
+        """Insert a user or move them to their new point total."""
+        points = points or 0
+        with self._lock:
+            self._recent[user_id] = (username, points, time.monotonic())
+            self._move(user_id, username, points)
+
+    def _move(self, user_id: int, username: str, points: int) -> None:
+        # Caller holds the lock
+        current = self._users.get(user_id)
+        if current is not None:
+            if current[1] == points and current[0] == username:
+                return
+            self._ranks.remove((-current[1], user_id))
+            if current[0] != username:
+                self._ids_by_username.pop(current[0], None)
+        self._users[user_id] = (username, points)
+        self._ids_by_username[username] = user_id
+        self._ranks.insert((-points, user_id))
+
+    def _entries(self, keys, first_rank: int) -> List[dict]:
+        return [
+            {"rank": first_rank + i, "username": self._users[user_id][0], "points": -neg_points}
+            for i, (neg_points, user_id) in enumerate(keys)
+        ]
+
+    def top(self, n: int) -> List[dict]:
+        with self._lock:
+            return self._entries(self._ranks.slice(0, n), 1)
+
+    def rank_of(self, username: str) -> Optional[dict]:
+        """1-based rank of a user, or None if unknown."""
+        with self._lock:
+            user_id = self._ids_by_username.get(username)
+            if user_id is None:
+                return None
+            points = self._users[user_id][1]
+            return {
+                "rank": self._ranks.rank((-points, user_id)) + 1,
+                "username": username,
+                "points": points,
+                "total_users": len(self._ranks),
+            }
+
+    def around(self, username: str, n: int) -> Optional[List[dict]]:
+        """The user plus up to `n` neighbours on either side, or None if unknown."""
+        with self._lock:
+            user_id = self._ids_by_username.get(username)
+            if user_id is None:
+                return None
+            points = self._users[user_id][1]
+            position = self._ranks.rank((-points, user_id))
+            start = max(position - n, 0)
+            keys = self._ranks.slice(start, position - start + n + 1)
+            return self._entries(keys, start + 1)
+
+    def __len__(self):
+        return len(self._ranks)
+
+
+leaderboard_index = LeaderboardIndex()
+
+
+_refresh_lock = threading.Lock()
+
+
+def load_from_db(database) -> None:
+    """Populate the shared index from the users table."""
+    from backend.app import models
+
+    as_of = time.monotonic()
+    rows = database.query(models.User.id, models.User.username, models.User.points).all()
+    leaderboard_index.load(rows, as_of)
+
+
+def refresh_if_stale() -> None:
+    """Reload the index if it is older than REFRESH_SECONDS.  Blocking: run it off the event loop."""
+    if not leaderboard_index.stale():
+        return
+    # One reload at a time; concurrent readers are served the current copy meanwhile
+    if not _refresh_lock.acquire(blocking=False):
+        return
+    try:
+        if leaderboard_index.stale():
+            from backend.app.db import ReadSessionLocal
+
+            database = ReadSessionLocal()
+            try:
+                load_from_db(database)
+            finally:
+                database.close()
+    finally:
+        _refresh_lock.release()
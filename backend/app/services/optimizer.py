@@ -1,30 +1,225 @@
-# backend/app/services/optimizer.py
-from typing import List, Tuple
-
-def knapsack_0_1(values: List[int], costs: List[int], budget: int) -> Tuple[int, List[int]]:
-    """
-    Classic 0/1 knapsack dynamic programming.
-    Returns (max_value, indices_of_selected_items)
-    """
-    n = len(values)
-    if n == 0:
-        return 0, []
-    dp = [[0]*(budget+1) for _ in range(n+1)]
-    for i in range(1, n+1):
-        v = values[i-1]; c = costs[i-1]
-        for b in range(budget+1):
-            dp[i][b] = dp[i-1][b]
-            if c <= b:
-                val = dp[i-1][b-c] + v
-                if val > dp[i][b]:
-                    dp[i][b] = val
-    # reconstruct selection
-    res = []
-    b = budget
-    for i in range(n, 0, -1):
-        if dp[i][b] != dp[i-1][b]:
-            res.append(i-1)
-            b -= costs[i-1]
-    res.reverse()
-    return dp[n][budget], res
-
+# backend/app/services/optimizer.py
+"""
+Knapsack solvers: pick items maximising total value within a cost budget.
+
+All solvers return (max_value, indices_of_selected_items) with indices in
+ascending order; the bounded and unbounded variants repeat an index once per
+copy taken.
+
+The dynamic programme keeps a single NumPy row of best values per budget,
+updated with one vectorized np.maximum-style step per item, plus one
+bit-packed row of take/skip decisions per item for reconstruction, so memory
+is n * budget / 8 bytes instead of a full table of Python ints.  When that
+would be too large (huge budgets), a branch-and-bound search with a
+fractional upper bound is used instead.  It is exact unless it exhausts its
+node budget, in which case it returns the best selection found so far, which
+is never worse than the greedy fill by value density.
+"""
+import os
+from typing import List, Optional, Sequence, Tuple
+
+# Largest DP the vectorized engine runs: decision bits (n * (budget + 1)) and row length
+DP_MAX_CELLS = 256_000_000      # 32 MB of packed decisions
+DP_MAX_BUDGET = 4_000_000       # 32 MB int64 value row
+# Nodes the branch-and-bound search may expand before settling for the best found so far
+BNB_MAX_NODES = int(os.getenv("KNAPSACK_MAX_NODES", "200000"))
+
+
+def _check(values: Sequence, costs: Sequence, budget: int) -> None:
+    if len(values) != len(costs):
+        raise ValueError("values and costs must have the same length")
+    if budget < 0:
+        raise ValueError("budget must not be negative")
+    if any(c < 0 for c in costs):
+        raise ValueError("costs must not be negative")
+
+
+def _dtype(values):
+    import numpy as np
+
+    return np.float64 if any(isinstance(v, float) for v in values) else np.int64
+
+
+def _dp_0_1(values: Sequence, costs: Sequence, budget: int) -> Tuple[int, List[int]]:
+    """Vectorized 0/1 DP over a rolling 1-D row with a bit-packed decision matrix."""
+    import numpy as np
+
+    n = len(values)
+    best = np.zeros(budget + 1, dtype=_dtype(values))
+    decisions = np.zeros((n, (budget + 8) // 8), dtype=np.uint8)
+    taken = np.zeros(budget + 1, dtype=bool)
+    for i, (v, c) in enumerate(zip(values, costs)):
+        if c > budget or v <= 0:
+            continue
+        # best[b - c] + v for every b >= c, from the previous row (a fresh array)
+        candidate = best[: budget + 1 - c] + v
+        better = candidate > best[c:]
+        if not better.any():
+            continue
+        np.copyto(best[c:], candidate, where=better)
+        taken[:c] = False
+        taken[c:] = better
+        decisions[i] = np.packbits(taken)
+
+    # Walk back from the full budget, unpacking one decision bit per item
+    selected = []
+    b = budget
+    for i in range(n - 1, -1, -1):
+        if decisions[i, b >> 3] & (0x80 >> (b & 7)):
+            selected.append(i)
+            b -= costs[i]
+    selected.reverse()
+    return best[budget].item(), selected
+
+
+def _branch_and_bound(values: Sequence, costs: Sequence, budget: int,
+                      max_nodes: Optional[int] = None) -> Tuple[int, List[int]]:
+    """
+    Depth-first branch-and-bound for budgets too large for the DP.
+    Items are explored by value density; a branch is pruned when its
+    fractional-relaxation bound cannot beat the best solution found.
+    After max_nodes (default BNB_MAX_NODES) expansions the best selection
+    so far is returned; it starts as the greedy fill.
+    """
+    free = [i for i, (v, c) in enumerate(zip(values, costs)) if c == 0 and v > 0]
+    items = sorted(
+        (i for i, (v, c) in enumerate(zip(values, costs)) if 0 < c <= budget and v > 0),
+        key=lambda i: values[i] / costs[i],
+        reverse=True,
+    )
+    base = sum(values[i] for i in free)
+    vals = [values[i] for i in items]
+    cost = [costs[i] for i in items]
+    n = len(items)
+
+    def bound(k: int, value, room: int) -> float:
+        for j in range(k, n):
+            if cost[j] <= room:
+                room -= cost[j]
+                value += vals[j]
+            else:
+                return value + vals[j] * room / cost[j]
+        return value
+
+    # Chosen items are a (k, parent) chain, so a push never copies the selection
+    best_value, best_chosen, room = 0, None, budget
+    for k in range(n):
+        if cost[k] <= room:
+            room -= cost[k]
+            best_value += vals[k]
+            best_chosen = (k, best_chosen)
+
+    # (next item, value so far, room left, chosen items)
+    stack = [(0, 0, budget, None)]
+    nodes = 0
+    limit = BNB_MAX_NODES if max_nodes is None else max_nodes
+    while stack and nodes < limit:
+        nodes += 1
+        k, value, room, chosen = stack.pop()
+        if value > best_value:
+            best_value, best_chosen = value, chosen
+        if k == n or bound(k, value, room) <= best_value:
+            continue
+        # Push "skip" first so "take" (the greedy choice) is explored first
+        stack.append((k + 1, value, room, chosen))
+        if cost[k] <= room:
+            stack.append((k + 1, value + vals[k], room - cost[k], (k, chosen)))
+
+    selected = []
+    while best_chosen is not None:
+        k, best_chosen = best_chosen
+        selected.append(items[k])
+    return base + best_value, sorted(free + selected)
+
+
+def _fits_dp(n: int, budget: int) -> bool:
+    return budget <= DP_MAX_BUDGET and n * (budget + 1) <= DP_MAX_CELLS
+
+
+def knapsack_0_1(values: List[int], costs: List[int], budget: int) -> Tuple[int, List[int]]:
+    """
+    Classic 0/1 knapsack.
+    Returns (max_value, indices_of_selected_items)
+    """
+    _check(values, costs, budget)
+    if len(values) == 0:
+        return 0, []
+    if _fits_dp(len(values), budget):
+        return _dp_0_1(values, costs, budget)
+    return _branch_and_bound(values, costs, budget)
+
+
+def _split_copies(values: Sequence, costs: Sequence, counts: Sequence[int]):
+    """Binary-split each item's copies (1, 2, 4, ..., rest) into 0/1 bundles."""
+    bundle_values, bundle_costs, origin = [], [], []
+    for i, (v, c, k) in enumerate(zip(values, costs, counts)):
+        size = 1
+        while k > 0:
+            take = min(size, k)
+            bundle_values.append(v * take)
+            bundle_costs.append(c * take)
+            origin.append((i, take))
+            k -= take
+            size *= 2
+    return bundle_values, bundle_costs, origin
+
+
+def knapsack_bounded(values: List[int], costs: List[int], counts: List[int], budget: int) -> Tuple[int, List[int]]:
+    """
+    Knapsack where item i can be taken up to counts[i] times.
+    Returns (max_value, indices) with an index repeated for each copy taken.
+    """
+    _check(values, costs, budget)
+    if len(counts) != len(values):
+        raise ValueError("counts and values must have the same length")
+    if any(k < 0 for k in counts):
+        raise ValueError("counts must not be negative")
+    bundle_values, bundle_costs, origin = _split_copies(values, costs, counts)
+    best, chosen = knapsack_0_1(bundle_values, bundle_costs, budget)
+    indices = []
+    for j in chosen:
+        i, copies = origin[j]
+        indices.extend([i] * copies)
+    return best, sorted(indices)
+
+
+def knapsack_unbounded(values: List[int], costs: List[int], budget: int) -> Tuple[int, List[int]]:
+    """
+    Knapsack where every item can be taken any number of times.
+    Returns (max_value, indices) with an index repeated for each copy taken.
+    Zero-cost items with positive value would make the optimum infinite and
+    are rejected.
+    """
+    _check(values, costs, budget)
+    if any(c == 0 and v > 0 for v, c in zip(values, costs)):
+        raise ValueError("unbounded knapsack with a free positive-value item has no finite optimum")
+    counts = [budget // c if c else 0 for c in costs]
+    return knapsack_bounded(values, costs, counts, budget)
+
+
+def _knapsack_0_1_reference(values: List[int], costs: List[int], budget: int) -> Tuple[int, List[int]]:
+    """
+    Original full-table implementation, kept as the reference the engine is
+    checked and benchmarked against.  O(n * budget) boxed ints.
+    """
+    n = len(values)
+    if n == 0:
+        return 0, []
+    dp = [[0]*(budget+1) for _ in range(n+1)]
+    for i in range(1, n+1):
+        v = values[i-1]; c = costs[i-1]
+        for b in range(budget+1):
+            dp[i][b] = dp[i-1][b]
+            if c <= b:
+                val = dp[i-1][b-c] + v
+                if val > dp[i][b]:
+                    dp[i][b] = val
+    # reconstruct selection
+    res = []
+    b = budget
+    for i in range(n, 0, -1):
+        if dp[i][b] != dp[i-1][b]:
+            res.append(i-1)
+            b -= costs[i-1]
+    res.reverse()
+    return dp[n][budget], res
@@ -0,0 +1,138 @@
+# backend/app/services/passwords.py
+"""
+Shared password hashing service.
+
+bcrypt costs 100-300 ms of CPU per call, so hashing and verification run in
+a dedicated process pool instead of on the request threads.  At most
+PASSWORD_WORKERS + PASSWORD_MAX_QUEUE calls may be pending; beyond that
+PasswordPoolSaturated is raised straight away (routers turn it into a 503)
+rather than letting a login burst queue up behind the pool.
+
+The bcrypt cost comes from BCRYPT_ROUNDS.  Hashes made with a different cost
+are re-hashed on the next successful login.  PASSWORD_WORKERS=0 hashes inline.
+
+If a worker process dies (e.g. the OOM killer), the pool is broken for good;
+it is then replaced and the interrupted call retried once.
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Tuple
+
+from passlib.context import CryptContext
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_WORKERS = int(os.getenv("PASSWORD_WORKERS", str(min(os.cpu_count() or 2, 4))))
+PASSWORD_MAX_QUEUE = int(os.getenv("PASSWORD_MAX_QUEUE", "32"))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+
+class PasswordPoolSaturated(Exception):
+    """Too many password operations are already pending."""
+
+
+def _hash_worker(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify_worker(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(password, hashed)
+
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(max(PASSWORD_WORKERS, 1) + PASSWORD_MAX_QUEUE)
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn: safe with a threaded parent and the only option on Windows
+            _executor = ProcessPoolExecutor(
+                max_workers=PASSWORD_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _executor
+
+
+def _discard(executor: ProcessPoolExecutor) -> None:
+    """Drop a broken pool so the next call starts a fresh one."""
+    global _executor
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _pool_submit(fn, *args) -> Future:
+    executor = _get_executor()
+    try:
+        return executor.submit(fn, *args)
+    except BrokenProcessPool:
+        # A worker died since the last call; submit() fails at once on a broken pool
+        _discard(executor)
+        return _get_executor().submit(fn, *args)
+
+
+def _submit(fn, *args) -> Future:
+    if not _slots.acquire(blocking=False):
+        raise PasswordPoolSaturated()
+
+    if PASSWORD_WORKERS <= 0:
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as exc:
+            future.set_exception(exc)
+        finally:
+            _slots.release()
+        return future
+
+    try:
+        future = _pool_submit(fn, *args)
+    except Exception:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+    return future
+
+
+def _run(fn, *args):
+    try:
+        return _submit(fn, *args).result()
+    except BrokenProcessPool:
+        # The worker running this call died; the next submit replaces the pool
+        return _submit(fn, *args).result()
+
+
+async def _run_async(fn, *args):
+    try:
+        return await asyncio.wrap_future(_submit(fn, *args))
+    except BrokenProcessPool:
+        return await asyncio.wrap_future(_submit(fn, *args))
+
+
+def hash_password(password: str) -> str:
+    return _run(_hash_worker, password)
+
+
+def verify_password(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    """(valid, new_hash); new_hash is set when the stored hash should be upgraded."""
+    return _run(_verify_worker, password, hashed)
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run_async(_hash_worker, password)
+
+
+def shutdown() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
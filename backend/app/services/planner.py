@@ -0,0 +1,206 @@
+# backend/app/services/planner.py
+"""
+Challenge-completion planner on top of the knapsack engine.
+
+Given an effort budget in minutes, pick how many units of each action to log
+so that action points plus challenge bonuses are maximal.  Each action is
+modelled as:
+
+- single units: a bounded item worth points_per_unit, costing effort_minutes,
+  available budget // effort_minutes times;
+- for an unfinished challenge it progresses, a 0/1 "completion bundle" of the
+  remaining gap's units, worth their points plus the challenge's reward.
+
+Any quantity of an action is then "k single units" or "the bundle plus k
+single units", so the bounded knapsack finds the true optimum.  Single-unit
+items are precomputed per catalog version and pruned of dominated actions
+(another action is no slower and worth at least as much).  When several
+actions progress the same challenge only the cheapest bundle is kept, so the
+bonus is counted once; completing one challenge with a mix of actions is not
+considered.
+
+Plans are cached per user, keyed on the user's newest action id, and dropped
+when the user logs an action; each user keeps their most recently asked-for
+budgets only.
+"""
+import math
+import os
+import threading
+from collections import OrderedDict, namedtuple
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+
+from backend.app import metrics, models
+from backend.app.services import action_catalog, challenge_catalog
+from backend.app.services.optimizer import knapsack_bounded
+
+# One knapsack item: `units` units of `action`, completing `challenge` if set
+PlanItem = namedtuple("PlanItem", ["action", "units", "value", "cost", "challenge"])
+
+_units_lock = threading.Lock()
+_unit_items: Tuple[int, Tuple[PlanItem, ...]] = (-1, ())
+
+
+def unit_items(catalog: action_catalog.ActionCatalog) -> Tuple[PlanItem, ...]:
+    """Single-unit items of the catalog, minus dominated actions; cached per version."""
+    global _unit_items
+    version, items = _unit_items
+    if version == catalog.version:
+        return items
+
+    candidates = sorted(
+        (a for a in catalog.actions if a.points_per_unit > 0 and a.effort_minutes > 0),
+        key=lambda a: (a.effort_minutes, -a.points_per_unit),
+    )
+    kept = []
+    best_value = 0
+    for action in candidates:
+        # Everything cheaper (or as cheap) already kept is worth at least as much
+        if action.points_per_unit <= best_value:
+            continue
+        best_value = action.points_per_unit
+        kept.append(PlanItem(action, 1, action.points_per_unit, action.effort_minutes, None))
+
+    items = tuple(kept)
+    with _units_lock:
+        _unit_items = (catalog.version, items)
+    return items
+
+
+def completion_bundles(database, catalog, progress: Dict[int, float], budget: int) -> List[PlanItem]:
+    """The cheapest completion bundle for each unfinished challenge that fits the budget."""
+    cheapest = {}
+    for action in catalog.actions:
+        challenge = challenge_catalog.find(database, action.challenge_title)
+        if challenge is None or action.effort_minutes <= 0:
+            continue
+        gap = challenge.goal - (progress.get(challenge.id) or 0)
+        if gap <= 0:
+            continue
+        units = math.ceil(gap)
+        item = PlanItem(action, units, units * action.points_per_unit + challenge.reward_points,
+                        units * action.effort_minutes, challenge)
+        if item.cost > budget:
+            continue
+        current = cheapest.get(challenge.id)
+        if current is None or (item.cost, -item.value) < (current.cost, -current.value):
+            cheapest[challenge.id] = item
+    return list(cheapest.values())
+
+
+def solve(database, progress: Dict[int, float], budget: int) -> dict:
+    """The best plan for a user with this challenge progress and effort budget."""
+    catalog = action_catalog.get()
+    items = [i for i in unit_items(catalog) if i.cost <= budget]
+    items += completion_bundles(database, catalog, progress, budget)
+    counts = [budget // i.cost if i.challenge is None else 1 for i in items]
+
+    value, chosen = knapsack_bounded([i.value for i in items], [i.cost for i in items], counts, budget)
+
+    quantities: Dict[str, int] = {}
+    completes: Dict[str, List[str]] = {}
+    bonus = 0
+    for index in chosen:
+        item = items[index]
+        name = item.action.name
+        quantities[name] = quantities.get(name, 0) + item.units
+        if item.challenge is not None:
+            bonus += item.challenge.reward_points
+            completes.setdefault(name, []).append(item.challenge.title)
+
+    by_name = catalog.by_name
+    actions = [
+        {
+            "action_name": name,
+            "quantity": quantity,
+            "unit": by_name[name].unit,
+            "points": quantity * by_name[name].points_per_unit,
+            "effort_minutes": quantity * by_name[name].effort_minutes,
+            "completes": completes.get(name, []),
+        }
+        for name, quantity in sorted(quantities.items(), key=lambda kv: -kv[1] * by_name[kv[0]].points_per_unit)
+    ]
+    return {
+        "budget_minutes": budget,
+        "total_points": value,
+        "action_points": value - bonus,
+        "bonus_points": bonus,
+        "effort_minutes": sum(a["effort_minutes"] for a in actions),
+        "actions": actions,
+    }
+
+
+class PlanCache:
+    """Recent plans per user; each user keeps up to max_budgets plans for their current progress."""
+
+    def __init__(self, max_users: int = 1024, max_budgets: int = 8):
+        self.max_users = max_users
+        self.max_budgets = max_budgets
+        self._users: "OrderedDict[int, Tuple[object, OrderedDict[int, dict]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: int, version, budget: int) -> Optional[dict]:
+        with self._lock:
+            entry = self._users.get(user_id)
+            if entry is None or entry[0] != version or budget not in entry[1]:
+                self.misses += 1
+                return None
+            self._users.move_to_end(user_id)
+            entry[1].move_to_end(budget)
+            self.hits += 1
+            return entry[1][budget]
+
+    def put(self, user_id: int, version, budget: int, plan: dict) -> None:
+        with self._lock:
+            entry = self._users.get(user_id)
+            if entry is None or entry[0] != version:
+                entry = (version, OrderedDict())
+                self._users[user_id] = entry
+            plans = entry[1]
+            plans[budget] = plan
+            plans.move_to_end(budget)
+            while len(plans) > self.max_budgets:
+                plans.popitem(last=False)
+            self._users.move_to_end(user_id)
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+
+    def invalidate_user(self, user_id: int) -> None:
+        with self._lock:
+            self._users.pop(user_id, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"users": len(self._users), "max_users": self.max_users,
+                    "plans": sum(len(plans) for _, plans in self._users.values()),
+                    "max_budgets": self.max_budgets, "hits": self.hits, "misses": self.misses}
+
+
+plan_cache = PlanCache(int(os.getenv("PLAN_CACHE_USERS", "1024")), int(os.getenv("PLAN_CACHE_BUDGETS", "8")))
+metrics.register_cache("plan", plan_cache, entries="users", max_entries="max_users")
+
+
+def plan_for_user(database, user_id: int, budget: int) -> dict:
+    """Cached plan for a user; recomputed once they log another action."""
+    latest_action_id = (
+        database.query(func.max(models.ActionType.id))
+        .filter(models.ActionType.user_id == user_id)
+        .scalar()
+    )
+    challenge_version, _ = challenge_catalog.get(database)
+    version = (latest_action_id, action_catalog.get().version, challenge_version)
+    plan = plan_cache.get(user_id, version, budget)
+    if plan is not None:
+        return plan
+
+    progress = dict(
+        database.query(models.ChallengeProgress.challenge_id, models.ChallengeProgress.progress)
+        .filter(models.ChallengeProgress.user_id == user_id)
+        .all()
+    )
+    plan = solve(database, progress, budget)
+    plan_cache.put(user_id, version, budget, plan)
+    return plan
@@ -0,0 +1,94 @@
+# backend/app/services/tokens.py
+"""
+Stateless signed session tokens.
+
+A token is base64url(json payload) + "." + base64url(HMAC-SHA256 signature),
+carrying the user id, username and expiry.  Verifying one needs only the
+secret, never the database.
+
+Set ECO_SECRET_KEY to the same value on every worker.  Without it each process
+generates its own key, so tokens only verify on the worker that issued them
+and every restart signs everyone out; the app refuses to start that way
+(check_secret_key) unless ECO_DB_PROFILE=dev.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import secrets
+import time
+from typing import NamedTuple
+
+logger = logging.getLogger(__name__)
+
+TOKEN_TTL_SECONDS = int(os.getenv("ECO_TOKEN_TTL", str(12 * 3600)))
+
+_secret = os.getenv("ECO_SECRET_KEY")
+# True when no key was configured and this process made up its own
+EPHEMERAL_KEY = not _secret
+if EPHEMERAL_KEY:
+    _secret = secrets.token_hex(32)
+SECRET_KEY = _secret.encode("utf-8")
+
+
+def check_secret_key() -> None:
+    """Refuse to serve with a per-process key, except under the dev profile.  Called at app startup."""
+    if not EPHEMERAL_KEY:
+        return
+    if os.getenv("ECO_DB_PROFILE", "production") != "dev":
+        raise RuntimeError(
+            "ECO_SECRET_KEY is not set. Set it to the same secret on every worker "
+            "(or ECO_DB_PROFILE=dev for a single local process)."
+        )
+    logger.warning("ECO_SECRET_KEY is not set; using a per-process random token key (dev profile)")
+
+
+class InvalidToken(Exception):
+    """The token is malformed, has a bad signature or has expired."""
+
+
+class TokenClaims(NamedTuple):
+    user_id: int
+    username: str
+    expires_at: int
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(payload: str) -> str:
+    return _b64encode(hmac.new(SECRET_KEY, payload.encode("ascii"), hashlib.sha256).digest())
+
+
+def issue(user_id: int, username: str, ttl_seconds: int = None) -> str:
+    expires_at = int(time.time()) + (TOKEN_TTL_SECONDS if ttl_seconds is None else ttl_seconds)
+    body = json.dumps({"uid": user_id, "usr": username, "exp": expires_at}, separators=(",", ":"))
+    payload = _b64encode(body.encode("utf-8"))
+    return f"{payload}.{_sign(payload)}"
+
+
+def verify(token: str) -> TokenClaims:
+    # Tokens are base64url; anything else would fail in _sign or compare_digest
+    if not isinstance(token, str) or not token.isascii():
+        raise InvalidToken("malformed token")
+    try:
+        payload, signature = token.split(".")
+    except ValueError:
+        raise InvalidToken("malformed token")
+    if not hmac.compare_digest(signature, _sign(payload)):
+        raise InvalidToken("bad signature")
+    try:
+        claims = json.loads(_b64decode(payload))
+        result = TokenClaims(int(claims["uid"]), str(claims["usr"]), int(claims["exp"]))
+    except (ValueError, KeyError, TypeError):
+        raise InvalidToken("malformed token")
+    if result.expires_at < time.time():
+        raise InvalidToken("token expired")
+    return result
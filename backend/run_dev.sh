@@ -1,4 +1,6 @@
-#!/usr/bin/env bash
-# backend/run_dev.sh
-export PYTHONPATH="${PYTHONPATH}:./"
-uvicorn backend.app.main:app --reload --host 0.0.0.0 --port 8000
+#!/usr/bin/env bash
+# backend/run_dev.sh
+export PYTHONPATH="${PYTHONPATH}:./"
+# Single local process: SQLite defaults and a throwaway token key are fine
+export ECO_DB_PROFILE="${ECO_DB_PROFILE:-dev}"
+uvicorn backend.app.main:app --reload --host 0.0.0.0 --port 8000
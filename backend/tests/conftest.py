@@ -0,0 +1,42 @@
+# backend/tests/conftest.py
+"""
+Shared fixtures.  The environment is set before the app is imported: a
+throwaway SQLite file, a fixed token key, and passwords hashed in-process
+with a low bcrypt cost so the suite runs in seconds.  No carbon provider
+key is set; tests that need one patch it in.
+
+    python -m pytest -q backend/tests
+"""
+import os
+import tempfile
+import uuid
+
+_workdir = tempfile.mkdtemp(prefix="eco-tests-")
+os.environ["ECO_DATABASE_URL"] = f"sqlite:///{os.path.join(_workdir, 'test.db')}"
+os.environ.setdefault("ECO_SECRET_KEY", "test-secret")
+os.environ.setdefault("PASSWORD_WORKERS", "0")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.app.main import app
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def make_user(client):
+    """Register a user with a unique name; returns (username, bearer headers)."""
+
+    def make(prefix: str = "user"):
+        username = f"{prefix}-{uuid.uuid4().hex[:8]}"
+        assert client.post("/auth/register", json={"username": username, "password": "pw"}).status_code == 200
+        token = client.post("/auth/login", json={"username": username, "password": "pw"}).json()["access_token"]
+        return username, {"Authorization": f"Bearer {token}"}
+
+    return make
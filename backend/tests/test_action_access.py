@@ -0,0 +1,62 @@
+# backend/tests/test_action_access.py
+import json
+from urllib.parse import quote
+
+import pytest
+
+from backend.app import security
+
+
+@pytest.fixture
+def two_users(client, make_user):
+    """Two users with one action each."""
+    users = [make_user("alice"), make_user("bob")]
+    for _, headers in users:
+        assert client.post("/actions/log", headers=headers,
+                           json={"action_name": "Rode a Bike", "quantity": 1}).status_code == 200
+    return users
+
+
+def _usernames(response):
+    return {json.loads(line)["username"] for line in response.text.splitlines()}
+
+
+@pytest.mark.parametrize("path", ["/actions/history", "/actions/export"])
+def test_anonymous_callers_are_refused(client, two_users, path):
+    (alice, _), _ = two_users
+    assert client.get(path).status_code == 401
+    assert client.get(path, params={"username": alice}).status_code == 401
+
+
+def test_history_is_scoped_to_the_caller(client, two_users):
+    (_, alice_headers), (bob, _) = two_users
+    assert len(client.get("/actions/history", headers=alice_headers).json()["items"]) == 1
+    assert client.get("/actions/history", headers=alice_headers, params={"username": bob}).status_code == 403
+
+
+def test_export_is_scoped_to_the_caller(client, two_users):
+    (alice, alice_headers), (bob, _) = two_users
+    assert _usernames(client.get("/actions/export", headers=alice_headers)) == {alice}
+    assert client.get("/actions/export", headers=alice_headers, params={"username": bob}).status_code == 403
+    assert client.get("/actions/export", headers=alice_headers, params={"all_users": True}).status_code == 403
+
+
+def test_admins_can_read_other_users_and_export_everyone(client, two_users, monkeypatch):
+    (alice, alice_headers), (bob, _) = two_users
+    monkeypatch.setattr(security, "ADMIN_USERS", frozenset({alice}))
+
+    history = client.get("/actions/history", headers=alice_headers, params={"username": bob})
+    assert history.status_code == 200 and len(history.json()["items"]) == 1
+    assert _usernames(client.get("/actions/export", headers=alice_headers, params={"username": bob})) == {bob}
+    assert {alice, bob} <= _usernames(client.get("/actions/export", headers=alice_headers, params={"all_users": True}))
+
+
+@pytest.mark.parametrize("prefix, fallback", [("李雷", "actions-__-"), ('a"b', "actions-a_b-")])
+def test_export_filename_survives_unusual_usernames(client, make_user, prefix, fallback):
+    username, headers = make_user(prefix)
+    response = client.get("/actions/export", headers=headers)
+    assert response.status_code == 200
+    disposition = response.headers["content-disposition"]
+    assert disposition.startswith(f'attachment; filename="{fallback}')
+    assert disposition.count('"') == 2
+    assert disposition.endswith("filename*=UTF-8''" + quote(f"actions-{username}.ndjson", safe=""))
@@ -0,0 +1,40 @@
+# backend/tests/test_action_catalog.py
+import pytest
+from sqlalchemy import update
+
+from backend.app import db, models
+from backend.app.services import action_catalog
+
+
+def _set_points_per_unit(name: str, value: int) -> None:
+    with db.SessionLocal() as session:
+        session.execute(update(models.ActionDefinition)
+                        .where(models.ActionDefinition.name == name).values(points_per_unit=value))
+        session.commit()
+
+
+@pytest.fixture
+def bike_points(client, monkeypatch):
+    """Edits "Rode a Bike" as another worker would; restores it afterwards."""
+    monkeypatch.setattr(action_catalog, "REFRESH_SECONDS", 0)
+    yield lambda value: _set_points_per_unit("Rode a Bike", value)
+    _set_points_per_unit("Rode a Bike", action_catalog.DEFAULT_ACTIONS[0].points_per_unit)
+    with db.SessionLocal() as session:
+        action_catalog.reload(session)
+
+
+def test_edit_made_elsewhere_shows_up_on_refresh(client, bike_points):
+    version = client.get("/actions/catalog").json()["version"]
+    bike_points(99)
+
+    catalog = client.get("/actions/catalog").json()
+    bike = next(a for a in catalog["actions"] if a["name"] == "Rode a Bike")
+    assert bike["points_per_unit"] == 99
+    assert catalog["version"] == version + 1
+    assert action_catalog.lookup("Rode a Bike").points_per_unit == 99
+
+
+def test_refresh_without_changes_keeps_the_version(client, bike_points):
+    version = action_catalog.get().version
+    assert action_catalog.get().version == version
+    assert client.get("/actions/catalog").json()["version"] == version
@@ -0,0 +1,19 @@
+# backend/tests/test_admin_endpoints.py
+from backend.app import security
+
+
+def test_catalog_reload_requires_a_token(client):
+    assert client.post("/actions/catalog/reload").status_code == 401
+
+
+def test_catalog_reload_refuses_non_admins(client, make_user):
+    _, headers = make_user()
+    assert client.post("/actions/catalog/reload", headers=headers).status_code == 403
+
+
+def test_catalog_reload_by_admin(client, make_user, monkeypatch):
+    username, headers = make_user("admin")
+    monkeypatch.setattr(security, "ADMIN_USERS", frozenset({username}))
+    response = client.post("/actions/catalog/reload", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["actions"] > 0
@@ -0,0 +1,44 @@
+# backend/tests/test_bulk_import.py
+import io
+import json
+
+from backend.app import bulk_import
+
+
+def _import(tmp_path, lines):
+    source = tmp_path / "actions.ndjson"
+    source.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    rejects = tmp_path / "rejects.ndjson"
+    counts = bulk_import.run(str(source), rejects_path=str(rejects), out=io.StringIO())
+    return counts, [json.loads(line) for line in rejects.read_text(encoding="utf-8").splitlines()]
+
+
+def _line(username, **fields):
+    return json.dumps({"username": username, "action_name": "Rode a Bike", **fields})
+
+
+def test_malformed_json_line_is_rejected(client, make_user, tmp_path):
+    username, _ = make_user("import")
+    counts, rejects = _import(tmp_path, [_line(username, quantity=2), '{"username": "x", '])
+    assert (counts["inserted"], counts["rejected"]) == (1, 1)
+    assert rejects[0]["line"] == 2 and "bad JSON" in rejects[0]["error"]
+
+
+def test_non_object_line_is_rejected(client, make_user, tmp_path):
+    username, _ = make_user("import")
+    counts, rejects = _import(tmp_path, ["[1, 2, 3]", _line(username, quantity=2)])
+    assert (counts["inserted"], counts["rejected"]) == (1, 1)
+    assert rejects[0]["line"] == 1 and "JSON object" in rejects[0]["error"]
+
+
+def test_non_finite_quantity_and_points_are_rejected(client, make_user, tmp_path):
+    username, _ = make_user("import")
+    lines = [
+        _line(username, quantity=2),
+        _line(username).replace("}", ', "quantity": 1e309}'),
+        _line(username).replace("}", ', "points": -1e309}'),
+        _line(username, quantity=1e300),
+    ]
+    counts, rejects = _import(tmp_path, lines)
+    assert (counts["inserted"], counts["rejected"]) == (1, 3)
+    assert [r["line"] for r in rejects] == [2, 3, 4]
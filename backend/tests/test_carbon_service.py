@@ -0,0 +1,151 @@
+# backend/tests/test_carbon_service.py
+import asyncio
+
+import pytest
+
+from backend.app.services import carbon_service
+from backend.app.services.carbon_cache import factor_cache
+
+MALFORMED_BODIES = [
+    {"data": {"attributes": {"carbon_g": "12"}}},
+    {"data": {"attributes": "not a dict"}},
+    {"data": {"attributes": {"carbon_kg": None}}},
+    {"data": ["not", "a", "dict"]},
+    {"data": {"attributes": {"carbon_kg": True}}},
+    "not json object",
+]
+
+
+class FakeResponse:
+    def __init__(self, body):
+        self.body = body
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.body
+
+
+class FakeSession:
+    def __init__(self, body):
+        self.body = body
+        self.calls = 0
+
+    def post(self, *args, **kwargs):
+        self.calls += 1
+        return FakeResponse(self.body)
+
+
+class FakeAsyncClient(FakeSession):
+    async def post(self, *args, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return FakeResponse(self.body)
+
+
+@pytest.fixture
+def provider(client, monkeypatch):
+    """Enable the provider with a fresh breaker and factor cache; returns a body setter."""
+    monkeypatch.setattr(carbon_service, "CARBON_INTERFACE_KEY", "test-key")
+    carbon_service.provider_breaker.reset()
+    factor_cache.clear()
+
+    def serve(body):
+        session, async_client = FakeSession(body), FakeAsyncClient(body)
+        monkeypatch.setattr(carbon_service, "_get_session", lambda: session)
+        monkeypatch.setattr(carbon_service, "_get_async_client", lambda: async_client)
+        return session, async_client
+
+    yield serve
+    carbon_service.provider_breaker.reset()
+    factor_cache.clear()
+
+
+@pytest.mark.parametrize("body", MALFORMED_BODIES)
+def test_malformed_body_falls_back_and_counts_as_failure(provider, body):
+    provider(body)
+    failures = carbon_service.provider_breaker.total_failures
+
+    result = carbon_service.estimate_emissions("Rode a Bike", 10)
+
+    assert result["source"] == "approximate-local"
+    assert carbon_service.provider_breaker.total_failures == failures + 1
+    assert factor_cache.get("Rode a Bike") is None
+
+
+@pytest.mark.parametrize("body", MALFORMED_BODIES)
+def test_malformed_body_falls_back_for_coalesced_async_callers(provider, body):
+    _, async_client = provider(body)
+    failures = carbon_service.provider_breaker.total_failures
+
+    async def run():
+        return await asyncio.gather(*(carbon_service.estimate_emissions_async("Rode a Bike", 10) for _ in range(5)))
+
+    results = asyncio.run(run())
+
+    assert async_client.calls == 1
+    assert all(r["source"] == "approximate-local" for r in results)
+    assert carbon_service.provider_breaker.total_failures == failures + 1
+
+
+def test_repeated_malformed_bodies_open_the_circuit(provider):
+    provider({"data": {"attributes": {"carbon_g": "garbage"}}})
+    for _ in range(carbon_service.provider_breaker.failure_threshold):
+        carbon_service.estimate_emissions("Rode a Bike", 10)
+    assert carbon_service.provider_breaker.state == "open"
+
+
+def test_valid_body_is_used_and_learned(provider):
+    # Negative: emissions avoided, as the local factors are
+    provider({"data": {"attributes": {"carbon_g": -2500}}})
+
+    result = carbon_service.estimate_emissions("Rode a Bike", 10)
+
+    assert (result["co2_kg"], result["source"]) == (-2.5, "carbon-interface")
+    assert factor_cache.get("Rode a Bike") == pytest.approx(-0.25)
+    assert carbon_service.provider_breaker.state == "closed"
+
+
+def test_factor_from_small_quantity_is_learned_unrounded(provider):
+    # 0.01 km at 0.123456 kg/km: the rounded estimate (0.0012) implies 0.12, off by 3%
+    provider({"data": {"attributes": {"carbon_kg": 0.00123456}}})
+
+    assert carbon_service.estimate_emissions("Rode a Bike", 0.01)["co2_kg"] == 0.0012
+    assert factor_cache.get("Rode a Bike") == pytest.approx(0.123456)
+    assert carbon_service.estimate_emissions("Rode a Bike", 1000)["co2_kg"] == pytest.approx(123.456)
+
+
+def test_batch_does_not_look_up_names_outside_the_catalog(provider):
+    _, async_client = provider({"data": {"attributes": {"carbon_kg": -0.5}}})
+    names = [f"junk-{i}" for i in range(2000)] + ["Rode a Bike"]
+
+    co2, sources = asyncio.run(carbon_service.estimate_emissions_batch_async(names, [1.0] * len(names)))
+
+    assert async_client.calls == 1
+    assert co2[-1] == -0.5 and sources[-1] == "carbon-interface-cached"
+    assert set(sources[:-1]) == {"approximate-local"}
+
+
+def test_batch_caps_distinct_upstream_lookups(provider, monkeypatch):
+    _, async_client = provider({"data": {"attributes": {"carbon_kg": -0.5}}})
+    monkeypatch.setattr(carbon_service, "BATCH_MAX_PROVIDER_LOOKUPS", 2)
+    names = [a.name for a in carbon_service.action_catalog.get().actions]
+    assert len(names) > 2
+
+    asyncio.run(carbon_service.estimate_emissions_batch_async(names, [1.0] * len(names)))
+
+    assert async_client.calls == 2
+
+
+def test_concurrent_quantities_of_one_action_share_a_call(provider):
+    _, async_client = provider({"data": {"attributes": {"carbon_kg": -0.5}}})
+
+    async def run():
+        return await asyncio.gather(*(carbon_service.estimate_emissions_async("Rode a Bike", q) for q in (1, 2, 2, 4)))
+
+    results = asyncio.run(run())
+
+    assert async_client.calls == 1
+    assert [r["co2_kg"] for r in results] == [-0.5, -1.0, -1.0, -2.0]
+    assert carbon_service._inflight == {}
@@ -0,0 +1,121 @@
+# backend/tests/test_challenge_catalog.py
+import sqlite3
+import uuid
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from backend.app import db, models
+from backend.app.main import app
+from backend.app.seed_challenges import seed_challenges
+from backend.app.services import challenge_catalog
+
+
+@pytest.fixture
+def seeded(client):
+    seed_challenges()
+
+
+def _insert_elsewhere(title: str) -> None:
+    """Add a challenge through another connection, as the seeding CLI would."""
+    conn = sqlite3.connect(db.SQLALCHEMY_DATABASE_URL[len("sqlite:///"):])
+    with conn:
+        conn.execute("INSERT INTO challenges (title, goal, reward_points) VALUES (?, 3, 9)", (title,))
+    conn.close()
+
+
+def _titles(client):
+    return {c["title"] for c in client.get("/challenges/").json()}
+
+
+def _version() -> int:
+    session = db.SessionLocal()
+    try:
+        return challenge_catalog.get(session)[0]
+    finally:
+        session.close()
+
+
+def test_challenges_seeded_by_another_process_appear_after_refresh(client, seeded, monkeypatch):
+    monkeypatch.setattr(challenge_catalog, "REFRESH_SECONDS", 3600.0)
+    _titles(client)  # load the catalog
+    version = _version()
+
+    title = f"Seeded elsewhere {uuid.uuid4().hex[:8]}"
+    _insert_elsewhere(title)
+    assert title not in _titles(client)
+
+    monkeypatch.setattr(challenge_catalog, "REFRESH_SECONDS", 0.0)
+    assert title in _titles(client)
+    monkeypatch.setattr(challenge_catalog, "REFRESH_SECONDS", 3600.0)
+    assert _version() == version + 1
+
+
+def test_refresh_without_changes_keeps_the_version(client, seeded, monkeypatch):
+    _titles(client)
+    monkeypatch.setattr(challenge_catalog, "REFRESH_SECONDS", 0.0)
+    assert _version() == _version()
+
+
+@pytest.fixture
+def scratch_sessions(client, tmp_path, monkeypatch):
+    """Serve /challenges/ from an empty database of its own; yields (engine, sessionmaker)."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'challenges.db'}")
+    models.Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+
+    def get_read_db():
+        session = Session()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    monkeypatch.setattr(challenge_catalog, "REFRESH_SECONDS", 3600.0)
+    app.dependency_overrides[db.get_read_db] = get_read_db
+    yield engine, Session
+    del app.dependency_overrides[db.get_read_db]
+    challenge_catalog.invalidate()
+    engine.dispose()
+
+
+def test_challenge_listing_statement_count_is_constant(client, scratch_sessions):
+    engine, Session = scratch_sessions
+    with Session() as session:
+        user = models.User(username="lister", hashed_password="x", points=0)
+        session.add(user)
+        session.commit()
+        user_id = user.id
+
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    counts = {}
+    for size in (4, 50, 400):
+        with Session() as session:
+            session.query(models.ChallengeProgress).delete()
+            session.query(models.Challenge).delete()
+            for i in range(size):
+                challenge = models.Challenge(title=f"Challenge {i}", goal=10, reward_points=5)
+                session.add(challenge)
+                session.flush()
+                session.add(models.ChallengeProgress(user_id=user_id, challenge_id=challenge.id, progress=i % 10))
+            session.commit()
+        challenge_catalog.invalidate()
+        client.get("/challenges/", params={"username": "lister"})  # load the catalog
+
+        statements.clear()
+        event.listen(engine, "before_cursor_execute", count)
+        try:
+            response = client.get("/challenges/", params={"username": "lister"})
+        finally:
+            event.remove(engine, "before_cursor_execute", count)
+        assert response.status_code == 200
+        assert len(response.json()) == size
+        assert sum(c["progress"] for c in response.json()) == sum(i % 10 for i in range(size))
+        counts[size] = len(statements)
+
+    assert len(set(counts.values())) == 1, counts
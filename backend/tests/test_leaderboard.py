@@ -0,0 +1,33 @@
+# backend/tests/test_leaderboard.py
+import time
+
+from sqlalchemy import update
+
+from backend.app import db, models
+from backend.app.services import leaderboard_index
+from backend.app.services.leaderboard_index import LeaderboardIndex
+
+
+def test_points_written_by_another_session_show_up(client, make_user, monkeypatch):
+    username, _ = make_user("ranked")
+    assert client.get(f"/leaderboard/rank/{username}").json()["points"] == 0
+
+    # As another worker or bulk_import would: straight to the DB, bypassing this process's index
+    with db.SessionLocal() as session:
+        session.execute(update(models.User).where(models.User.username == username).values(points=10 ** 9))
+        session.commit()
+    monkeypatch.setattr(leaderboard_index, "REFRESH_SECONDS", 0)
+
+    assert client.get(f"/leaderboard/rank/{username}").json()["points"] == 10 ** 9
+    assert client.get("/leaderboard/", params={"limit": 1}).json()[0]["username"] == username
+
+
+def test_reload_keeps_updates_newer_than_its_rows():
+    index = LeaderboardIndex()
+    index.load([(1, "a", 10), (2, "b", 5)])
+    as_of = time.monotonic()
+    index.update(2, "b", 50)  # lands while the rows below are being read
+    index.load([(1, "a", 10), (2, "b", 5)], as_of)
+
+    assert index.top(2) == [{"rank": 1, "username": "b", "points": 50}, {"rank": 2, "username": "a", "points": 10}]
+    assert not index.stale()
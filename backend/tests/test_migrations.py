@@ -0,0 +1,44 @@
+# backend/tests/test_migrations.py
+import pytest
+from sqlalchemy import create_engine
+
+from backend.app import db, migrations, models
+
+# Indexes the migrations add to databases created before them
+MIGRATED_INDEXES = [
+    "ix_action_types_user_id_timestamp",
+    "ix_users_points",
+    "uq_challenge_progress_user_challenge",
+    "uq_user_daily_stats_user_day_action",
+]
+
+
+@pytest.fixture(scope="module")
+def plans(client):
+    return {name: (plan, ok) for name, plan, ok in migrations.explain(db.engine)}
+
+
+def test_schema_is_at_latest_version(client):
+    with db.engine.connect() as conn:
+        assert migrations.current_version(conn) == migrations.LATEST_VERSION
+
+
+@pytest.mark.parametrize("name", list(migrations.HOT_QUERIES))
+def test_hot_query_uses_an_index(plans, name):
+    plan, ok = plans[name]
+    assert ok, f"{name}: {plan}"
+
+
+def test_migrating_an_unindexed_database_indexes_hot_queries(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    models.Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        for index in MIGRATED_INDEXES:
+            conn.exec_driver_sql(f"DROP INDEX {index}")
+        conn.exec_driver_sql("PRAGMA user_version = 0")
+    assert not all(ok for _, _, ok in migrations.explain(engine))
+
+    assert migrations.migrate(engine) == [number for number, _, _ in migrations.MIGRATIONS]
+    failing = {name: plan for name, plan, ok in migrations.explain(engine) if not ok}
+    assert not failing
+    engine.dispose()
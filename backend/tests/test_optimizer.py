@@ -0,0 +1,43 @@
+# backend/tests/test_optimizer.py
+import random
+import time
+
+import pytest
+
+from backend.app.services import optimizer
+
+
+def _random_instance(rng, n, budget):
+    return [rng.randint(1, 100) for _ in range(n)], [rng.randint(1, budget // 2) for _ in range(n)]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_branch_and_bound_is_exact_within_its_node_budget(seed):
+    values, costs = _random_instance(random.Random(seed), 15, 200)
+    assert optimizer._branch_and_bound(values, costs, 200)[0] == optimizer._knapsack_0_1_reference(values, costs, 200)[0]
+
+
+def test_adversarial_instance_stops_at_the_node_budget(monkeypatch):
+    # Equal value density everywhere: the fractional bound never prunes, so the full search is 2**60 nodes
+    rng = random.Random(3)
+    costs = [2 * rng.randint(10 ** 7, 2 * 10 ** 7) for _ in range(60)]
+    budget = sum(costs) // 2 + 1
+    assert not optimizer._fits_dp(len(costs), budget)
+    monkeypatch.setattr(optimizer, "BNB_MAX_NODES", 20_000)
+
+    started = time.perf_counter()
+    value, chosen = optimizer.knapsack_0_1(costs, costs, budget)
+
+    assert time.perf_counter() - started < 5
+    assert value == sum(costs[i] for i in chosen) and value <= budget
+    # Never worse than the greedy fill the search starts from
+    greedy, room = 0, budget
+    for c in costs:
+        if c <= room:
+            greedy, room = greedy + c, room - c
+    assert value >= greedy
+
+
+def test_dp_decision_matrix_is_bounded():
+    assert optimizer.DP_MAX_CELLS // 8 <= 64 * 1024 * 1024
+    assert not optimizer._fits_dp(1000, 1_000_000)
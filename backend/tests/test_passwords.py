@@ -0,0 +1,38 @@
+# backend/tests/test_passwords.py
+import asyncio
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from backend.app.services import passwords
+
+
+def _die_once(marker: str) -> str:
+    """Kills its worker process the first time, as the OOM killer would."""
+    if not os.path.exists(marker):
+        open(marker, "w").close()
+        os._exit(1)
+    return "survived"
+
+
+@pytest.fixture
+def process_pool(monkeypatch):
+    """A real one-worker pool instead of the suite's inline hashing."""
+    monkeypatch.setattr(passwords, "PASSWORD_WORKERS", 1)
+    passwords.shutdown()
+    yield
+    passwords.shutdown()
+
+
+def test_pool_broken_by_a_dead_worker_is_replaced(process_pool):
+    with pytest.raises(BrokenProcessPool):
+        passwords._get_executor().submit(os._exit, 1).result()
+
+    hashed = passwords.hash_password("pw")
+    assert passwords.verify_password("pw", hashed)[0]
+
+
+def test_call_whose_worker_dies_is_retried(process_pool, tmp_path):
+    assert passwords._run(_die_once, str(tmp_path / "sync")) == "survived"
+    assert asyncio.run(passwords._run_async(_die_once, str(tmp_path / "async"))) == "survived"
@@ -0,0 +1,27 @@
+# backend/tests/test_planner.py
+from backend.app.services.planner import PlanCache
+
+
+def test_plan_cache_keeps_recent_budgets_per_user():
+    cache = PlanCache(max_users=4, max_budgets=3)
+    for budget in range(1, 10081):
+        cache.put(1, "v1", budget, {"budget_minutes": budget})
+
+    assert cache.stats()["plans"] == 3
+    assert cache.get(1, "v1", 1) is None
+    assert cache.get(1, "v1", 10080) == {"budget_minutes": 10080}
+
+    # A hit keeps a budget from being the next one evicted
+    cache.get(1, "v1", 10078)
+    cache.put(1, "v1", 5, {"budget_minutes": 5})
+    assert cache.get(1, "v1", 10078) is not None
+    assert cache.get(1, "v1", 10079) is None
+
+
+def test_user_named_cache_gets_a_plan(client):
+    assert client.post("/auth/register", json={"username": "cache", "password": "pw"}).status_code == 200
+
+    response = client.get("/plan/user/cache", params={"budget": 30})
+    assert response.status_code == 200
+    assert response.json()["username"] == "cache"
+    assert "hits" in client.get("/plan/cache").json()
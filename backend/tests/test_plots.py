@@ -0,0 +1,40 @@
+# backend/tests/test_plots.py
+import sys
+
+from sqlalchemy import select
+
+from backend.app import db, models
+
+PNG_MAGIC = b"\x89PNG\r\n\x1a\n"
+
+
+def _user_id(username: str) -> int:
+    with db.SessionLocal() as session:
+        return session.scalar(select(models.User.id).where(models.User.username == username))
+
+
+def test_user_points_plot(client, make_user):
+    username, _ = make_user("plot")
+    response = client.get(f"/plots/user/{_user_id(username)}/points.png")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/png"
+    assert response.content.startswith(PNG_MAGIC)
+
+
+def test_user_points_plot_unknown_user(client):
+    assert client.get("/plots/user/999999999/points.png").status_code == 404
+
+
+def test_community_co2_plot(client):
+    response = client.get("/plots/community/co2.png")
+    assert response.status_code == 200
+    assert response.content.startswith(PNG_MAGIC)
+
+
+def test_plots_do_not_use_pyplot(client, make_user):
+    # pyplot's global figure state is shared across the request threadpool
+    sys.modules.pop("matplotlib.pyplot", None)
+    username, _ = make_user("plot")
+    client.get(f"/plots/user/{_user_id(username)}/points.png")
+    client.get("/plots/community/co2.png")
+    assert "matplotlib.pyplot" not in sys.modules
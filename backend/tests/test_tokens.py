@@ -0,0 +1,56 @@
+# backend/tests/test_tokens.py
+import os
+import subprocess
+import sys
+
+import pytest
+
+from backend.app.services import tokens
+
+
+def test_round_trip():
+    claims = tokens.verify(tokens.issue(7, "ann"))
+    assert (claims.user_id, claims.username) == (7, "ann")
+
+
+@pytest.mark.parametrize("token", ["é.abc", "abc.é", "☃", "a.b.c", "", None])
+def test_malformed_tokens_are_invalid(token):
+    with pytest.raises(tokens.InvalidToken):
+        tokens.verify(token)
+
+
+def test_non_ascii_bearer_header_is_401(client):
+    # Header values arrive latin-1 decoded, so the token reaches verify() as non-ASCII text
+    response = client.get("/challenges/", headers={"Authorization": "Bearer \xe9.abc".encode("latin-1")})
+    assert response.status_code == 401
+
+
+def test_non_ascii_batch_token_is_a_per_item_error(client, make_user):
+    _, headers = make_user()
+    response = client.post("/actions/log/batch", headers=headers, json={"items": [
+        {"action_name": "Rode a Bike", "quantity": 1, "token": "\xe9.abc"},
+        {"action_name": "Rode a Bike", "quantity": 1},
+    ]})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert results[0]["status"] == "error" and "Invalid token" in results[0]["detail"]
+    assert results[1]["status"] == "ok"
+
+
+def test_missing_secret_key_is_refused_outside_dev(monkeypatch):
+    monkeypatch.setattr(tokens, "EPHEMERAL_KEY", True)
+    monkeypatch.setenv("ECO_DB_PROFILE", "production")
+    with pytest.raises(RuntimeError, match="ECO_SECRET_KEY"):
+        tokens.check_secret_key()
+    monkeypatch.setenv("ECO_DB_PROFILE", "dev")
+    tokens.check_secret_key()
+
+
+def test_app_does_not_start_without_a_secret_key(tmp_path):
+    env = {k: v for k, v in os.environ.items() if k not in ("ECO_SECRET_KEY", "ECO_DB_PROFILE")}
+    env["ECO_DATABASE_URL"] = f"sqlite:///{tmp_path / 'startup.db'}"
+    code = "from fastapi.testclient import TestClient\nfrom backend.app.main import app\nTestClient(app).__enter__()\n"
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    proc = subprocess.run([sys.executable, "-c", code], env=env, cwd=root, capture_output=True, text=True, timeout=120)
+    assert proc.returncode != 0
+    assert "ECO_SECRET_KEY is not set" in proc.stderr
@@ -0,0 +1,262 @@
+"""
+Concurrent-client capacity of the API under uvicorn.
+
+Models many mostly idle desktop clients: each keeps a connection open and,
+after a random think time, sends one small request (challenges, leaderboard,
+action history, or an action log for --write-ratio of them).  A fresh
+database is seeded and one uvicorn worker started per tree; each client count
+then runs for --seconds and reports throughput, p50/p95/p99 latency and
+errors.  Capacity is the most clients served with p99 within --p99-ms and
+no errors.
+
+--lock-ms N --lock-every S makes a separate connection hold SQLite's write
+lock for N ms every S seconds, as a bulk import or backfill job does.
+Action logs then wait for the lock.  Only the write endpoints (action logs,
+registration) are async, so a waiting write does not park a threadpool
+thread; reads stay on sync routes, which never wait on the writer.  On one
+core, 3000 ms locks every 4 s gave the same p99 as the all-sync routers
+(50 clients: 279 vs 193 ms reads; 150: 5948 vs 6310 ms), so converting the
+reads bought no capacity for twice the CPU per statement.
+
+To compare against another checkout (e.g. the sync routers), pass its root
+with --baseline-root; both trees are measured the same way:
+
+    git worktree add ../eco-baseline <commit>
+    python benchmarks/async_load.py --clients 100 200 400 800 --baseline-root ../eco-baseline
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SECRET = "async-load-benchmark"
+
+
+def seed_main(args):
+    """Runs inside the tree under test: seed users and actions, print their tokens."""
+    from backend.app import models
+    from backend.app.db import SessionLocal, init_db
+    from backend.app.seed_challenges import seed_challenges
+    from backend.app.services import tokens
+
+    init_db()
+    seed_challenges()
+    database = SessionLocal()
+    database.execute(
+        models.User.__table__.insert(),
+        [{"username": f"user{i}", "hashed_password": "x", "points": random.randint(0, 5000)}
+         for i in range(args.users)],
+    )
+    database.execute(
+        models.ActionType.__table__.insert(),
+        [{"user_id": random.randint(1, args.users), "action_name": "Rode a Bike", "points": 10}
+         for _ in range(args.users * 20)],
+    )
+    database.commit()
+    rows = database.query(models.User.id, models.User.username).all()
+    database.close()
+    print(json.dumps([tokens.issue(user_id, username) for user_id, username in rows]))
+
+
+async def _client(http, token, args, deadline, measure_from, latencies, errors):
+    """One desktop client; latencies are appended to latencies["read"] or latencies["write"]."""
+    headers = {"Authorization": f"Bearer {token}"}
+    think = args.think_ms / 1000
+    # Stagger the first requests so clients do not arrive in lockstep
+    await asyncio.sleep(random.uniform(0, think))
+    while time.perf_counter() < deadline:
+        roll = random.random()
+        kind = "write" if roll < args.write_ratio else "read"
+        started = time.perf_counter()
+        try:
+            if kind == "write":
+                response = await http.post("/actions/log", headers=headers,
+                                           json={"action_name": "Rode a Bike", "quantity": 1})
+            elif roll < args.write_ratio + (1 - args.write_ratio) / 3:
+                response = await http.get("/challenges/", headers=headers)
+            elif roll < args.write_ratio + 2 * (1 - args.write_ratio) / 3:
+                response = await http.get("/leaderboard/")
+            else:
+                response = await http.get("/actions/history", headers=headers, params={"limit": 20})
+            ok = response.status_code < 400
+        except Exception:
+            ok = False
+        if started >= measure_from:
+            if ok:
+                latencies[kind].append((time.perf_counter() - started) * 1000)
+            else:
+                errors.append(1)
+        await asyncio.sleep(random.expovariate(1 / think))
+
+
+def load_main(payload):
+    """One client process: `clients` concurrent connections for the run."""
+    import httpx
+
+    args, url, tokens, clients = payload
+
+    async def run():
+        latencies, errors = {"read": [], "write": []}, []
+        limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+        async with httpx.AsyncClient(base_url=url, limits=limits, timeout=args.timeout) as http:
+            now = time.perf_counter()
+            measure_from, deadline = now + args.warmup, now + args.warmup + args.seconds
+            await asyncio.gather(*(
+                _client(http, tokens[i % len(tokens)], args, deadline, measure_from, latencies, errors)
+                for i in range(clients)
+            ))
+        return latencies, len(errors)
+
+    return asyncio.run(run())
+
+
+def hold_write_lock(path, args, stop):
+    """Take the write lock for --lock-ms every --lock-every seconds until stopped."""
+    conn = sqlite3.connect(path, isolation_level=None, timeout=30)
+    while not stop.wait(args.lock_every):
+        conn.execute("BEGIN IMMEDIATE")
+        time.sleep(args.lock_ms / 1000)
+        conn.execute("COMMIT")
+    conn.close()
+
+
+def _percentile(ordered, q):
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else float("nan")
+
+
+def measure_tree(root, args):
+    workdir = tempfile.mkdtemp(prefix="eco-load-")
+    db_path = os.path.join(workdir, "bench.db")
+    env = dict(os.environ, PYTHONPATH=root, ECO_SECRET_KEY=SECRET, ECO_DATABASE_URL=f"sqlite:///{db_path}")
+    seeded = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--seed", "--users", str(args.users)],
+        cwd=workdir, env=env, capture_output=True, text=True,
+    )
+    if seeded.returncode != 0:
+        raise SystemExit(f"seeding {root} failed:\n{seeded.stderr}")
+    tokens = json.loads(seeded.stdout.strip().splitlines()[-1])
+
+    url = f"http://127.0.0.1:{args.port}"
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.app.main:app", "--port", str(args.port),
+         "--log-level", "warning", "--no-access-log"],
+        cwd=workdir, env=env,
+    )
+    try:
+        import httpx
+
+        for _ in range(300):
+            try:
+                if httpx.get(url + "/").status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.2)
+        else:
+            raise SystemExit(f"server for {root} did not start")
+
+        results = []
+        context = multiprocessing.get_context("spawn")
+        stop = threading.Event()
+        if args.lock_ms:
+            threading.Thread(target=hold_write_lock, args=(db_path, args, stop), daemon=True).start()
+        for clients in args.clients:
+            shares = [clients // args.client_procs + (1 if i < clients % args.client_procs else 0)
+                      for i in range(args.client_procs)]
+            with context.Pool(args.client_procs) as pool:
+                parts = pool.map(load_main, [(args, url, tokens, share) for share in shares if share])
+            reads = sorted(ms for part, _ in parts for ms in part["read"])
+            writes = sorted(ms for part, _ in parts for ms in part["write"])
+            latencies = sorted(reads + writes)
+            result = {
+                "clients": clients,
+                "requests": len(latencies),
+                "rps": round(len(latencies) / args.seconds, 1),
+                "p50_ms": round(_percentile(latencies, 0.50), 1),
+                "p95_ms": round(_percentile(latencies, 0.95), 1),
+                "p99_ms": round(_percentile(latencies, 0.99), 1),
+                "read_p99_ms": round(_percentile(reads, 0.99), 1),
+                "write_p99_ms": round(_percentile(writes, 0.99), 1),
+                "errors": sum(n for _, n in parts),
+            }
+            results.append(result)
+            print(" ".join(f"{result[key]:>{width}}" for key, _, width in COLUMNS), flush=True)
+        stop.set()
+        return results
+    finally:
+        server.terminate()
+        server.wait()
+
+
+# (result key, header, width) of the printed table
+COLUMNS = [
+    ("clients", "clients", 8), ("requests", "requests", 9), ("rps", "req/s", 8),
+    ("p50_ms", "p50 ms", 8), ("p95_ms", "p95 ms", 8), ("p99_ms", "p99 ms", 8),
+    ("read_p99_ms", "read p99", 9), ("write_p99_ms", "write p99", 10), ("errors", "errors", 7),
+]
+
+
+def capacity(results, p99_ms, key="p99_ms"):
+    served = [r["clients"] for r in results if r[key] <= p99_ms and r["errors"] == 0]
+    return max(served, default=0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, nargs="+", default=[50, 100, 200, 400, 800])
+    parser.add_argument("--seconds", type=float, default=10.0, help="measured time per client count")
+    parser.add_argument("--warmup", type=float, default=2.0, help="unmeasured ramp-up per client count")
+    parser.add_argument("--think-ms", type=float, default=1000.0, help="mean idle time between a client's requests")
+    parser.add_argument("--write-ratio", type=float, default=0.2, help="share of requests that log an action")
+    parser.add_argument("--p99-ms", type=float, default=250.0, help="p99 target for the capacity figure")
+    parser.add_argument("--lock-ms", type=float, default=0.0, help="hold the write lock this long (0: never)")
+    parser.add_argument("--lock-every", type=float, default=5.0, help="seconds between write-lock holds")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--client-procs", type=int, default=1, help="processes generating load")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--root", default=ROOT, help="tree to serve (default: this checkout)")
+    parser.add_argument("--baseline-root", default=None, help="another checkout to measure the same way")
+    parser.add_argument("--json", default=None, help="also write the results here")
+    parser.add_argument("--seed", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.seed:
+        return seed_main(args)
+
+    trees = [("current", os.path.abspath(args.root))]
+    if args.baseline_root:
+        trees.append(("baseline", os.path.abspath(args.baseline_root)))
+
+    report = {}
+    for name, root in trees:
+        print(f"\n{name}: {root}")
+        print(" ".join(f"{header:>{width}}" for _, header, width in COLUMNS))
+        results = measure_tree(root, args)
+        report[name] = {
+            "root": root,
+            "results": results,
+            "capacity": capacity(results, args.p99_ms),
+            "read_capacity": capacity(results, args.p99_ms, "read_p99_ms"),
+        }
+
+    print()
+    for name, entry in report.items():
+        print(f"{name:>8}: {entry['capacity']} clients within p99 {args.p99_ms:g} ms "
+              f"({entry['read_capacity']} counting reads only)")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"settings": {k: v for k, v in vars(args).items() if k != "seed"}, **report}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Exercise the carbon provider circuit breaker against a failing or stalled fake provider.
+
+Shows request latency while the provider misbehaves, the circuit tripping,
+the immediate local answers once it is open, and recovery through half-open.
+
+    python benchmarks/carbon_circuit.py --mode stall --budget 0.5
+    python benchmarks/carbon_circuit.py --mode fail
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.chdir(tempfile.mkdtemp(prefix="eco-bench-"))
+os.environ.setdefault("ECO_SECRET_KEY", "bench-secret")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from fake_carbon_provider import FakeCarbonProvider  # noqa: E402
+from backend.app.main import app  # noqa: E402
+from backend.app.services import carbon_service  # noqa: E402
+from backend.app.services.carbon_cache import factor_cache  # noqa: E402
+
+
+def timed_estimate(client, quantity):
+    start = time.perf_counter()
+    body = client.post("/carbon/estimate", json={"action_name": "Rode a Bike", "quantity": quantity}).json()
+    return (time.perf_counter() - start) * 1000, body["source"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["fail", "stall"], default="stall")
+    parser.add_argument("--budget", type=float, default=0.5, help="per-request latency budget (s)")
+    parser.add_argument("--threshold", type=int, default=3)
+    parser.add_argument("--recovery", type=float, default=1.0)
+    parser.add_argument("--requests", type=int, default=8)
+    args = parser.parse_args()
+
+    provider = FakeCarbonProvider().start()
+    provider.configure(fail=args.mode == "fail", stall=args.budget * 4 if args.mode == "stall" else 0)
+    carbon_service.CARBON_INTERFACE_KEY = "bench"
+    carbon_service.CARBON_INTERFACE_URL = provider.url
+    carbon_service.PROVIDER_TIMEOUT = args.budget
+    breaker = carbon_service.provider_breaker
+    breaker.failure_threshold = args.threshold
+    breaker.recovery_timeout = args.recovery
+    breaker.reset()
+    factor_cache.clear()
+
+    try:
+        with TestClient(app) as client:
+            print(f"provider mode: {args.mode}, budget {args.budget}s, threshold {args.threshold}")
+            for i in range(args.requests):
+                ms, source = timed_estimate(client, i + 1)
+                print(f"  request {i + 1:>2}: {ms:8.1f} ms  {source:<20} circuit={breaker.state}")
+
+            print(f"provider healthy again; waiting {args.recovery}s for half-open")
+            provider.configure(fail=False, stall=0)
+            time.sleep(args.recovery)
+            ms, source = timed_estimate(client, 100)
+            print(f"  probe     : {ms:8.1f} ms  {source:<20} circuit={breaker.state}")
+            print(client.get("/carbon/circuit").json())
+    finally:
+        provider.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Throughput of /carbon/estimate against a local fake provider.
+
+Fires concurrent requests at the app in-process (ASGI transport) and reports
+wall time and how many upstream calls were made.  Identical concurrent
+requests should be coalesced into a single upstream call, and once a factor
+has been learned later rounds should not reach the provider at all.
+
+    python benchmarks/carbon_provider.py --requests 200 --distinct 5 --latency 0.2 --rounds 2
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.chdir(tempfile.mkdtemp(prefix="eco-bench-"))
+os.environ.setdefault("ECO_SECRET_KEY", "bench-secret")
+
+import httpx  # noqa: E402
+
+from fake_carbon_provider import FakeCarbonProvider  # noqa: E402
+from backend.app.main import app  # noqa: E402
+from backend.app.services import carbon_service  # noqa: E402
+from backend.app.services.carbon_cache import factor_cache  # noqa: E402
+
+
+async def run(n_requests: int, distinct: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one(i):
+            body = {"action_name": "Rode a Bike", "quantity": float(i % distinct + 1)}
+            resp = await client.post("/carbon/estimate", json=body)
+            resp.raise_for_status()
+            return resp.json()
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(one(i) for i in range(n_requests)))
+        elapsed = time.perf_counter() - start
+
+    sources = {r["source"] for r in results}
+    print(f"sources: {sorted(sources)}")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--distinct", type=int, default=5, help="distinct quantities in the request mix")
+    parser.add_argument("--latency", type=float, default=0.2, help="fake provider latency in seconds")
+    parser.add_argument("--rounds", type=int, default=1)
+    args = parser.parse_args()
+
+    provider = FakeCarbonProvider(latency=args.latency).start()
+    carbon_service.CARBON_INTERFACE_KEY = "bench"
+    carbon_service.CARBON_INTERFACE_URL = provider.url
+
+    async def rounds():
+        for n in range(args.rounds):
+            calls_before = provider.calls
+            elapsed = await run(args.requests, args.distinct)
+            print(f"round {n + 1}: {args.requests} requests in {elapsed:.3f}s "
+                  f"({args.requests / elapsed:.0f} req/s), {provider.calls - calls_before} upstream calls, "
+                  f"provider latency {args.latency}s")
+        await carbon_service.aclose()
+
+    try:
+        asyncio.run(rounds())
+    finally:
+        provider.stop()
+    print(f"factor cache: {factor_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
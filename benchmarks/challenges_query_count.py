@@ -0,0 +1,79 @@
+"""
+Check that GET /challenges issues a constant number of SQL statements.
+
+Seeds a throwaway database with an increasing number of challenges (each with
+a progress row for the user) and counts the statements the endpoint runs.
+Exits non-zero if the count changes with the catalog size.
+
+    python benchmarks/challenges_query_count.py
+"""
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# The backend uses a relative SQLite path, so run inside a scratch directory.
+os.chdir(tempfile.mkdtemp(prefix="eco-bench-"))
+os.environ.setdefault("ECO_SECRET_KEY", "bench-secret")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from backend.app import models  # noqa: E402
+from backend.app.db import SessionLocal, engine, read_engine  # noqa: E402
+from backend.app.main import app  # noqa: E402
+from backend.app.services import challenge_catalog  # noqa: E402
+
+SIZES = [4, 50, 400]
+
+
+def _seed(n_challenges: int) -> None:
+    database = SessionLocal()
+    database.query(models.ChallengeProgress).delete()
+    database.query(models.Challenge).delete()
+    user = database.query(models.User).filter_by(username="bench").first()
+    if not user:
+        user = models.User(username="bench", hashed_password="x", points=0)
+        database.add(user)
+        database.flush()
+    for i in range(n_challenges):
+        challenge = models.Challenge(title=f"Challenge {i}", goal=10, reward_points=5)
+        database.add(challenge)
+        database.flush()
+        database.add(models.ChallengeProgress(user_id=user.id, challenge_id=challenge.id, progress=i % 10))
+    database.commit()
+    database.close()
+    challenge_catalog.invalidate()
+
+
+def main() -> int:
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    counts = {}
+    with TestClient(app) as client:
+        for size in SIZES:
+            _seed(size)
+            client.get("/challenges/", params={"username": "bench"})  # warm the catalog
+            for e in {engine, read_engine}:
+                event.listen(e, "before_cursor_execute", count)
+            statements.clear()
+            response = client.get("/challenges/", params={"username": "bench"})
+            for e in {engine, read_engine}:
+                event.remove(e, "before_cursor_execute", count)
+            assert response.status_code == 200 and len(response.json()) == size
+            counts[size] = len(statements)
+            print(f"{size:>5} challenges -> {counts[size]} SQL statements")
+
+    if len(set(counts.values())) != 1:
+        print("FAIL: statement count grows with the number of challenges")
+        return 1
+    print("OK: constant statement count")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+"""
+Points-chart render time against history length, with and without LTTB.
+
+Synthetic cumulative series of 100 .. 1,000,000 points (one per action, a
+few minutes apart) are rendered through stats._render_points_chart, once
+downsampled to the default max_points and once (up to --raw-limit points)
+at full resolution.
+
+    python benchmarks/chart_downsample.py
+    python benchmarks/chart_downsample.py --sizes 100 10000 1000000 --raw-limit 100000
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def series(n: int):
+    import numpy as np
+
+    rng = np.random.default_rng(n)
+    times = np.datetime64("2020-01-01T00:00:00") + np.cumsum(rng.integers(60, 900, n)).astype("timedelta64[s]")
+    return times, np.cumsum(rng.integers(5, 100, n))
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    fn(*args)
+    return (time.perf_counter() - started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--raw-limit", type=int, default=100_000,
+                        help="largest series also rendered without downsampling")
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    from backend.app.routers.stats import CHART_MAX_POINTS, _render_points_chart
+    from backend.app.services.downsample import lttb_indices
+
+    _render_points_chart("warmup", *series(10))
+    print(f"max_points={CHART_MAX_POINTS}")
+    print(f"{'points':>10} {'lttb ms':>9} {'render ms':>10} {'raw render ms':>14}")
+    # render ms includes the LTTB pass
+    for n in args.sizes:
+        times, cumul = series(n)
+        lttb_ms = timed(lttb_indices, times, cumul, CHART_MAX_POINTS)
+        render_ms = timed(_render_points_chart, "bench", times, cumul, CHART_MAX_POINTS)
+        raw = f"{timed(_render_points_chart, 'bench', times, cumul, n):14.1f}" if n <= args.raw_limit else f"{'-':>14}"
+        print(f"{n:>10} {lttb_ms:9.1f} {render_ms:10.1f} {raw}")
+
+
+if __name__ == "__main__":
+    main()
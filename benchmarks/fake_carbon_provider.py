@@ -0,0 +1,130 @@
+"""
+Local stand-in for the Carbon Interface estimates API.
+
+Answers POST requests with a Carbon Interface shaped body after an injectable
+delay, and counts the calls it receives.  It can also be told to fail (HTTP
+500) or stall (hold the connection for `stall` seconds).  Use it in-process:
+
+    provider = FakeCarbonProvider(latency=0.2).start()
+    os.environ["CARBON_INTERFACE_URL"] = provider.url
+    ...
+    provider.stop()
+
+or standalone (`python benchmarks/fake_carbon_provider.py --port 9100 --latency 0.2`).
+Behaviour can be changed at runtime with
+POST /_control {"latency": 1.5, "fail": false, "stall": 0}.
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# kg CO2 per unit, by payload type
+FACTORS = {"distance": -0.05, "waste": -0.2, "misc": -0.01}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    provider = None  # set per server
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        try:
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client gave up waiting (e.g. a stalled call hit its budget)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        provider = self.server.provider
+
+        if self.path == "/_control":
+            provider.configure(**body)
+            return self._send(200, provider.settings())
+
+        with provider.lock:
+            provider.calls += 1
+            latency, fail, stall = provider.latency, provider.fail, provider.stall
+        if stall:
+            time.sleep(stall)
+        if latency:
+            time.sleep(latency)
+        if fail:
+            return self._send(500, {"error": "provider unavailable"})
+
+        kind = body.get("type", "misc")
+        if kind == "distance":
+            value = body["distance"]["value"]
+        elif kind == "waste":
+            value = body["weight"]["value"]
+        else:
+            value = body.get("quantity", 0)
+        carbon_kg = FACTORS.get(kind, 0.0) * float(value)
+        self._send(200, {"data": {"type": "estimate", "attributes": {"carbon_kg": carbon_kg}}})
+
+
+class FakeCarbonProvider:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                 fail: bool = False, stall: float = 0.0):
+        self.lock = threading.Lock()
+        self.latency = latency
+        self.fail = fail
+        self.stall = stall
+        self.calls = 0
+        self.server = ThreadingHTTPServer((host, port), _Handler)
+        self.server.daemon_threads = True
+        self.server.provider = self
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/api/v1/estimates"
+
+    def configure(self, **settings):
+        with self.lock:
+            for name, value in settings.items():
+                if name in ("latency", "fail", "stall"):
+                    setattr(self, name, value)
+
+    def settings(self) -> dict:
+        with self.lock:
+            return {"latency": self.latency, "fail": self.fail, "stall": self.stall, "calls": self.calls}
+
+    def start(self) -> "FakeCarbonProvider":
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake carbon estimate provider")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds to wait before answering")
+    parser.add_argument("--fail", action="store_true", help="answer every estimate with HTTP 500")
+    parser.add_argument("--stall", type=float, default=0.0, help="seconds to hold each connection first")
+    args = parser.parse_args()
+
+    provider = FakeCarbonProvider(args.host, args.port, args.latency, args.fail, args.stall)
+    print(f"Fake carbon provider on {provider.url} (latency {args.latency}s)")
+    try:
+        provider.server.serve_forever()
+    except KeyboardInterrupt:
+        provider.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,414 @@
+"""
+Scripted HTTP scenarios against the API, with a regression gate.
+
+Each scenario runs --concurrency closed-loop clients for --duration seconds
+(after --warmup unmeasured seconds) and records every request under its
+endpoint ("METHOD route template"):
+
+    login_storm       POST /auth/login with the seeded password
+    log_burst         POST /actions/log, --burst logs back to back per client turn
+    leaderboard_poll  GET /leaderboard/, /leaderboard/rank/{u}, /leaderboard/around/{u}
+    chart_fetch       GET /stats/me/chart and /stats/me/series
+
+Transports: "asgi" drives the app in-process through httpx.ASGITransport
+(no sockets, so handler cost dominates); "uvicorn" starts one uvicorn worker
+on --port; "url" targets a server that is already running (--url, with the
+server's ECO_SECRET_KEY as --secret so the suite can mint tokens).
+
+The database is --db, seeded with benchmarks/seed_data.py first if it does
+not exist, and copied for each run so log_burst never changes the original
+(--in-place skips the copy).  Results are written to --out as JSON with
+per-endpoint p50/p95/p99 and throughput.  With --baseline, every endpoint is
+compared to an earlier results file: p95 above the baseline by more than
+--tolerance (p99: --p99-tolerance, as tails are noisier) and --min-delta-ms,
+throughput below it by more than --tolerance, or a higher error rate is a
+regression, and the exit status is 1 if a --gate endpoint regressed.
+
+    python benchmarks/http_suite.py --db /tmp/bench.db --out base.json
+    python benchmarks/http_suite.py --db /tmp/bench.db --out new.json --baseline base.json
+    python benchmarks/http_suite.py --db /tmp/bench.db --transport uvicorn --scenarios log_burst leaderboard_poll
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SECRET = "http-suite-benchmark"
+DEFAULT_GATE = ["POST /actions/log", "GET /leaderboard/"]
+LOG_ACTIONS = ["Rode a Bike", "Used a Reusable Bag", "Recycled Plastic", "Planted a Tree"]
+
+
+class Client:
+    """One simulated client: its HTTP connection, a random source, and where results go."""
+
+    def __init__(self, http, users, args, results, rng):
+        self.http = http
+        self.users = users
+        self.args = args
+        self.results = results
+        self.rng = rng
+        self.measuring = False
+
+    def user(self):
+        return self.users[self.rng.randrange(len(self.users))]
+
+    async def request(self, endpoint: str, method: str, path: str, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await self.http.request(method, path, **kwargs)
+            status = response.status_code
+        except Exception:
+            status = 0
+        if self.measuring:
+            entry = self.results.setdefault(endpoint, {"latencies": [], "statuses": {}})
+            entry["statuses"][status] = entry["statuses"].get(status, 0) + 1
+            if 0 < status < 400:
+                entry["latencies"].append((time.perf_counter() - started) * 1000)
+
+
+def _auth(user) -> dict:
+    return {"Authorization": f"Bearer {user[2]}"}
+
+
+async def login_storm(client: Client):
+    _, username, _ = client.user()
+    await client.request("POST /auth/login", "POST", "/auth/login",
+                         json={"username": username, "password": client.args.password})
+
+
+async def log_burst(client: Client):
+    user = client.user()
+    for _ in range(client.args.burst):
+        await client.request("POST /actions/log", "POST", "/actions/log", headers=_auth(user), json={
+            "action_name": client.rng.choice(LOG_ACTIONS), "quantity": client.rng.randint(1, 5),
+        })
+
+
+async def leaderboard_poll(client: Client):
+    _, username, _ = client.user()
+    roll = client.rng.random()
+    if roll < 0.6:
+        await client.request("GET /leaderboard/", "GET", "/leaderboard/", params={"limit": 10})
+    elif roll < 0.8:
+        await client.request("GET /leaderboard/rank/{username}", "GET", f"/leaderboard/rank/{username}")
+    else:
+        await client.request("GET /leaderboard/around/{username}", "GET", f"/leaderboard/around/{username}")
+
+
+async def chart_fetch(client: Client):
+    user = client.user()
+    if client.rng.random() < 0.5:
+        await client.request("GET /stats/me/chart", "GET", "/stats/me/chart", headers=_auth(user))
+    else:
+        await client.request("GET /stats/me/series", "GET", "/stats/me/series", headers=_auth(user),
+                             params={"bucket": client.rng.choice(["day", "week", "month"])})
+
+
+SCENARIOS = {
+    "login_storm": login_storm,
+    "log_burst": log_burst,
+    "leaderboard_poll": leaderboard_poll,
+    "chart_fetch": chart_fetch,
+}
+
+
+def _percentile(ordered, q):
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def summarize(results: dict, seconds: float) -> dict:
+    endpoints = {}
+    for endpoint, entry in sorted(results.items()):
+        latencies = sorted(entry["latencies"])
+        count = sum(entry["statuses"].values())
+        errors = count - len(latencies)
+        row = {
+            "requests": count,
+            "errors": errors,
+            "error_rate": round(errors / count, 4) if count else 0.0,
+            "statuses": {str(status): n for status, n in sorted(entry["statuses"].items())},
+            "rps": round(count / seconds, 1),
+        }
+        # Latency fields are null when every request failed
+        row.update({
+            "p50_ms": round(_percentile(latencies, 0.50), 2) if latencies else None,
+            "p95_ms": round(_percentile(latencies, 0.95), 2) if latencies else None,
+            "p99_ms": round(_percentile(latencies, 0.99), 2) if latencies else None,
+            "mean_ms": round(sum(latencies) / len(latencies), 2) if latencies else None,
+            "max_ms": round(latencies[-1], 2) if latencies else None,
+        })
+        endpoints[endpoint] = row
+    return endpoints
+
+
+async def run_scenario(http, name: str, users, args) -> dict:
+    """--concurrency clients looping over one scenario; returns per-endpoint results."""
+    step = SCENARIOS[name]
+    results = {}
+    rng = random.Random(f"{args.seed}-{name}")
+    clients = [Client(http, users, args, results, random.Random(rng.random())) for _ in range(args.concurrency)]
+    now = time.perf_counter()
+    measure_from, deadline = now + args.warmup, now + args.warmup + args.duration
+
+    async def loop(client: Client):
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                return
+            client.measuring = now >= measure_from
+            await step(client)
+
+    await asyncio.gather(*(loop(client) for client in clients))
+    return summarize(results, args.duration)
+
+
+async def run_all(http, users, args) -> dict:
+    report = {}
+    for name in args.scenarios:
+        started = time.perf_counter()
+        report[name] = await run_scenario(http, name, users, args)
+        print(f"\n{name} ({time.perf_counter() - started:.0f}s, {args.concurrency} clients)")
+        print_table(report[name])
+    return report
+
+
+async def run_asgi(users, args) -> dict:
+    import httpx
+
+    from backend.app.main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://suite", timeout=args.timeout) as http:
+            return await run_all(http, users, args)
+
+
+async def run_http(url: str, users, args) -> dict:
+    import httpx
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=args.timeout) as http:
+        return await run_all(http, users, args)
+
+
+def start_uvicorn(args, env):
+    import httpx
+
+    url = f"http://127.0.0.1:{args.port}"
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.app.main:app", "--port", str(args.port),
+         "--log-level", "warning", "--no-access-log"],
+        cwd=ROOT, env=env,
+    )
+    for _ in range(300):
+        try:
+            if httpx.get(url + "/").status_code == 200:
+                return server, url
+        except httpx.HTTPError:
+            pass
+        if server.poll() is not None:
+            break
+        time.sleep(0.2)
+    server.terminate()
+    raise SystemExit("uvicorn did not start")
+
+
+def load_users(db_path: str, sample: int, seed: int):
+    """(id, username) of up to `sample` random users."""
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute("SELECT id, username FROM users").fetchall()
+        counts = {
+            "users": len(rows),
+            "actions": conn.execute("SELECT max(id) FROM action_types").fetchone()[0] or 0,
+        }
+    finally:
+        conn.close()
+    if not rows:
+        raise SystemExit(f"{db_path} has no users; seed it with benchmarks/seed_data.py")
+    random.Random(seed).shuffle(rows)
+    return rows[:sample], counts
+
+
+def _git_commit() -> str:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                               capture_output=True, text=True).stdout.strip()
+        return commit + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+# (result key, header, width) of the printed tables
+COLUMNS = [
+    ("requests", "requests", 9), ("rps", "req/s", 8), ("p50_ms", "p50 ms", 8), ("p95_ms", "p95 ms", 8),
+    ("p99_ms", "p99 ms", 8), ("max_ms", "max ms", 8), ("errors", "errors", 7),
+]
+
+
+def print_table(endpoints: dict) -> None:
+    print(f"  {'endpoint':<36}" + " ".join(f"{header:>{width}}" for _, header, width in COLUMNS))
+    for endpoint, row in endpoints.items():
+        cells = ("-" if row[key] is None else row[key] for key, _, _ in COLUMNS)
+        print(f"  {endpoint:<36}" + " ".join(f"{cell:>{width}}" for cell, (_, _, width) in zip(cells, COLUMNS)))
+
+
+def compare(report: dict, baseline: dict, tolerance: float, p99_tolerance: float, min_delta_ms: float) -> list:
+    """One row per endpoint present in both runs: (scenario, endpoint, changes, regressions)."""
+    rows = []
+    for scenario, endpoints in report["scenarios"].items():
+        for endpoint, current in endpoints.items():
+            base = baseline.get("scenarios", {}).get(scenario, {}).get(endpoint)
+            if base is None:
+                continue
+            changes, regressions = {}, []
+            for key in ("rps", "p50_ms", "p95_ms", "p99_ms"):
+                if base.get(key) and current.get(key) is not None:
+                    changes[key] = current[key] / base[key] - 1
+            # Tails of sub-millisecond endpoints move by large fractions on noise alone
+            for key, limit in (("p95_ms", tolerance), ("p99_ms", p99_tolerance)):
+                if changes.get(key, 0) > limit and current[key] - base[key] > min_delta_ms:
+                    regressions.append(key[:3])
+            if changes.get("rps", 0) < -tolerance:
+                regressions.append("throughput")
+            if current["error_rate"] > base["error_rate"] + 0.01:
+                regressions.append("errors")
+            rows.append((scenario, endpoint, changes, regressions))
+    return rows
+
+
+def print_comparison(rows, gate) -> bool:
+    """Print the comparison; True if a gated endpoint regressed."""
+    print(f"\n{'scenario':<17} {'endpoint':<36} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8}  verdict")
+    failed = False
+    for scenario, endpoint, changes, regressions in rows:
+        gated = endpoint in gate
+        failed |= gated and bool(regressions)
+        cells = " ".join(f"{changes[key]:>+8.0%}" if key in changes else f"{'-':>8}"
+                         for key in ("rps", "p50_ms", "p95_ms", "p99_ms"))
+        verdict = "REGRESSED (" + ", ".join(regressions) + ")" if regressions else "ok"
+        print(f"{scenario:<17} {endpoint:<36} {cells}  {verdict}{' [gate]' if gated else ''}")
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", required=True, help="SQLite database; seeded if missing")
+    parser.add_argument("--users", type=int, default=10_000, help="users to seed when --db is missing")
+    parser.add_argument("--actions", type=int, default=1_000_000, help="actions to seed when --db is missing")
+    parser.add_argument("--password", default="benchmark", help="password of the seeded users")
+    parser.add_argument("--in-place", action="store_true", help="run against --db itself instead of a copy")
+    parser.add_argument("--transport", choices=["asgi", "uvicorn", "url"], default="asgi")
+    parser.add_argument("--url", default=None, help="server to target with --transport url")
+    parser.add_argument("--secret", default=SECRET, help="ECO_SECRET_KEY of the server (--transport url)")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent clients per scenario")
+    parser.add_argument("--duration", type=float, default=20.0, help="measured seconds per scenario")
+    parser.add_argument("--warmup", type=float, default=3.0, help="unmeasured seconds before each scenario")
+    parser.add_argument("--burst", type=int, default=10, help="action logs per log_burst turn")
+    parser.add_argument("--sample-users", type=int, default=5000, help="users the clients act as")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", default=None, help="write the results here as JSON")
+    parser.add_argument("--baseline", default=None, help="earlier results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="allowed relative p95 slowdown and throughput drop before a regression")
+    parser.add_argument("--p99-tolerance", type=float, default=0.30, help="allowed relative p99 slowdown")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0,
+                        help="latency increases smaller than this are never a regression")
+    parser.add_argument("--gate", nargs="*", default=DEFAULT_GATE,
+                        help="endpoints whose regression fails the run (exit status 1)")
+    args = parser.parse_args()
+    if args.transport == "url" and not args.url:
+        parser.error("--transport url needs --url")
+
+    db_path = os.path.abspath(args.db)
+    if args.transport != "url" and not os.path.exists(db_path):
+        print(f"seeding {db_path}", file=sys.stderr)
+        subprocess.run([sys.executable, os.path.join(ROOT, "benchmarks", "seed_data.py"), "--db", db_path,
+                        "--users", str(args.users), "--actions", str(args.actions),
+                        "--password", args.password], check=True)
+
+    workdir = None
+    if args.transport != "url" and not args.in_place:
+        workdir = tempfile.mkdtemp(prefix="eco-suite-")
+        copy = os.path.join(workdir, os.path.basename(db_path))
+        shutil.copyfile(db_path, copy)
+        db_path = copy
+
+    os.environ["ECO_SECRET_KEY"] = args.secret
+    os.environ["ECO_DATABASE_URL"] = f"sqlite:///{db_path}"
+    sys.path.insert(0, ROOT)
+    from backend.app.services import tokens
+
+    server = None
+    try:
+        if args.transport == "url":
+            # No database access: act as the seeded users by name, as seed_data numbers them
+            rows, counts = [(i + 1, f"user{i}") for i in range(args.sample_users)], {}
+        else:
+            rows, counts = load_users(db_path, args.sample_users, args.seed)
+        users = [(user_id, username, tokens.issue(user_id, username)) for user_id, username in rows]
+
+        if args.transport == "asgi":
+            scenarios = asyncio.run(run_asgi(users, args))
+        else:
+            url = args.url
+            if args.transport == "uvicorn":
+                env = dict(os.environ, PYTHONPATH=ROOT)
+                server, url = start_uvicorn(args, env)
+            scenarios = asyncio.run(run_http(url, users, args))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+        if workdir is not None:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    settings = {k: v for k, v in vars(args).items() if k not in ("out", "baseline", "secret")}
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "database": counts,
+            "settings": settings,
+        },
+        "scenarios": scenarios,
+    }
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        base_settings = baseline.get("meta", {}).get("settings", {})
+        differing = [k for k in ("transport", "concurrency", "duration", "burst")
+                     if base_settings.get(k) != settings.get(k)]
+        if differing:
+            print(f"\nwarning: baseline was run with different {', '.join(differing)}", file=sys.stderr)
+        print(f"\nagainst {args.baseline} (commit {baseline.get('meta', {}).get('commit', '?')}), "
+              f"tolerance {args.tolerance:.0%} (p99 {args.p99_tolerance:.0%})")
+        rows = compare(report, baseline, args.tolerance, args.p99_tolerance, args.min_delta_ms)
+        if print_comparison(rows, set(args.gate)):
+            print("\ngated endpoint regressed", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Report per-module import cost using `python -X importtime`.
+
+    python benchmarks/import_time.py                      # backend.app.main
+    python benchmarks/import_time.py backend.app.seed_challenges --top 30
+
+Each module is imported in a fresh interpreter so nothing is cached.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(module: str):
+    """Return (rows, total_us) where rows are (self_us, cumulative_us, name)."""
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise SystemExit(proc.stderr)
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(self_us), int(cumulative_us), name.rstrip()))
+
+    # Top-level imports are the ones without indentation in the tree
+    total = sum(cum for _, cum, name in rows if not name.startswith("  "))
+    return rows, total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("modules", nargs="*", default=["backend.app.main"])
+    parser.add_argument("--top", type=int, default=20, help="modules to list, by cumulative time")
+    args = parser.parse_args()
+
+    for module in args.modules:
+        rows, total = measure(module)
+        print(f"\n{module}: {total / 1000:.1f} ms total import time")
+        print(f"{'self ms':>9} {'cumul ms':>9}  module")
+        for self_us, cumulative_us, name in sorted(rows, key=lambda r: r[1], reverse=True)[:args.top]:
+            print(f"{self_us / 1000:>9.1f} {cumulative_us / 1000:>9.1f}  {name}")
+
+
+if __name__ == "__main__":
+    main()
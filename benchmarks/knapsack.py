@@ -0,0 +1,59 @@
+"""
+Knapsack engine against the original full-table implementation.
+
+For each (items, budget) size a random instance is solved by the reference
+(_knapsack_0_1_reference, skipped above --reference-limit DP cells), the
+vectorized DP and branch-and-bound; results are checked to agree.
+
+    python benchmarks/knapsack.py
+    python benchmarks/knapsack.py --sizes 100x10000 1000x100000 --reference-limit 20000000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", default=["50x1000", "100x10000", "300x30000", "1000x100000", "2000x1000000"],
+                        help="ITEMSxBUDGET instances")
+    parser.add_argument("--reference-limit", type=int, default=10_000_000,
+                        help="largest items*budget the reference is run on")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    from backend.app.services.optimizer import _branch_and_bound, _dp_0_1, _knapsack_0_1_reference
+
+    _dp_0_1([1], [1], 1)  # import NumPy outside the timings
+    rng = random.Random(args.seed)
+    print(f"{'items':>6} {'budget':>9} {'reference ms':>13} {'numpy dp ms':>12} {'b&b ms':>9}  value")
+    for size in args.sizes:
+        n, budget = (int(part) for part in size.split("x"))
+        values = [rng.randint(1, 1000) for _ in range(n)]
+        costs = [rng.randint(1, max(2, 4 * budget // n)) for _ in range(n)]
+
+        (dp_value, dp_items), dp_ms = timed(_dp_0_1, values, costs, budget)
+        # No node budget: the search must reach the exact optimum to be compared
+        (bb_value, _), bb_ms = timed(_branch_and_bound, values, costs, budget, sys.maxsize)
+        assert bb_value == dp_value, (size, bb_value, dp_value)
+        reference = f"{'-':>13}"
+        if n * budget <= args.reference_limit:
+            (ref_value, ref_items), ref_ms = timed(_knapsack_0_1_reference, values, costs, budget)
+            assert (ref_value, ref_items) == (dp_value, dp_items), size
+            reference = f"{ref_ms:13.1f}"
+        print(f"{n:>6} {budget:>9} {reference} {dp_ms:12.1f} {bb_ms:9.1f}  {dp_value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""
+Generate a realistic benchmark database quickly.
+
+Users get a skewed share of the activity (Zipf over a shuffled ranking, so a
+few power users log most actions and ids do not follow activity), actions
+are drawn from the action catalog with per-action quantities, and
+timestamps spread over --days with a daytime peak, in id order as the app
+writes them.  Rows are generated with NumPy in chunks and written with one
+executemany per chunk inside a single transaction, with the action_types indexes dropped
+during the load and rebuilt after.  User points, challenge progress and the
+daily rollup are derived from the generated actions, so every endpoint sees
+consistent data.  Every user's password is --password.
+
+    python benchmarks/seed_data.py --db /tmp/bench.db --users 10000 --actions 1000000
+    python benchmarks/seed_data.py --db /tmp/big.db --users 1000000 --actions 50000000 --skew 0.9
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (mean quantity per log, share of logs) per catalog action; the rest get a share of 1
+ACTION_MIX = {
+    "Rode a Bike": (8.0, 4),
+    "Used a Reusable Bag": (2.0, 3),
+    "Recycled Plastic": (3.0, 2),
+    "Planted a Tree": (1.0, 1),
+}
+# Relative activity per hour of day (UTC): quiet nights, evening peak
+HOUR_WEIGHTS = [1, 1, 1, 1, 1, 2, 4, 7, 8, 7, 6, 6, 7, 6, 6, 6, 7, 9, 10, 10, 8, 6, 4, 2]
+
+
+def _configure(db_path: str) -> None:
+    """Point the backend at db_path; must run before backend.app.db is imported."""
+    os.environ["ECO_DATABASE_URL"] = f"sqlite:///{os.path.abspath(db_path)}"
+    sys.path.insert(0, ROOT)
+
+
+def _timestamps(rng, low: float, high: float, n: int, hour_weights):
+    """n sorted second offsets in [low, high), thinned by hour of day (rejection sampling)."""
+    import numpy as np
+
+    keep, kept = [], 0
+    while kept < n:
+        candidates = rng.uniform(low, high, 2 * n)
+        hour = (candidates // 3600 % 24).astype(np.int64)
+        accepted = candidates[rng.random(2 * n) < hour_weights[hour]]
+        keep.append(accepted)
+        kept += len(accepted)
+    offsets = np.concatenate(keep)[:n]
+    offsets.sort()
+    return offsets
+
+
+def seed(db_path: str, users: int, actions: int, days: int = 365, skew: float = 0.8,
+         password: str = "benchmark", chunk_rows: int = 200_000, seed_value: int = 1, out=sys.stderr) -> dict:
+    """Create and fill db_path; returns counts and timings."""
+    import numpy as np
+
+    from backend.app import db, models
+    from backend.app.seed_challenges import seed_challenges
+    from backend.app.services import action_catalog, challenge_catalog, daily_stats, passwords
+
+    started = time.perf_counter()
+    seed_challenges()  # also creates the schema and runs migrations
+    session = db.SessionLocal()
+    try:
+        action_catalog.seed_defaults(session)
+        catalog = action_catalog.reload(session)
+        _, challenges = challenge_catalog.get(session)
+    finally:
+        session.close()
+    challenge_ids = {c.title: c.id for c in challenges}
+
+    rng = np.random.default_rng(seed_value)
+    names = [a.name for a in catalog.actions]
+    mix = np.array([ACTION_MIX.get(n, (1.0, 1))[1] for n in names], dtype=np.float64)
+    mix /= mix.sum()
+    mean_quantity = np.array([ACTION_MIX.get(n, (1.0, 1))[0] for n in names])
+    points_per_unit = np.array([a.points_per_unit for a in catalog.actions], dtype=np.int64)
+
+    # Zipf weights over a random ranking of the users
+    weights = 1.0 / np.arange(1, users + 1, dtype=np.float64) ** skew
+    weights = weights[rng.permutation(users)]
+    cumulative = np.cumsum(weights)
+    cumulative /= cumulative[-1]
+    hour_weights = np.array(HOUR_WEIGHTS, dtype=np.float64) / max(HOUR_WEIGHTS)
+
+    user_points = np.zeros(users, dtype=np.int64)
+    quantity_by_action = np.zeros((len(names), users), dtype=np.float64)
+
+    table = models.ActionType.__table__
+    end_day = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    first_day = np.datetime64(end_day - timedelta(days=days), "us")
+    span = days * 86400.0
+    insert_action = "INSERT INTO action_types (user_id, action_name, points, timestamp) VALUES (?, ?, ?, ?)"
+    with db.engine.connect() as conn:
+        # Bulk-load settings; this process only seeds, so they need no undoing
+        conn.exec_driver_sql("PRAGMA synchronous=OFF")
+        conn.exec_driver_sql("PRAGMA cache_size=-262144")
+        conn.commit()
+        with conn.begin():
+            for index in table.indexes:
+                index.drop(conn, checkfirst=True)
+            written = 0
+            n_chunks = max(1, -(-actions // chunk_rows))
+            for chunk in range(n_chunks):
+                n = min(chunk_rows, actions - written)
+                # Each chunk covers its own slice of the period, so ids follow time
+                offset = _timestamps(rng, span * chunk / n_chunks, span * (chunk + 1) / n_chunks, n, hour_weights)
+                user_idx = np.minimum(np.searchsorted(cumulative, rng.random(n)), users - 1)
+                action_idx = rng.choice(len(names), n, p=mix)
+                quantity = np.maximum(1, np.rint(rng.exponential(mean_quantity[action_idx]))).astype(np.int64)
+                points = points_per_unit[action_idx] * quantity
+
+                user_points += np.bincount(user_idx, weights=points, minlength=users).astype(np.int64)
+                quantity_by_action += np.bincount(
+                    action_idx * users + user_idx, weights=quantity, minlength=len(names) * users
+                ).reshape(len(names), users)
+                # Formatted as SQLAlchemy stores DateTime on SQLite, skipping per-row conversion
+                stamps = np.char.replace(np.datetime_as_string(
+                    first_day + (offset * 1e6).astype("timedelta64[us]"), unit="us"), "T", " ")
+                conn.exec_driver_sql(insert_action, list(zip(
+                    (user_idx + 1).tolist(), np.array(names)[action_idx].tolist(), points.tolist(), stamps.tolist(),
+                )))
+                written += n
+                rate = written / (time.perf_counter() - started)
+                print(f"\r{written:>12,} actions {rate:>10,.0f} rows/s", end="", file=out, flush=True)
+            print(file=out)
+
+            print("rebuilding action_types indexes", file=out, flush=True)
+            for index in table.indexes:
+                index.create(conn)
+
+            hashed = passwords.pwd_context.hash(password)
+            users_table = models.User.__table__
+            for low in range(0, users, chunk_rows):
+                conn.execute(users_table.insert(), [
+                    {"id": i + 1, "username": f"user{i}", "hashed_password": hashed, "points": int(user_points[i])}
+                    for i in range(low, min(users, low + chunk_rows))
+                ])
+
+            progress_table = models.ChallengeProgress.__table__
+            for a, definition in enumerate(catalog.actions):
+                challenge_id = challenge_ids.get(definition.challenge_title)
+                if challenge_id is None:
+                    continue
+                active = np.nonzero(quantity_by_action[a])[0]
+                conn.execute(progress_table.insert(), [
+                    {"user_id": int(u) + 1, "challenge_id": challenge_id, "progress": int(quantity_by_action[a, u])}
+                    for u in active
+                ])
+
+            print("building the daily rollup", file=out, flush=True)
+            rollup_rows = daily_stats.backfill(conn)
+        conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.exec_driver_sql("ANALYZE")
+
+    seconds = time.perf_counter() - started
+    return {
+        "users": users,
+        "actions": actions,
+        "rollup_rows": rollup_rows,
+        "seconds": round(seconds, 1),
+        "actions_per_s": round(actions / seconds),
+        "bytes": os.path.getsize(db_path),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", required=True, help="SQLite file to create")
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--actions", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=365, help="period the actions span, ending today")
+    parser.add_argument("--skew", type=float, default=0.8, help="Zipf exponent of activity per user (0: uniform)")
+    parser.add_argument("--password", default="benchmark", help="password of every user")
+    parser.add_argument("--chunk-rows", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--force", action="store_true", help="replace an existing file")
+    args = parser.parse_args()
+
+    if os.path.exists(args.db):
+        if not args.force:
+            parser.error(f"{args.db} exists; pass --force to replace it")
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(args.db + suffix):
+                os.remove(args.db + suffix)
+
+    _configure(args.db)
+    counts = seed(args.db, args.users, args.actions, args.days, args.skew, args.password,
+                  args.chunk_rows, args.seed)
+    print(f"{counts['users']:,} users, {counts['actions']:,} actions, {counts['rollup_rows']:,} rollup rows "
+          f"in {counts['seconds']}s ({counts['actions_per_s']:,} actions/s), {counts['bytes'] / 2**20:,.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Mixed read/write throughput of the SQLite engine profiles.
+
+For each profile a fresh database is seeded, then reader threads run the
+leaderboard, challenges-progress and stats queries through the read session
+while writer threads log actions through the write session.  Each profile
+runs in its own interpreter because the engines are configured at import.
+
+    python benchmarks/sqlite_concurrency.py --profiles dev production --readers 8 --writers 2 --seconds 5
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def worker_main(args):
+    sys.path.insert(0, ROOT)
+    from sqlalchemy import func
+
+    from backend.app import models
+    from backend.app.db import ReadSessionLocal, SessionLocal, init_db
+
+    init_db()
+    database = SessionLocal()
+    database.add_all(models.User(username=f"user{i}", hashed_password="x", points=random.randint(0, 5000))
+                     for i in range(args.users))
+    database.commit()
+    database.execute(
+        models.ActionType.__table__.insert(),
+        [{"user_id": random.randint(1, args.users), "action_name": "Rode a Bike", "points": 10}
+         for _ in range(args.users * 20)],
+    )
+    database.commit()
+    database.close()
+
+    stop = threading.Event()
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    lock = threading.Lock()
+
+    def reader():
+        session = ReadSessionLocal()
+        n = 0
+        while not stop.is_set():
+            user_id = random.randint(1, args.users)
+            try:
+                session.query(models.User).order_by(models.User.points.desc()).limit(10).all()
+                session.query(models.ChallengeProgress).filter(models.ChallengeProgress.user_id == user_id).all()
+                session.query(func.count(models.ActionType.id)).filter(models.ActionType.user_id == user_id).scalar()
+                session.rollback()
+                n += 1
+            except Exception:
+                session.rollback()
+                with lock:
+                    counts["errors"] += 1
+        session.close()
+        with lock:
+            counts["reads"] += n
+
+    def writer():
+        n = 0
+        while not stop.is_set():
+            session = SessionLocal()
+            try:
+                user = session.get(models.User, random.randint(1, args.users))
+                session.add(models.ActionType(user_id=user.id, action_name="Rode a Bike", points=10))
+                user.points += 10
+                session.commit()
+                n += 1
+            except Exception:
+                session.rollback()
+                with lock:
+                    counts["errors"] += 1
+            finally:
+                session.close()
+        with lock:
+            counts["writes"] += n
+
+    threads = [threading.Thread(target=reader) for _ in range(args.readers)]
+    threads += [threading.Thread(target=writer) for _ in range(args.writers)]
+    for t in threads:
+        t.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+
+    counts["reads_per_s"] = round(counts["reads"] / args.seconds, 1)
+    counts["writes_per_s"] = round(counts["writes"] / args.seconds, 1)
+    print(json.dumps(counts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profiles", nargs="+", default=["dev", "production"])
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        return worker_main(args)
+
+    print(f"{args.readers} readers, {args.writers} writers, {args.seconds}s per profile")
+    for profile in args.profiles:
+        workdir = tempfile.mkdtemp(prefix="eco-bench-")
+        env = dict(os.environ, ECO_DB_PROFILE=profile,
+                   ECO_DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'bench.db')}")
+        cmd = [sys.executable, os.path.abspath(__file__), "--worker",
+               "--readers", str(args.readers), "--writers", str(args.writers),
+               "--seconds", str(args.seconds), "--users", str(args.users)]
+        proc = subprocess.run(cmd, env=env, capture_output=True, text=True)
+        if proc.returncode != 0:
+            print(f"{profile}: failed\n{proc.stderr}")
+            continue
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        print(f"{profile:>12}: {result['reads_per_s']:>9} reads/s  {result['writes_per_s']:>8} writes/s  "
+              f"errors {result['errors']}")
+
+
+if __name__ == "__main__":
+    main()